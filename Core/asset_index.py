@@ -0,0 +1,229 @@
+# Core/asset_index.py
+from __future__ import annotations
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 项目根目录下的 Assets/
+ASSETS_DIR = Path(__file__).resolve().parents[1] / "Assets"
+# 索引文件不能放进 Assets：写索引本身会改动 Assets 目录的 mtime
+CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache"
+INDEX_PATH = CACHE_DIR / "asset_index.json"
+INDEX_VERSION = 1
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _dir_mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _list_subdirs(path: Path) -> List[str]:
+    try:
+        with os.scandir(path) as it:
+            return sorted(
+                e.name for e in it if e.is_dir() and not e.name.startswith(".")
+            )
+    except OSError:
+        return []
+
+
+def png_size(path: Path) -> Tuple[int, int]:
+    """只读 PNG 头里的 IHDR 拿宽高，不解码；读不出来返回 (0, 0)"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(24)
+    except OSError:
+        return 0, 0
+    if len(head) < 24 or not head.startswith(_PNG_MAGIC):
+        return 0, 0
+    return struct.unpack(">II", head[16:24])
+
+
+class AssetIndex:
+    """
+    Assets 目录的持久化清单：角色 / 皮肤 / 状态 / 帧（文件名、大小、mtime）/ 尺寸。
+
+    结构（每一层都是一个节点 dict）：
+        root -> children[角色] -> children[皮肤] -> children[状态]
+        目录节点：{"mtime": ..., "children": {...}}
+        状态节点：{"mtime": ..., "frames": [[name, size, mtime_ns], ...], "width": w, "height": h}
+
+    增量刷新：目录 mtime 没变就沿用上次的子目录名单/帧列表，只做 stat，不列目录。
+    """
+
+    def __init__(self, assets_dir: Path = ASSETS_DIR, index_path: Optional[Path] = None):
+        self.assets_dir = Path(assets_dir)
+        self.index_path = Path(index_path or INDEX_PATH)
+        self._root: Dict = {}
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+                self._root = data.get("root") or {}
+        except Exception:
+            # 不存在/损坏都无所谓：刷新时会整棵重建
+            self._root = {}
+
+    def save(self) -> None:
+        """原子写入索引文件；目录不可写时静默跳过（索引只是缓存）"""
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+            tmp.write_text(
+                json.dumps({"version": INDEX_VERSION, "root": self._root}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            tmp.replace(self.index_path)
+        except OSError:
+            pass
+
+    # ---------- refresh ----------
+
+    def _sync_children(self, node: Dict, path: Path) -> bool:
+        mtime = _dir_mtime(path)
+        if node.get("mtime") == mtime and "children" in node:
+            return False
+        old = node.get("children", {})
+        node["children"] = {n: old.get(n, {}) for n in _list_subdirs(path)}
+        node["mtime"] = mtime
+        return True
+
+    def _sync_state(self, node: Dict, path: Path) -> bool:
+        mtime = _dir_mtime(path)
+        if node.get("mtime") == mtime and "frames" in node:
+            return False
+        frames = []
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(
+                    (e for e in it if e.name.endswith(".png") and not e.name.startswith(".")),
+                    key=lambda e: e.name,
+                )
+                for e in entries:
+                    if not e.is_file():
+                        continue
+                    st = e.stat()
+                    frames.append([e.name, st.st_size, st.st_mtime_ns])
+        except OSError:
+            frames = []
+        width, height = png_size(path / frames[0][0]) if frames else (0, 0)
+        node.clear()
+        node.update(mtime=mtime, frames=frames, width=width, height=height)
+        return True
+
+    def refresh(
+        self,
+        character: Optional[str] = None,
+        skin: Optional[str] = None,
+        deep: bool = True,
+    ) -> bool:
+        """
+        按目录 mtime 增量刷新；返回索引是否有变化（有变化会顺便落盘）。
+        - character/skin：只刷新这一棵子树（加载皮肤时用）
+        - deep=False：只刷新到“皮肤”这一层（设置窗口只需要名字）
+        """
+        changed = self._sync_children(self._root, self.assets_dir)
+        chars = self._root["children"]
+        for c in [character] if character else list(chars):
+            cnode = chars.get(c)
+            if cnode is None:
+                continue
+            cpath = self.assets_dir / c
+            changed |= self._sync_children(cnode, cpath)
+            if not deep:
+                continue
+            for sk in [skin] if skin else list(cnode["children"]):
+                snode = cnode["children"].get(sk)
+                if snode is None:
+                    continue
+                spath = cpath / sk
+                changed |= self._sync_children(snode, spath)
+                for state, stnode in snode["children"].items():
+                    changed |= self._sync_state(stnode, spath / state)
+        if changed:
+            self.save()
+        return changed
+
+    # ---------- queries ----------
+
+    def _node(self, *names: str) -> Dict:
+        node = self._root
+        for n in names:
+            node = node.get("children", {}).get(n)
+            if node is None:
+                return {}
+        return node
+
+    def characters(self) -> List[str]:
+        return list(self._node().get("children", {}))
+
+    def skins(self, character: str) -> List[str]:
+        return list(self._node(character).get("children", {}))
+
+    def states(self, character: str, skin: str) -> List[str]:
+        return list(self._node(character, skin).get("children", {}))
+
+    def rescan_state(self, character: str, skin: str, state: str) -> bool:
+        """
+        强制重扫一个状态目录，返回帧列表是否有变化。
+        原地覆盖写（ffmpeg -y）不会改目录 mtime，热重载时必须走这里。
+        """
+        self.refresh(character, skin)
+        node = self._node(character, skin, state)
+        if not node:
+            return False
+        old = node.get("frames")
+        node["mtime"] = None
+        self._sync_state(node, self.assets_dir / character / skin / state)
+        changed = node.get("frames") != old
+        if changed:
+            self.save()
+        return changed
+
+    def frame_entries(
+        self, character: str, skin: str, state: str
+    ) -> List[Tuple[str, int, int]]:
+        """[(绝对路径, 文件大小, mtime_ns), ...]，按文件名排序"""
+        node = self._node(character, skin, state)
+        base = self.assets_dir / character / skin / state
+        return [(str(base / name), size, mtime) for name, size, mtime in node.get("frames", [])]
+
+    def frame_files(self, character: str, skin: str, state: str) -> List[str]:
+        """按文件名排序的帧路径（绝对路径字符串）"""
+        return [p for p, _size, _mtime in self.frame_entries(character, skin, state)]
+
+    def state_info(self, character: str, skin: str, state: str) -> Optional[Dict]:
+        """帧数 / 宽高 / 总字节数 / 最新 mtime；状态不存在返回 None"""
+        node = self._node(character, skin, state)
+        if "frames" not in node:
+            return None
+        frames = node["frames"]
+        return {
+            "frames": len(frames),
+            "width": node.get("width", 0),
+            "height": node.get("height", 0),
+            "bytes": sum(f[1] for f in frames),
+            "mtime": max((f[2] for f in frames), default=node.get("mtime")),
+        }
+
+
+_shared_index: Optional[AssetIndex] = None
+
+
+def get_asset_index() -> AssetIndex:
+    """进程内共享的索引实例（桌宠和设置窗口共用）"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = AssetIndex()
+    return _shared_index
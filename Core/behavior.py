@@ -0,0 +1,212 @@
+# Core/behavior.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# 皮肤目录下可选的行为覆盖文件（和 Relax/Move/... 目录同级）
+BEHAVIOR_FILE = "behavior.json"
+
+TRIGGER_TIMEOUT = "timeout"  # 当前状态停留时间到
+TRIGGER_HOVER = "hover"  # 鼠标移入桌宠
+TRIGGER_UNHOVER = "unhover"  # 鼠标移出桌宠
+
+
+def default_behavior(
+    move_probability: float = 0.35,
+    move_duration_ms: Tuple[int, int] = (3000, 8000),
+    relax_check_ms: int = 8000,
+) -> Dict[str, Any]:
+    """
+    默认行为表（设置页的参数会填进来）。skin 的 behavior.json 只需写要改的部分，例如：
+      {"states": {"Sit": {"duration_ms": [20000, 60000]}}}
+    """
+    return {
+        "initial": "Relax",
+        "states": {
+            # 每 relax_check_ms 以 move_probability 的概率起身，起身后 3:1 去走动/坐下
+            "Relax": {
+                "check_ms": relax_check_ms,
+                "leave_chance": move_probability,
+                "transitions": [{"target": "Move", "weight": 3}, {"target": "Sit", "weight": 1}],
+            },
+            "Move": {
+                "moving": True,
+                "duration_ms": list(move_duration_ms),
+                "transitions": [{"target": "Relax"}],
+            },
+            "Sit": {"duration_ms": [10000, 30000], "transitions": [{"target": "Relax"}]},
+            "Interact": {"transitions": [{"target": "Relax", "trigger": TRIGGER_UNHOVER}]},
+        },
+        # 任何状态下都生效的转移
+        "any_state": [{"target": "Interact", "trigger": TRIGGER_HOVER}],
+    }
+
+
+def merge_behavior(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """按状态浅合并：覆盖里写到的字段替换默认值（transitions 整体替换），可新增状态"""
+    merged = {
+        "initial": override.get("initial", base.get("initial")),
+        "states": {name: dict(spec) for name, spec in base.get("states", {}).items()},
+        "any_state": list(override.get("any_state", base.get("any_state", []))),
+    }
+    for name, spec in (override.get("states") or {}).items():
+        merged["states"].setdefault(name, {}).update(spec)
+    return merged
+
+
+def load_skin_behavior(skin_dir: str) -> Dict[str, Any]:
+    """读取皮肤目录下的 behavior.json；没有或格式不对时返回 {}"""
+    path = os.path.join(skin_dir, BEHAVIOR_FILE)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"[behavior] 读取 {path} 失败：", e)
+        return {}
+
+
+@dataclass
+class Transition:
+    target: str
+    weight: float = 1.0
+    trigger: str = TRIGGER_TIMEOUT
+
+
+@dataclass
+class StateSpec:
+    name: str
+    animation: str = ""  # 动画目录名，默认同 name
+    moving: bool = False  # 是否在这个状态里水平走动
+    duration_ms: Tuple[int, int] = (0, 0)  # 均匀随机停留时长；(0, 0) 表示不会超时离开
+    check_ms: int = 0  # >0 时改用“每 check_ms 以 leave_chance 概率离开”，停留时间直接按几何分布算出
+    leave_chance: float = 1.0
+    transitions: List[Transition] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.animation = self.animation or self.name
+
+
+@dataclass
+class BehaviorSpec:
+    initial: str
+    states: Dict[str, StateSpec]
+    any_state: List[Transition] = field(default_factory=list)
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "BehaviorSpec":
+        def transitions(items: Iterable[Dict[str, Any]]) -> List[Transition]:
+            return [
+                Transition(
+                    target=str(t["target"]),
+                    weight=float(t.get("weight", 1.0)),
+                    trigger=str(t.get("trigger", TRIGGER_TIMEOUT)),
+                )
+                for t in items or []
+                if "target" in t
+            ]
+
+        states = {}
+        for name, s in (d.get("states") or {}).items():
+            lo, hi = (list(s.get("duration_ms") or [0, 0]) + [0, 0])[:2]
+            states[name] = StateSpec(
+                name=name,
+                animation=str(s.get("animation", "")),
+                moving=bool(s.get("moving", False)),
+                duration_ms=(int(lo), int(max(lo, hi))),
+                check_ms=int(s.get("check_ms", 0)),
+                leave_chance=float(s.get("leave_chance", 1.0)),
+                transitions=transitions(s.get("transitions")),
+            )
+        initial = d.get("initial") or next(iter(states), "Relax")
+        return BehaviorSpec(initial=initial, states=states, any_state=transitions(d.get("any_state")))
+
+
+class BehaviorEngine:
+    """
+    表驱动的行为状态机。进入一个状态时就把“下一次超时转移”的时间算好，
+    调用方只需按返回的毫秒数排一个单次任务，不需要任何轮询。
+    disabled 里的状态不会被转移进入（如关闭走动时的 Move、当前皮肤缺帧的状态）。
+    """
+
+    def __init__(self, spec: BehaviorSpec, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng or random.Random()
+        self.spec = spec
+        self.disabled: Set[str] = set()
+        self.state = spec.initial
+        self.listeners: List[Callable[[str, str], None]] = []  # (旧状态, 新状态)
+
+    def set_spec(self, spec: BehaviorSpec, disabled: Iterable[str] = ()) -> None:
+        self.spec = spec
+        self.disabled = set(disabled)
+        if self.state not in spec.states or self.state in self.disabled:
+            self.state = spec.initial
+
+    @property
+    def current(self) -> StateSpec:
+        return self.spec.states.get(self.state) or StateSpec(self.state)
+
+    def _allowed(self, target: str) -> bool:
+        return target in self.spec.states and target not in self.disabled
+
+    def reachable(self, start: Optional[str] = None) -> Set[str]:
+        """从 start（默认当前状态）出发能到达的全部状态（含自身）"""
+        start = start or self.state
+        seen = {start}
+        todo = [start]
+        globals_ = [t.target for t in self.spec.any_state if self._allowed(t.target)]
+        while todo:
+            spec = self.spec.states.get(todo.pop())
+            targets = globals_ + ([t.target for t in spec.transitions if self._allowed(t.target)] if spec else [])
+            for target in targets:
+                if target not in seen:
+                    seen.add(target)
+                    todo.append(target)
+        return seen
+
+    def dwell_ms(self, spec: StateSpec) -> Optional[int]:
+        """本次在 spec 里停留多久；None = 不会超时离开"""
+        if not any(t.trigger == TRIGGER_TIMEOUT and self._allowed(t.target) for t in spec.transitions):
+            return None
+        if spec.check_ms > 0:
+            p = spec.leave_chance
+            if p <= 0:
+                return None
+            # 每 check_ms 判定一次、以概率 p 离开 <=> 判定次数服从几何分布，直接抽一次
+            checks = 1 if p >= 1 else 1 + int(math.log(1.0 - self.rng.random()) / math.log(1.0 - p))
+            return spec.check_ms * checks
+        lo, hi = spec.duration_ms
+        if hi <= 0:
+            return None
+        return self.rng.randint(lo, hi)
+
+    def enter(self, name: str) -> Optional[int]:
+        """切到 name，返回距下一次超时转移的毫秒数（None 表示等外部触发）"""
+        old, self.state = self.state, name
+        for listener in list(self.listeners):
+            listener(old, name)
+        return self.dwell_ms(self.current)
+
+    def next_state(self) -> Optional[str]:
+        """停留时间到：按权重挑下一个状态"""
+        choices = [
+            t for t in self.current.transitions
+            if t.trigger == TRIGGER_TIMEOUT and self._allowed(t.target) and t.weight > 0
+        ]
+        if not choices:
+            return None
+        return self.rng.choices([t.target for t in choices], weights=[t.weight for t in choices])[0]
+
+    def on_trigger(self, trigger: str) -> Optional[str]:
+        """外部事件（悬停等）：先看当前状态自己的转移，再看 any_state"""
+        for t in list(self.current.transitions) + list(self.spec.any_state):
+            if t.trigger == trigger and self._allowed(t.target) and t.target != self.state:
+                return t.target
+        return None
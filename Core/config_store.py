@@ -0,0 +1,280 @@
+# Core/config_store.py
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from Core.tracing import tracer
+
+# 应用与插件设置的统一存储（和 Settings/config.json 同目录，不进 git）
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[1] / "Settings" / "settings.db"
+
+APP_NAMESPACE = "app"
+
+# 写入合并窗口：这段时间内的所有改动落成一个事务
+FLUSH_DELAY_MS = 250
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    namespace TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS json_sources (
+    namespace TEXT PRIMARY KEY,
+    path      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    snapshot  TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_MISSING = object()
+
+
+def plugin_namespace(plugin_id: str) -> str:
+    return f"plugin.{plugin_id}"
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class ConfigStore:
+    """
+    SQLite（WAL 模式）里的分命名空间配置：app、plugin.<id> ...
+    - 读：打开时整表读进内存，之后都是查字典
+    - 写：set/update 只记到待写集合，FLUSH_DELAY_MS 后（或显式 flush）一次事务落盘，
+      滚轮缩放、插件保存这类连发的写入只会变成一个小事务
+    - JSON：原来的 config.json 作为导入/导出面，见 sync_json / export_json
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._data: Dict[str, Dict[str, Any]] = {}
+        for namespace, key, value in self._conn.execute("SELECT namespace, key, value FROM settings"):
+            self._data.setdefault(namespace, {})[key] = json.loads(value)
+        self._dirty: Dict[Tuple[str, str], Any] = {}  # (命名空间, 键) -> 新值（_MISSING = 删除）
+        self._sources: Dict[str, Dict[str, Any]] = {}  # 待写的 json_sources 行
+        self._flush_job = None
+        self.transactions = 0
+        self.rows_written = 0
+
+    # ---------- 读 ----------
+
+    def namespace(self, namespace: str) -> Dict[str, Any]:
+        """命名空间的副本（改它不影响存储，写回请用 update）"""
+        return dict(self._data.get(namespace, {}))
+
+    def has(self, namespace: str) -> bool:
+        return bool(self._data.get(namespace))
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self._data.get(namespace, {}).get(key, default)
+
+    # ---------- 写（合并后落盘） ----------
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        self.update(namespace, {key: value})
+
+    def update(self, namespace: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """合并写入，返回真正变化的字段（值没变的不产生任何写入）"""
+        changed = self._stage(namespace, values)
+        if changed:
+            self._schedule_flush()
+        return changed
+
+    def _stage(self, namespace: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        current = self._data.setdefault(namespace, {})
+        changed = {k: v for k, v in values.items() if current.get(k, _MISSING) != v}
+        for key, value in changed.items():
+            current[key] = value
+            self._dirty[(namespace, key)] = value
+        return changed
+
+    def replace(self, namespace: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """整体替换：不在 values 里的键会被删除"""
+        for key in set(self._data.get(namespace, {})) - set(values):
+            del self._data[namespace][key]
+            self._dirty[(namespace, key)] = _MISSING
+        return self.update(namespace, values)
+
+    def bind_scheduler(self, scheduler) -> None:
+        """接上调度器后写入延迟合并；没接之前（如启动早期、命令行工具）每次写入立即落盘"""
+        if self._flush_job is None:
+            self._flush_job = scheduler.job("config.flush", self.flush, single_shot=True, tolerance_ms=500)
+
+    def unbind_scheduler(self) -> None:
+        """退出前调用：之后每次写入立即落盘（调度器的 QTimer 可能已随桌宠销毁，不能再碰它）"""
+        job, self._flush_job = self._flush_job, None
+        if job is not None:
+            try:
+                job.stop()
+            except RuntimeError:
+                pass  # wrapped C/C++ object has been deleted
+
+    def shutdown(self) -> None:
+        """退出时：先写完待写改动，再解绑调度器（aboutToQuit / 关窗 / atexit 都可以调用，可重复调用）"""
+        self.flush()
+        self.unbind_scheduler()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_job is None:
+            self.flush()
+        elif not self._flush_job.isActive():
+            self._flush_job.start(FLUSH_DELAY_MS)
+
+    def flush(self) -> int:
+        """把待写改动作为一个事务写入，返回写入行数"""
+        if not self._dirty and not self._sources:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        sources, self._sources = self._sources, {}
+        upserts = [(ns, k, json.dumps(v, ensure_ascii=False)) for (ns, k), v in dirty.items() if v is not _MISSING]
+        deletes = [(ns, k) for (ns, k), v in dirty.items() if v is _MISSING]
+        with tracer.span("config.flush", cat="io", rows=len(dirty)):
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO settings(namespace, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value",
+                    upserts,
+                )
+                self._conn.executemany("DELETE FROM settings WHERE namespace = ? AND key = ?", deletes)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO json_sources(namespace, path, size, mtime_ns, snapshot) "
+                    "VALUES (:namespace, :path, :size, :mtime_ns, :snapshot)",
+                    list(sources.values()),
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:  # BEGIN 本身失败时没有事务可回滚
+                    self._conn.execute("ROLLBACK")
+                # 放回待写集合，下次再试（期间的新改动优先）
+                for key, value in dirty.items():
+                    self._dirty.setdefault(key, value)
+                for key, value in sources.items():
+                    self._sources.setdefault(key, value)
+                print("[config] 写入失败：", e)
+                return 0
+        self.transactions += 1
+        self.rows_written += len(dirty)
+        return len(dirty)
+
+    # ---------- JSON 导入/导出 ----------
+
+    def _source(self, namespace: str) -> Optional[Dict[str, Any]]:
+        pending = self._sources.get(namespace)
+        if pending is not None:
+            return pending
+        row = self._conn.execute(
+            "SELECT path, size, mtime_ns, snapshot FROM json_sources WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"namespace": namespace, "path": row[0], "size": row[1], "mtime_ns": row[2], "snapshot": row[3]}
+
+    def _record_source(self, namespace: str, path: Path, stamp: Tuple[int, int], data: Dict[str, Any]) -> None:
+        self._sources[namespace] = {
+            "namespace": namespace,
+            "path": str(path),
+            "size": stamp[0],
+            "mtime_ns": stamp[1],
+            "snapshot": json.dumps(data, ensure_ascii=False, sort_keys=True),
+        }
+        self._schedule_flush()
+
+    def json_changed(self, namespace: str, path: Path) -> bool:
+        """文件戳和上次导入/导出时不同（文件被外部改过）"""
+        stamp = _file_stamp(Path(path))
+        if stamp is None:
+            return False
+        source = self._source(namespace)
+        return source is None or (source["size"], source["mtime_ns"]) != stamp
+
+    def sync_json(
+        self,
+        namespace: str,
+        path: Path,
+        validate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        从 JSON 文件导入：第一次全部导入；之后只导入文件里相对上次同步真正改过的字段
+        （应用自己在库里改的值不会被文件里的旧值盖掉）。返回导入后变化的字段。
+        文件不存在/没变/不是合法 JSON 对象时什么都不做。
+        validate(改过的字段) -> 允许导入的字段：不合法的值留在文件里，不进库。
+        """
+        path = Path(path)
+        if not self.json_changed(namespace, path):
+            return {}
+        stamp = _file_stamp(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(data, dict):
+                raise ValueError("config json is not an object")
+        except Exception as e:
+            print(f"[config] 忽略无法解析的 {path}：{e}")
+            return {}
+        source = self._source(namespace)
+        if source is None:
+            edited = data
+        else:
+            last = json.loads(source["snapshot"])
+            edited = {k: v for k, v in data.items() if last.get(k, _MISSING) != v}
+        if validate is not None:
+            edited = validate(edited)
+        with tracer.span("config.import_json", cat="io", namespace=namespace, fields=len(edited)):
+            changed = self._stage(namespace, edited)
+            self._record_source(namespace, path, stamp, data)  # 和导入的字段同一个事务
+        return changed
+
+    def export_json(self, namespace: str, path: Path) -> Path:
+        """把命名空间写成 JSON（.tmp -> replace 原子替换），并记下文件戳：导入时认得出是自己写的"""
+        path = Path(path)
+        data = self.namespace(namespace)
+        with tracer.span("config.export_json", cat="io", namespace=namespace):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+            self._record_source(namespace, path, _file_stamp(path), data)
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "namespaces": len(self._data),
+            "pending": len(self._dirty),
+            "transactions": self.transactions,
+            "rows_written": self.rows_written,
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+_store: Optional[ConfigStore] = None
+
+
+def get_config_store() -> ConfigStore:
+    """进程内共享的配置库（退出时自动把未写的改动落盘）"""
+    global _store
+    if _store is None:
+        with tracer.span("config.open", cat="io"):
+            _store = ConfigStore()
+        atexit.register(_store.shutdown)
+    return _store
@@ -0,0 +1,71 @@
+# Core/config_watcher.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+
+class ConfigWatcher(QObject):
+    """
+    监视 config.json（应用 + 各插件），外部工具改完后发出 changed(命名空间列表)：
+    - 同时监视文件和所在目录：编辑器/配置工具常用“写临时文件再替换”，替换后文件会从监视列表掉出去
+    - 一阵连续写入合并成一次（每次事件重新计时）
+    - 只看文件戳是否和配置库记录的不同：应用自己 export_json 写的文件戳已记录，不会触发；
+      .tmp 临时文件本身不在监视范围内
+    """
+
+    changed = pyqtSignal(list)
+
+    def __init__(self, store, scheduler=None, parent=None, debounce_ms: int = 300) -> None:
+        super().__init__(parent)
+        self._store = store
+        self._files: Dict[str, Path] = {}  # 命名空间 -> 文件
+        self.debounce_ms = debounce_ms
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_path_changed)
+        self._fs.fileChanged.connect(self._on_path_changed)
+
+        if scheduler is not None:
+            self._debounce = scheduler.job("config.watch", self._flush, single_shot=True, tolerance_ms=100)
+        else:
+            self._debounce = QTimer(self)
+            self._debounce.setSingleShot(True)
+            self._debounce.timeout.connect(self._flush)
+
+    def watch(self, files: Dict[str, Path]) -> None:
+        """追加监视：{命名空间: config.json 路径}"""
+        self._files.update({ns: Path(p) for ns, p in files.items()})
+        self._rewatch()
+
+    def stop(self) -> None:
+        paths = self._fs.directories() + self._fs.files()
+        if paths:
+            self._fs.removePaths(paths)
+        self._files = {}
+        self._debounce.stop()
+
+    def _rewatch(self) -> None:
+        watched = set(self._fs.directories()) | set(self._fs.files())
+        wanted = set()
+        for path in self._files.values():
+            wanted.add(os.path.normpath(str(path.parent)))
+            if path.exists():
+                wanted.add(os.path.normpath(str(path)))
+        missing = [p for p in wanted if p not in watched and os.path.exists(p)]
+        if missing:
+            self._fs.addPaths(missing)
+
+    def _on_path_changed(self, path: str) -> None:
+        if path.endswith(".tmp"):
+            return
+        self._debounce.start(self.debounce_ms)  # 每次写入都重新计时：整批写完才检查
+
+    def _flush(self) -> None:
+        self._rewatch()
+        namespaces = [ns for ns, path in self._files.items() if self._store.json_changed(ns, path)]
+        if namespaces:
+            self.changed.emit(namespaces)
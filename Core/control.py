@@ -0,0 +1,91 @@
+# Core/control.py
+"""
+单实例控制通道（客户端 + 协议）：
+- 运行中的桌宠开一个本地 socket（服务端见 Core/control_server.py），命令是换行分隔的 JSON，一行一条、回一行结果
+- 再次启动 main.py 或脚本调用 send_commands()：本模块只用标准库，不导入 PyQt，转发完即退出
+命令示例：{"cmd": "say", "text": "你好"}、{"cmd": "skin", "character": "阿米娅", "skin": "默认"}
+"""
+from __future__ import annotations
+
+import getpass
+import json
+import os
+import socket
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+SERVER_NAME = "desktop-pet-control"
+
+# 同一批里只需执行最后一次的命令（脚本连发 10 次换皮肤只换一次）
+COALESCED_COMMANDS = ("skin", "reload", "size")
+
+
+def _server_name() -> str:
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return f"{SERVER_NAME}-{user}"
+
+
+def server_address() -> str:
+    """QLocalServer.listen 用的名字：Unix 下给绝对路径，客户端按同一路径连 AF_UNIX"""
+    if os.name == "nt":
+        return _server_name()
+    return os.path.join(tempfile.gettempdir(), _server_name())
+
+
+class _PipeConnection:
+    """Windows 命名管道：用文件接口模拟 socket 的 sendall/recv"""
+
+    def __init__(self, path: str) -> None:
+        self._f = open(path, "r+b", buffering=0)
+
+    def sendall(self, data: bytes) -> None:
+        self._f.write(data)
+
+    def recv(self, n: int) -> bytes:
+        return self._f.read(n)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _connect(timeout_s: float):
+    if os.name == "nt":
+        return _PipeConnection("\\\\.\\pipe\\" + server_address())
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout_s)
+    try:
+        conn.connect(server_address())
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def send_commands(commands: Iterable[Dict[str, Any]], timeout_s: float = 5.0) -> Optional[List[Dict[str, Any]]]:
+    """
+    把一批命令发给正在运行的桌宠，返回每条命令的结果；没有运行中的实例时返回 None。
+    """
+    commands = list(commands)
+    try:
+        conn = _connect(timeout_s)
+    except OSError:
+        return None
+    replies: List[Dict[str, Any]] = []
+    try:
+        conn.sendall(b"".join(json.dumps(c, ensure_ascii=False).encode("utf-8") + b"\n" for c in commands))
+        buf = b""
+        while len(replies) < len(commands):
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            replies.extend(json.loads(line) for line in lines if line.strip())
+    except (OSError, ValueError) as e:
+        replies.append({"ok": False, "error": f"连接中断：{e}"})
+    finally:
+        conn.close()
+    return replies
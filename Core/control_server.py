@@ -0,0 +1,170 @@
+# Core/control_server.py
+from __future__ import annotations
+
+import json
+import os
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtNetwork import QLocalServer
+from PyQt5.QtWidgets import QApplication
+
+from Core.control import COALESCED_COMMANDS, send_commands, server_address
+
+# listen() 的结果
+LISTEN_OK = "ok"
+LISTEN_RUNNING = "running"  # 另一个实例抢先监听了：调用方应把命令转发过去后退出
+LISTEN_FAILED = "failed"
+
+
+class ControlServer(QObject):
+    """
+    本地控制服务：读写都走 Qt 信号（不阻塞 GUI 线程）。
+    一次 readyRead 里收到的所有完整行算一批，批内 COALESCED_COMMANDS 只执行最后一条。
+    """
+
+    def __init__(self, handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None, parent=None) -> None:
+        super().__init__(parent)
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = dict(handlers or {})
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers: Dict[Any, bytes] = {}
+        self.batches = 0
+        self.commands = 0
+
+    def register(self, cmd: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """插件可注册自己的命令：handler(命令 dict) -> 可 JSON 序列化的结果"""
+        self.handlers[cmd] = handler
+
+    def listen(self) -> str:
+        """返回 LISTEN_OK / LISTEN_RUNNING / LISTEN_FAILED"""
+        address = server_address()
+        if self._server.listen(address):
+            return LISTEN_OK
+        # 地址被占：可能是同时启动的另一个实例刚开始监听，先 ping 一下再决定要不要清
+        if send_commands([{"cmd": "ping"}], timeout_s=1.0) is not None:
+            return LISTEN_RUNNING
+        # 连不上才是上次异常退出留下的 socket 文件，清掉重来
+        QLocalServer.removeServer(address)
+        if self._server.listen(address):
+            return LISTEN_OK
+        print(f"[control] 监听失败：{self._server.errorString()}")
+        return LISTEN_FAILED
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _on_new_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            self._buffers[sock] = b""
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock) -> None:
+        self._buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock) -> None:
+        data = self._buffers.get(sock, b"") + bytes(sock.readAll())
+        *lines, rest = data.split(b"\n")
+        self._buffers[sock] = rest
+        batch = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                command = json.loads(line)
+                batch.append(command if isinstance(command, dict) else {"cmd": None})
+            except ValueError:
+                batch.append({"cmd": None, "_error": "不是合法的 JSON"})
+        if not batch:
+            return
+        replies = self.dispatch(batch)
+        sock.write(b"".join(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in replies))
+        sock.flush()
+
+    def dispatch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """执行一批命令，按顺序返回结果（也用于首次启动时执行命令行带来的请求）"""
+        self.batches += 1
+        last = {c.get("cmd"): i for i, c in enumerate(batch) if c.get("cmd") in COALESCED_COMMANDS}
+        replies = []
+        for i, command in enumerate(batch):
+            cmd = command.get("cmd")
+            if "_error" in command:
+                replies.append({"ok": False, "error": command["_error"]})
+                continue
+            if cmd in last and last[cmd] != i:
+                replies.append({"ok": True, "cmd": cmd, "coalesced": True})
+                continue
+            handler = self.handlers.get(cmd)
+            if handler is None:
+                replies.append({"ok": False, "cmd": cmd, "error": f"未知命令：{cmd}"})
+                continue
+            self.commands += 1
+            try:
+                result = handler(command)
+                replies.append({"ok": True, "cmd": cmd, "result": result})
+            except Exception as e:
+                print(f"[control] 命令 {cmd} 失败：\n{traceback.format_exc()}")
+                replies.append({"ok": False, "cmd": cmd, "error": str(e)})
+        return replies
+
+
+def pet_handlers(pets: Callable[[], List[Any]]) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """桌宠的标准命令；pets() 返回当前所有桌宠（第一只是读写 config.json 的那只）"""
+    def show(_c):
+        for pet in pets():
+            pet.showNormal()
+            pet.raise_()
+        return len(pets())
+
+    def say(c):
+        pet = pets()[0]
+        pet.complete_startup()  # 刚启动、插件还在排队加载时先加载完
+        fn = getattr(pet, "app_ctx", None) and pet.app_ctx.services.get("say")
+        if not callable(fn):
+            raise RuntimeError("speech_bubble 插件未加载")
+        fn(str(c.get("text", "")), int(c.get("seconds", 5)))
+        return None
+
+    def skin(c):
+        for pet in pets():
+            s = pet.settings.to_dict()
+            s["character"] = c.get("character", s["character"])
+            s["skin"] = c.get("skin", s["skin"])
+            pet.apply_settings(s)
+        return {"character": pets()[0].character_name, "skin": pets()[0].skin_name}
+
+    def size(c):
+        for pet in pets():
+            pet.set_pet_size(int(c["size"]))
+        return pets()[0].pet_width
+
+    def reload(_c):
+        from Settings.settings_store import load_settings
+
+        pets()[0].apply_settings(load_settings().to_dict())
+        return None
+
+    def ping(_c):
+        return {"pid": os.getpid(), "pets": len(pets())}
+
+    def stats(_c):
+        return pets()[0].metrics.snapshot()
+
+    def quit_(_c):
+        QTimer.singleShot(0, QApplication.quit)  # 先把回复写出去
+        return None
+
+    return {
+        "show": show,
+        "say": say,
+        "skin": skin,
+        "size": size,
+        "reload": reload,
+        "ping": ping,
+        "stats": stats,
+        "quit": quit_,
+    }
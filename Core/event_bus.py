@@ -0,0 +1,251 @@
+# Core/event_bus.py
+"""
+桌宠事件总线（插件通过 ctx.events / PluginBase.subscribe 使用）：
+- 事件是下面这些 dataclass，按类型订阅（订阅 PetEvent 收全部）
+- publish 只入队，每个帧 tick 末尾统一送达一次；tick 之外发布的事件搭下一次唤醒送达
+- 每个订阅方（插件 id）每 tick 有时间预算：超支的部分记成欠账，还清之前事件先积压，
+  积压期间 coalesce 类事件（帧 tick、移动、拖拽）只留最新一个 -> 慢插件自动降采样，不拖住渲染
+"""
+from __future__ import annotations
+
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Deque, Dict, List, Tuple, Type
+
+from Core.tracing import tracer
+
+# 每个订阅方每 tick 可用的回调时间
+DEFAULT_BUDGET_MS = 2.0
+# 不可合并的事件最多积压多少个（超出丢最旧的）
+DEFAULT_MAX_PENDING = 256
+
+
+@dataclass
+class PetEvent:
+    # True：订阅方积压时同类事件只保留最新一个
+    coalesce: ClassVar[bool] = False
+
+
+@dataclass
+class FrameTick(PetEvent):
+    coalesce: ClassVar[bool] = True
+    now_ms: float
+    state: str
+    frame: int
+
+
+@dataclass
+class StateChanged(PetEvent):
+    old: str
+    new: str
+    animation: str
+
+
+@dataclass
+class PetMoved(PetEvent):
+    """走动（按帧积分的水平移动）"""
+
+    coalesce: ClassVar[bool] = True
+    x: int
+    y: int
+    direction: int
+
+
+@dataclass
+class PetDragged(PetEvent):
+    coalesce: ClassVar[bool] = True
+    x: int
+    y: int
+
+
+@dataclass
+class DragFinished(PetEvent):
+    x: int
+    y: int
+
+
+@dataclass
+class PetResized(PetEvent):
+    """缩放（滚轮/设置/命令）"""
+
+    old_size: int
+    new_size: int
+
+
+@dataclass
+class SettingsChanged(PetEvent):
+    changed: Dict[str, Tuple[Any, Any]]  # {字段: (旧值, 新值)}
+
+
+class _Subscription:
+    __slots__ = ("event_type", "callback", "owner")
+
+    def __init__(self, event_type: Type[PetEvent], callback: Callable[[PetEvent], None], owner: "_Owner") -> None:
+        self.event_type = event_type
+        self.callback = callback
+        self.owner = owner
+
+
+class _Owner:
+    """一个订阅方（通常是一个插件）的队列、欠账和计数"""
+
+    __slots__ = ("name", "queue", "debt_ms", "delivered", "busy_ms", "max_ms", "overruns", "deferred_ticks", "sampled", "dropped")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.queue: Deque[Tuple[_Subscription, PetEvent]] = deque()
+        self.debt_ms = 0.0
+        self.delivered = 0
+        self.busy_ms = 0.0
+        self.max_ms = 0.0  # 单个 tick 里花得最多的一次
+        self.overruns = 0  # 超出预算的 tick 数
+        self.deferred_ticks = 0  # 因欠账整 tick 没送达的次数
+        self.sampled = 0  # 积压时被新事件替换掉的 coalesce 事件
+        self.dropped = 0  # 积压超过上限丢掉的事件
+
+
+class EventBus:
+    def __init__(
+        self,
+        scheduler=None,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        latency_ms: int = 16,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.max_pending = max_pending
+        self._subs: List[_Subscription] = []
+        self._owners: Dict[str, _Owner] = {}
+        self._wants: Dict[type, bool] = {}
+        self._dispatching = False
+        self.batching = False  # 帧 tick 进行中：发布的事件等 tick 末尾的 dispatch 一起送达
+        self._latency_ms = latency_ms
+        self._job = None
+        if scheduler is not None:
+            # tick 之外发布的事件：晚一点送达无所谓，容差内正好搭下一帧的唤醒
+            self._job = scheduler.job("events.dispatch", self.dispatch, single_shot=True, tolerance_ms=latency_ms)
+
+    # ---------- 订阅 ----------
+
+    def subscribe(
+        self, event_type: Type[PetEvent], callback: Callable[[PetEvent], None], owner: str = "app"
+    ) -> Callable[[], None]:
+        """返回取消订阅的函数；同一个 owner 的所有订阅共用一份时间预算"""
+        if owner not in self._owners:
+            self._owners[owner] = _Owner(owner)
+        sub = _Subscription(event_type, callback, self._owners[owner])
+        self._subs.append(sub)
+        self._wants.clear()
+
+        def unsubscribe() -> None:
+            if sub in self._subs:
+                self._subs.remove(sub)
+                self._wants.clear()
+                queue = sub.owner.queue
+                for entry in [e for e in queue if e[0] is sub]:
+                    queue.remove(entry)
+
+        return unsubscribe
+
+    def wants(self, event_type: type) -> bool:
+        """有没有人订阅这类事件（热路径上先问一句，没人订阅就不构造事件）"""
+        wanted = self._wants.get(event_type)
+        if wanted is None:
+            wanted = self._wants[event_type] = any(issubclass(event_type, s.event_type) for s in self._subs)
+        return wanted
+
+    # ---------- 发布 / 送达 ----------
+
+    def publish(self, event: PetEvent) -> None:
+        if not self.wants(type(event)):
+            return
+        for sub in self._subs:
+            if not isinstance(event, sub.event_type):
+                continue
+            owner = sub.owner
+            queue = owner.queue
+            if event.coalesce:
+                for entry in queue:
+                    if entry[0] is sub and type(entry[1]) is type(event):
+                        queue.remove(entry)
+                        owner.sampled += 1
+                        break
+            elif len(queue) >= self.max_pending:
+                queue.popleft()
+                owner.dropped += 1
+            queue.append((sub, event))
+        if self._job is not None and not self.batching and not self._dispatching and not self._job.isActive():
+            self._job.start(0)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(o.queue) for o in self._owners.values())
+
+    def dispatch(self) -> int:
+        """送达积压的事件（帧 tick 末尾调用），返回送达个数"""
+        if self._dispatching:
+            return 0
+        if self._job is not None:
+            self._job.stop()
+        self._dispatching = True
+        delivered = 0
+        try:
+            for owner in list(self._owners.values()):
+                if owner.debt_ms > 0:
+                    # 上次超支：先还账，这段时间的事件留在队列里（coalesce 类只留最新）
+                    owner.debt_ms = max(0.0, owner.debt_ms - self.budget_ms)
+                    if owner.queue:
+                        owner.deferred_ticks += 1
+                    continue
+                if not owner.queue:
+                    continue
+                delivered += self._deliver(owner)
+        finally:
+            self._dispatching = False
+        if self._job is not None and self.pending and not self.batching:
+            self._job.start(self._latency_ms)  # 推迟的事件：下一帧再试（帧时钟在走时由 tick 末尾送达）
+        return delivered
+
+    def _deliver(self, owner: _Owner) -> int:
+        started = time.perf_counter()
+        spent = 0.0
+        count = 0
+        with tracer.span("events.deliver", cat="plugins", owner=owner.name):
+            while owner.queue and spent < self.budget_ms:
+                sub, event = owner.queue.popleft()
+                try:
+                    sub.callback(event)
+                except Exception:
+                    print(f"[events] {owner.name} 处理 {type(event).__name__} 失败：\n{traceback.format_exc()}")
+                count += 1
+                spent = (time.perf_counter() - started) * 1000.0
+        owner.delivered += count
+        owner.busy_ms += spent
+        owner.max_ms = max(owner.max_ms, spent)
+        if spent > self.budget_ms:
+            owner.overruns += 1
+            owner.debt_ms = spent - self.budget_ms
+        return count
+
+    # ---------- 报告 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscriptions": len(self._subs),
+            "budget_ms": self.budget_ms,
+            "owners": {
+                o.name: {
+                    "pending": len(o.queue),
+                    "delivered": o.delivered,
+                    "busy_ms": o.busy_ms,
+                    "max_ms": o.max_ms,
+                    "overruns": o.overruns,
+                    "deferred_ticks": o.deferred_ticks,
+                    "sampled": o.sampled,
+                    "dropped": o.dropped,
+                }
+                for o in self._owners.values()
+            },
+        }
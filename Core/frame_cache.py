@@ -0,0 +1,77 @@
+# Core/frame_cache.py
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PyQt5.QtGui import QPixmap
+
+
+def pixmap_bytes(pm: QPixmap) -> int:
+    """估算一张 pixmap 占用的像素内存"""
+    if pm is None or pm.isNull():
+        return 0
+    return pm.width() * pm.height() * max(pm.depth(), 8) // 8
+
+
+class ScaledFrameCache:
+    """
+    缩放/翻转之后的帧缓存（派生缓存），避免每个 tick 都重新 scaled()/transformed()。
+
+    动画是循环播放的：一旦工作集超过预算，LRU 会每次都淘汰“下一帧”，命中率为 0。
+    所以这里采用“装满即止”：预算用完后新帧照常现算，但不再入缓存。
+    """
+
+    def __init__(self, budget_bytes: int = 96 * 1024 * 1024) -> None:
+        self.budget_bytes = budget_bytes
+        self._items: Dict[Hashable, QPixmap] = {}
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, factory: Callable[[], QPixmap]) -> QPixmap:
+        pm = self._items.get(key)
+        if pm is not None:
+            self.hits += 1
+            return pm
+
+        self.misses += 1
+        pm = factory()
+        cost = pixmap_bytes(pm)
+        if self.bytes_used + cost <= self.budget_bytes:
+            self._items[key] = pm
+            self.bytes_used += cost
+        return pm
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> None:
+        """删除满足 predicate(key) 的条目；不传则全部清空"""
+        if predicate is None:
+            self._items.clear()
+            self.bytes_used = 0
+            return
+        for key in [k for k in self._items if predicate(k)]:
+            self.bytes_used -= pixmap_bytes(self._items.pop(key))
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def bytes_by(self, group: Callable[[Hashable], Any]) -> Dict[Any, int]:
+        """按 group(key) 汇总缓存占用，用于内存报告"""
+        out: Dict[Any, int] = {}
+        for key, pm in self._items.items():
+            g = group(key)
+            out[g] = out.get(g, 0) + pixmap_bytes(pm)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "bytes": self.bytes_used,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
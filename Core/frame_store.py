@@ -0,0 +1,124 @@
+# Core/frame_store.py
+from __future__ import annotations
+
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from Core.frame_cache import ScaledFrameCache, pixmap_bytes
+from Core.timeline import DecodedFrame, FrameTimeline, build_timeline, decode_frame
+
+# (角色, 皮肤, 动画目录, 折叠阈值)
+AnimationKey = Tuple[str, str, str, int]
+# (角色, 皮肤, 宽, 高)：哪些缩放结果还有桌宠在用
+ScaledUsage = Tuple[str, str, int, int]
+
+
+@dataclass(eq=False)
+class SharedAnimation:
+    """一段已解码的动画；同进程内所有同皮肤的桌宠共用同一个对象"""
+
+    key: AnimationKey
+    decoded: List[DecodedFrame]
+    timeline: FrameTimeline
+    stamps: Tuple[Tuple[str, int, int], ...] = field(default_factory=tuple)
+
+    def nbytes(self) -> int:
+        return sum(pixmap_bytes(d.pixmap) for d in self.decoded)
+
+
+class FrameStore:
+    """
+    进程内共享的帧仓库：
+    - 已解码动画按 (角色, 皮肤, 动画, 阈值) 去重，弱引用持有——最后一只桌宠放手即释放
+    - 缩放/翻转结果放在同一个 ScaledFrameCache 里，key 带上角色和皮肤；
+      某个 (皮肤, 尺寸) 不再有桌宠使用时才把对应条目清掉
+    """
+
+    def __init__(self) -> None:
+        self._animations: "weakref.WeakValueDictionary[AnimationKey, SharedAnimation]" = (
+            weakref.WeakValueDictionary()
+        )
+        self.scaled = ScaledFrameCache()
+        self._usage: Counter = Counter()
+        self.loads = 0
+        self.shared_hits = 0
+
+    def get(self, key: AnimationKey) -> Optional[SharedAnimation]:
+        return self._animations.get(key)
+
+    def load(
+        self,
+        key: AnimationKey,
+        entries: Sequence[Tuple[str, int, int]],
+        reuse: Iterable[DecodedFrame] = (),
+    ) -> Tuple[SharedAnimation, int]:
+        """
+        取 key 对应的动画：已有且文件戳一致就直接共用；
+        否则按 (路径, 文件戳) 复用已有帧，只解码新增/改动的文件。返回 (动画, 新解码帧数)。
+        """
+        stamps = tuple((p, size, mtime) for p, size, mtime in entries)
+        current = self._animations.get(key)
+        if current is not None and current.stamps == stamps:
+            self.shared_hits += 1
+            return current, 0
+
+        old: Dict[str, DecodedFrame] = {}
+        for d in list(reuse) + (current.decoded if current is not None else []):
+            old.setdefault(d.path, d)
+        decoded, decoded_count = [], 0
+        for path, size, mtime in stamps:
+            d = old.get(path)
+            if d is None or d.stamp != (size, mtime):
+                d = decode_frame(path, (size, mtime), tolerance=key[3])
+                decoded_count += 1
+            if d is not None:
+                decoded.append(d)
+        anim = SharedAnimation(key, decoded, build_timeline(decoded, tolerance=key[3]), stamps)
+        self._animations[key] = anim
+        self.loads += 1
+        if current is not None:
+            # 旧版本的缩放结果不能再用（下标对应的画面变了）
+            self.scaled.invalidate(lambda k, c=key: k[:3] == c[:3])
+        return anim, decoded_count
+
+    # ---------- 缩放缓存的使用登记 ----------
+
+    def use_scaled(self, old: Optional[ScaledUsage], new: Optional[ScaledUsage]) -> None:
+        """桌宠换皮肤/尺寸时登记；没人再用的 (皮肤, 尺寸) 缩放结果立即清掉"""
+        if old == new:
+            return
+        if new is not None:
+            self._usage[new] += 1
+        if old is not None:
+            self._usage[old] -= 1
+            if self._usage[old] <= 0:
+                del self._usage[old]
+                self.scaled.invalidate(lambda k, u=old: (k[0], k[1], k[4], k[5]) == u)
+
+    def stats(self) -> Dict[str, Any]:
+        anims = list(self._animations.values())
+        return {
+            "animations": len(anims),
+            "decoded_bytes": sum(a.nbytes() for a in anims),
+            "loads": self.loads,
+            "shared_hits": self.shared_hits,
+            "scaled_users": {f"{c}/{s}@{w}x{h}": n for (c, s, w, h), n in self._usage.items()},
+        }
+
+
+_store: Optional[FrameStore] = None
+
+
+def get_frame_store() -> FrameStore:
+    """进程内共享的帧仓库"""
+    global _store
+    if _store is None:
+        _store = FrameStore()
+    return _store
+
+
+def scaled_key(character: str, skin: str, state: str, idx: int, w: int, h: int, direction: int) -> Hashable:
+    """缩放缓存的 key：(角色, 皮肤, 动画, 下标, 宽, 高, 方向)"""
+    return (character, skin, state, idx, w, h, direction)
@@ -0,0 +1,215 @@
+# Core/input_replay.py
+from __future__ import annotations
+
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QEvent, QObject, QPoint, QPointF, Qt
+
+from Core.asset_index import CACHE_DIR
+from Core.simulation import PetSimulation
+
+RECORDING_DIR = CACHE_DIR / "recordings"
+RECORDING_VERSION = 1
+
+# 录制的事件类型 -> (文件里的短名, 桌宠上的处理函数)
+_KINDS = {
+    QEvent.Enter: ("enter", "enterEvent"),
+    QEvent.Leave: ("leave", "leaveEvent"),
+    QEvent.MouseButtonPress: ("press", "mousePressEvent"),
+    QEvent.MouseMove: ("move", "mouseMoveEvent"),
+    QEvent.MouseButtonRelease: ("release", "mouseReleaseEvent"),
+    QEvent.Wheel: ("wheel", "wheelEvent"),
+}
+_HANDLERS = {short: handler for short, handler in _KINDS.values()}
+
+
+class InputRecorder(QObject):
+    """
+    事件过滤器：记录桌宠窗口收到的鼠标/滚轮/悬停事件（不拦截，照常分发）。
+    每条事件存成紧凑数组：[t_ms, kind, x, y, gx, gy, button, buttons, delta]
+    """
+
+    def __init__(self, pet) -> None:
+        super().__init__(pet)
+        self._pet = pet
+        self._t0 = 0.0
+        self._events: List[list] = []
+        self._start_state: Dict[str, Any] = {}
+        self.recording = False
+
+    def start(self) -> None:
+        pet = self._pet
+        self._events = []
+        self._start_state = {
+            "character": pet.character_name,
+            "skin": pet.skin_name,
+            "pet_size": pet.pet_width,
+            "fps": pet.settings.fps,
+            "pos": [pet.x(), pet.y()],
+        }
+        self._t0 = time.perf_counter()
+        self.recording = True
+        pet.installEventFilter(self)
+
+    def stop(self) -> Dict[str, Any]:
+        if self.recording:
+            self._pet.removeEventFilter(self)
+            self.recording = False
+        return self.to_dict()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def eventFilter(self, obj, event) -> bool:
+        kind = _KINDS.get(event.type())
+        if kind is not None:
+            t = round((time.perf_counter() - self._t0) * 1000.0, 2)
+            row = [t, kind[0], 0, 0, 0, 0, 0, 0, 0]
+            if event.type() in (QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.MouseButtonRelease):
+                row[2:8] = [
+                    event.x(), event.y(), event.globalX(), event.globalY(),
+                    int(event.button()), int(event.buttons()),
+                ]
+            elif event.type() == QEvent.Wheel:
+                p, g = event.position(), event.globalPosition()
+                row[2:9] = [
+                    int(p.x()), int(p.y()), int(g.x()), int(g.y()),
+                    0, int(event.buttons()), event.angleDelta().y(),
+                ]
+            self._events.append(row)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": RECORDING_VERSION, "start": self._start_state, "events": self._events}
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """写出录制文件，返回路径（默认 .cache/recordings/input-时间.json）"""
+        if path is None:
+            path = RECORDING_DIR / time.strftime("input-%Y%m%d-%H%M%S.json")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+        return path
+
+
+def load_recording(path) -> Dict[str, Any]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != RECORDING_VERSION:
+        raise ValueError(f"不支持的录制文件版本：{data.get('version')}")
+    return data
+
+
+def _make_event(row: list):
+    from PyQt5.QtGui import QMouseEvent, QWheelEvent
+
+    _t, kind, x, y, gx, gy, button, buttons, delta = row
+    if kind == "enter":
+        return QEvent(QEvent.Enter)
+    if kind == "leave":
+        return QEvent(QEvent.Leave)
+    if kind == "wheel":
+        return QWheelEvent(
+            QPointF(x, y), QPointF(gx, gy), QPoint(0, 0), QPoint(0, delta),
+            Qt.MouseButtons(buttons), Qt.NoModifier, Qt.NoScrollPhase, False,
+        )
+    etype = {"press": QEvent.MouseButtonPress, "move": QEvent.MouseMove, "release": QEvent.MouseButtonRelease}[kind]
+    return QMouseEvent(
+        etype, QPointF(x, y), QPointF(gx, gy),
+        Qt.MouseButton(button), Qt.MouseButtons(buttons), Qt.NoModifier,
+    )
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    s = sorted(samples)
+    return {
+        "count": len(s),
+        "mean_ms": statistics.fmean(s),
+        "p95_ms": s[min(len(s) - 1, int(len(s) * 0.95))],
+        "max_ms": s[-1],
+        "total_ms": sum(s),
+    }
+
+
+def replay(
+    pet,
+    recording: Dict[str, Any],
+    seed: int = 0,
+    overrides: Optional[Dict[str, Any]] = None,
+    tail_ms: int = 500,
+) -> Dict[str, Any]:
+    """
+    在虚拟时钟上按录制时间重放输入：动画/行为定时器走 PetSimulation（固定种子、真实渲染），
+    输入事件直接调用对应处理函数并计时。同一录制 + 同一种子 = 同一执行路径。
+    overrides 可覆盖起始状态（如 {"pet_size": 700}），便于做前后对比。
+    右键按下会弹出模态菜单，重放时跳过。
+    """
+    start = dict(recording.get("start") or {})
+    start.update(overrides or {})
+    settings = pet.settings.to_dict()
+    for key in ("character", "skin", "pet_size", "fps"):
+        if key in start:
+            settings[key] = start[key]
+    pet.apply_settings(settings)
+    if "pos" in start:
+        pet.move(*start["pos"])
+
+    sim = PetSimulation(pet, seed=seed, render=True, time_ticks=True)
+    # 滚轮缩放会写回配置；重放不应改写用户配置
+    pet._owns_config = False
+    events = recording.get("events") or []
+    timings: Dict[str, List[float]] = {}
+    skipped = 0
+    cursor = 0
+
+    flushes0, flush_ms0 = pet.metrics.input_flushes, pet.metrics.input_flush_ms
+    feeder = pet.scheduler.job("replay.feed", single_shot=True)
+
+    def feed() -> None:
+        nonlocal skipped, cursor
+        now = sim.clock.now_ms
+        while cursor < len(events) and events[cursor][0] <= now:
+            row = events[cursor]
+            cursor += 1
+            if row[1] == "press" and row[6] == int(Qt.RightButton):
+                skipped += 1
+                continue
+            handler = getattr(pet, _HANDLERS[row[1]])
+            ev = _make_event(row)
+            t0 = time.perf_counter()
+            handler(ev)
+            timings.setdefault(_HANDLERS[row[1]], []).append((time.perf_counter() - t0) * 1000.0)
+        if cursor < len(events):
+            feeder.start(max(0, math.ceil(events[cursor][0] - now)))
+
+    feeder.timeout.connect(feed)
+    if events:
+        feeder.start(math.ceil(events[0][0]))
+    duration_ms = (events[-1][0] if events else 0) + tail_ms
+
+    wall0 = time.perf_counter()
+    sim.clock.run_until(duration_ms)
+    wall_ms = (time.perf_counter() - wall0) * 1000.0
+
+    return {
+        "seed": seed,
+        "start": start,
+        "events": len(events),
+        "skipped": skipped,
+        "virtual_ms": duration_ms,
+        "wall_ms": wall_ms,
+        "handlers": {name: _stats(v) for name, v in sorted(timings.items())},
+        "ticks": _stats(sim.tick_ms),
+        # 拖拽/缩放合并后真正落地的次数与耗时（含 tick、松手时顺带落地的）
+        "input_flush": {
+            "count": pet.metrics.input_flushes - flushes0,
+            "total_ms": pet.metrics.input_flush_ms - flush_ms0,
+        },
+        "frame_cache": pet.frame_cache.stats(),
+    }
@@ -0,0 +1,168 @@
+# Core/memory_report.py
+from __future__ import annotations
+
+import ctypes
+import gc
+import os
+import sys
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from Core.frame_cache import pixmap_bytes
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    """当前进程常驻内存；拿不到时返回 0"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil  # 可选依赖（Windows/macOS）
+
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+def pss_bytes() -> int:
+    """按比例分摊共享页后的内存（多进程共享帧时用它比 RSS 准）；非 Linux 退回 RSS"""
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return rss_bytes()
+
+
+def release_free_heap() -> bool:
+    """
+    把 malloc 已释放但仍占着的内存还给系统（仅 glibc）。
+    大皮肤切到小皮肤后，不做这一步 RSS 会一直停在高位，看起来像泄漏。
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        return bool(ctypes.CDLL("libc.so.6").malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+
+def memory_report(pet) -> Dict[str, Any]:
+    """按 角色/皮肤/状态 拆分已解码帧的内存，并列出派生缓存"""
+    skin_key = f"{getattr(pet, 'character_name', '?')}/{getattr(pet, 'skin_name', '?')}"
+    states: Dict[str, Dict[str, int]] = {}
+    for state, decoded in pet._decoded.items():
+        timeline = pet.timelines.get(state)
+        states[state] = {
+            "files": len(decoded),
+            "unique_frames": len(timeline) if timeline else 0,
+            "decoded_bytes": sum(pixmap_bytes(d.pixmap) for d in decoded),
+        }
+    skin_total = sum(s["decoded_bytes"] for s in states.values())
+
+    # 缩放缓存由同进程的桌宠共用，key 为 (角色, 皮肤, 动画, ...)
+    cache = pet.frame_cache
+    label_pm = pet.label.pixmap()
+    caches = {
+        "frame_cache": dict(cache.stats(), by_state=cache.bytes_by(lambda key: f"{key[0]}/{key[1]}/{key[2]}")),
+        "label_pixmap_bytes": pixmap_bytes(label_pm) if label_pm is not None else 0,
+    }
+    return {
+        "process": {"rss_bytes": rss_bytes()},
+        "skins": {skin_key: {"states": states, "total_bytes": skin_total}},
+        "caches": caches,
+        "total_frame_bytes": skin_total + cache.bytes_used + caches["label_pixmap_bytes"],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"进程常驻内存：{report['process']['rss_bytes'] / MB:.1f} MB"]
+    for skin, info in report["skins"].items():
+        lines.append(f"\n[{skin}]  {info['total_bytes'] / MB:.1f} MB")
+        for state, s in info["states"].items():
+            lines.append(
+                f"  {state:<9} {s['files']:>4} 帧（{s['unique_frames']} 个不同画面）"
+                f"  {s['decoded_bytes'] / MB:>7.1f} MB"
+            )
+    fc = report["caches"]["frame_cache"]
+    lines.append(
+        f"\n缩放缓存：{fc['entries']} 项  {fc['bytes'] / MB:.1f}/{fc['budget_bytes'] / MB:.0f} MB"
+        f"  命中率 {fc['hit_rate'] * 100:.0f}%"
+    )
+    for state, b in fc["by_state"].items():
+        lines.append(f"  {state:<9} {b / MB:>7.1f} MB")
+    lines.append(f"当前贴图：{report['caches']['label_pixmap_bytes'] / MB:.1f} MB")
+    lines.append(f"帧相关合计：{report['total_frame_bytes'] / MB:.1f} MB")
+    return "\n".join(lines)
+
+
+def _settle(process_events: Optional[Callable[[], None]]) -> int:
+    if process_events is not None:
+        process_events()
+    gc.collect()
+    release_free_heap()
+    return rss_bytes()
+
+
+def stress_reload(
+    pet,
+    cycles: int = 3,
+    skins: Optional[Iterable[Tuple[str, str]]] = None,
+    tolerance_bytes: Optional[int] = None,
+    process_events: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """
+    反复切换所有皮肤 cycles 轮，每轮结束切回原皮肤后采样 RSS：
+    - 先完整预热一轮再取基线（首次加载会让分配器/Qt 内部缓存长到稳定大小）
+    - 对基线时的旧帧挂弱引用，最后检查有没有“切走后仍然活着”的帧
+    返回 {"baseline_bytes", "samples", "growth_bytes", "lingering_frames", "leaked", ...}
+    """
+    from Core.asset_index import get_asset_index
+
+    original = pet.settings.to_dict()
+    if skins is None:
+        index = get_asset_index()
+        index.refresh(deep=False)
+        skins = [(c, s) for c in index.characters() for s in index.skins(c)]
+    skins = list(skins)
+
+    def cycle() -> None:
+        for character, skin in skins:
+            pet.apply_settings(dict(original, character=character, skin=skin))
+            pet.updateAnimation()
+            if process_events is not None:
+                process_events()
+        pet.apply_settings(dict(original))
+        pet.updateAnimation()
+
+    cycle()  # 预热
+    baseline = _settle(process_events)
+    old_frames: List[weakref.ref] = [
+        weakref.ref(d.pixmap) for frames in pet._decoded.values() for d in frames
+    ]
+
+    samples: List[int] = []
+    for _ in range(max(1, cycles)):
+        cycle()
+        samples.append(_settle(process_events))
+
+    lingering = sum(1 for r in old_frames if r() is not None)
+    growth = samples[-1] - baseline
+    if tolerance_bytes is None:
+        tolerance_bytes = max(16 * MB, baseline // 10)
+    return {
+        "skins": [f"{c}/{s}" for c, s in skins],
+        "cycles": len(samples),
+        "baseline_bytes": baseline,
+        "samples": samples,
+        "growth_bytes": growth,
+        "tolerance_bytes": tolerance_bytes,
+        "lingering_frames": lingering,
+        "leaked": growth > tolerance_bytes or lingering > 0,
+    }
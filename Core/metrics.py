@@ -0,0 +1,160 @@
+# Core/metrics.py
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Tuple
+
+# 帧耗时直方图的桶上界（ms）；最后一个桶收所有更慢的
+FRAME_BUCKETS_MS: Tuple[float, ...] = (0.5, 1, 2, 4, 8, 16, 33, 50, 100)
+
+
+class Histogram:
+    def __init__(self, bounds: Tuple[float, ...] = FRAME_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """按桶估算分位数（返回桶上界，超出最后一个桶时返回观测到的最大值）"""
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}ms" for b in self.bounds] + [f">{self.bounds[-1]:g}ms"]
+        return {
+            "count": self.total,
+            "mean_ms": self.sum_ms / self.total if self.total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PetMetrics:
+    """
+    桌宠运行时计数器：只做加法和比较，热路径上每 tick 只多两次 perf_counter。
+    - tick：帧耗时直方图、迟到/丢弃的 tick
+    - move：走动一步的耗时
+    - decode：解码帧数与耗时
+    - input：攒下的拖拽/缩放真正落地的次数与耗时（定时落地和 tick/松手时顺带落地都算）
+    - gauges：按需读取的实时值（缓存命中率、常驻帧字节……），snapshot 时才计算
+    插件通过 ctx.services["metrics"] / ctx.services["metrics.snapshot"] 读取。
+    """
+
+    def __init__(self) -> None:
+        self.gauges: Dict[str, Callable[[], Any]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.perf_counter()
+        self.tick_hist = Histogram()
+        self.move_hist = Histogram()
+        self.ticks = 0
+        self.late_ticks = 0
+        self.dropped_ticks = 0
+        self.decoded_frames = 0
+        self.decode_ms = 0.0
+        self.loads = 0
+        self.last_load_ms = 0.0
+        self.input_flushes = 0
+        self.input_flush_ms = 0.0
+        self._tick_due = None  # 下一次 tick 的预期时间点（perf_counter 秒）
+        self._tick_interval = 0.0
+
+    # ---------- 记录 ----------
+
+    def expect_tick(self, interval_ms: float) -> None:
+        """帧时钟排好下一次 tick 时调用，用于判断下一次是否迟到"""
+        self._tick_interval = interval_ms / 1000.0
+        self._tick_due = time.perf_counter() + self._tick_interval
+
+    def record_tick(self, started: float, frame_interval_ms: float) -> None:
+        """started：本次 tick 开始时的 perf_counter()"""
+        self.ticks += 1
+        self.tick_hist.add((time.perf_counter() - started) * 1000.0)
+        if self._tick_due is None:
+            return
+        late = started - self._tick_due
+        frame = max(frame_interval_ms / 1000.0, 1e-3)
+        # 晚了半帧以上算迟到；每多晚一整帧记一次“丢帧”
+        if late > frame * 0.5:
+            self.late_ticks += 1
+            self.dropped_ticks += int(late // frame)
+        self._tick_due = None
+
+    def record_move(self, started: float) -> None:
+        self.move_hist.add((time.perf_counter() - started) * 1000.0)
+
+    def record_decode(self, frames: int, ms: float) -> None:
+        self.decoded_frames += frames
+        self.decode_ms += ms
+
+    def record_load(self, ms: float) -> None:
+        self.loads += 1
+        self.last_load_ms = ms
+
+    def record_input_flush(self, started: float) -> None:
+        self.input_flushes += 1
+        self.input_flush_ms += (time.perf_counter() - started) * 1000.0
+
+    # ---------- 读取 ----------
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap: Dict[str, Any] = {
+            "uptime_s": time.perf_counter() - self.started,
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "dropped_ticks": self.dropped_ticks,
+            "tick": self.tick_hist.to_dict(),
+            "move": self.move_hist.to_dict(),
+            "decode": {
+                "frames": self.decoded_frames,
+                "total_ms": self.decode_ms,
+                "per_frame_ms": self.decode_ms / self.decoded_frames if self.decoded_frames else 0.0,
+            },
+            "input_flush": {"count": self.input_flushes, "total_ms": self.input_flush_ms},
+            "skin_loads": self.loads,
+            "last_load_ms": self.last_load_ms,
+        }
+        for name, fn in self.gauges.items():
+            try:
+                snap[name] = fn()
+            except Exception as e:  # gauge 出错不影响其它指标
+                snap[name] = f"error: {e}"
+        return snap
+
+    def summary_lines(self) -> List[str]:
+        """给 HUD 用的几行短文本"""
+        s = self.snapshot()
+        tick = s["tick"]
+        lines = [
+            f"tick {tick['mean_ms']:.2f}ms p95<={tick['p95_ms']:g}ms max {tick['max_ms']:.1f}ms",
+            f"ticks {s['ticks']}  late {s['late_ticks']}  drop {s['dropped_ticks']}",
+        ]
+        cache = s.get("frame_cache")
+        if isinstance(cache, dict):
+            lines.append(
+                f"cache {cache['hit_rate'] * 100:.0f}% hit  {cache['bytes'] / 1048576:.1f}MB"
+            )
+        frames = s.get("resident_frame_bytes")
+        if isinstance(frames, int):
+            lines.append(f"frames {frames / 1048576:.1f}MB  decode {s['decode']['per_frame_ms']:.2f}ms/f")
+        return lines
@@ -0,0 +1,46 @@
+# Core/metrics_hud.py
+from __future__ import annotations
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QLabel
+
+from Core.metrics import PetMetrics
+
+
+class MetricsHud(QLabel):
+    """贴在桌宠左上角的小性能面板；只在显示时才定时刷新（有调度器时搭帧时钟的唤醒）"""
+
+    def __init__(self, metrics: PetMetrics, parent=None, refresh_ms: int = 500, scheduler=None) -> None:
+        super().__init__(parent)
+        self._metrics = metrics
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        font = QFont("monospace")
+        font.setStyleHint(QFont.TypeWriter)
+        font.setPointSize(8)
+        self.setFont(font)
+        self.setStyleSheet(
+            "QLabel{background: rgba(0,0,0,150); color: #7CFC00; padding: 3px; border-radius: 4px;}"
+        )
+        if scheduler is not None:
+            self._timer = scheduler.job("hud.refresh", self.refresh, interval_ms=refresh_ms, tolerance_ms=100)
+        else:
+            self._timer = QTimer(self)
+            self._timer.setInterval(refresh_ms)
+            self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def refresh(self) -> None:
+        self.setText("\n".join(self._metrics.summary_lines()))
+        self.adjustSize()
+        self.move(4, 4)
+        self.raise_()
+
+    def set_enabled(self, on: bool) -> None:
+        if on:
+            self.refresh()
+            self.show()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self.hide()
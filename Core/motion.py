@@ -0,0 +1,130 @@
+# Core/motion.py
+from __future__ import annotations
+
+import math
+from typing import Callable, List, Optional, Tuple
+
+from PyQt5.QtCore import QPoint, QRect
+from PyQt5.QtGui import QGuiApplication
+
+# 设置里的 speed 沿用旧语义“每帧像素数（按 30fps 计）”，换算成 px/s 后就和实际 fps 无关了
+LEGACY_SPEED_FPS = 30
+# 单步最长积分时间：拖拽/悬停/卡顿之后恢复走动时不会一下子跳出去很远
+MAX_STEP_MS = 100.0
+
+
+def speed_to_px_per_s(speed: float) -> float:
+    return float(speed) * LEGACY_SPEED_FPS
+
+
+class ScreenTopology:
+    """
+    缓存所有屏幕的可用区域；屏幕增删、分辨率/任务栏变化时由 Qt 信号触发刷新。
+    walk_bounds() 把同一水平带上相邻的屏幕拼成一段，桌宠可以跨显示器走。
+    """
+
+    def __init__(self) -> None:
+        self._screens: List[QRect] = []
+        self.version = 0
+        self.listeners: List[Callable[[], None]] = []
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.screenAdded.connect(self._on_screen_added)
+            app.screenRemoved.connect(lambda _screen: self.refresh())
+            app.primaryScreenChanged.connect(lambda _screen: self.refresh())
+            for screen in app.screens():
+                self._watch(screen)
+        self.refresh()
+
+    def _watch(self, screen) -> None:
+        screen.availableGeometryChanged.connect(lambda _rect: self.refresh())
+
+    def _on_screen_added(self, screen) -> None:
+        self._watch(screen)
+        self.refresh()
+
+    def refresh(self) -> None:
+        app = QGuiApplication.instance()
+        screens = [QRect(s.availableGeometry()) for s in app.screens()] if app is not None else []
+        self._screens = screens or [QRect(0, 0, 1920, 1080)]
+        self.version += 1
+        for listener in list(self.listeners):
+            listener()
+
+    @property
+    def screens(self) -> List[QRect]:
+        return list(self._screens)
+
+    @property
+    def primary(self) -> QRect:
+        app = QGuiApplication.instance()
+        screen = app.primaryScreen() if app is not None else None
+        return QRect(screen.availableGeometry()) if screen is not None else self._screens[0]
+
+    def available_at(self, point: QPoint) -> QRect:
+        """包含 point 的屏幕可用区域；都不包含时取最近的一块"""
+        for rect in self._screens:
+            if rect.contains(point):
+                return rect
+
+        def dist(rect: QRect) -> int:
+            dx = max(rect.left() - point.x(), 0, point.x() - rect.right())
+            dy = max(rect.top() - point.y(), 0, point.y() - rect.bottom())
+            return dx * dx + dy * dy
+
+        return min(self._screens, key=dist)
+
+    def walk_bounds(self, window: QRect) -> Tuple[int, int]:
+        """窗口沿水平方向能走的 [left, right)：纵向覆盖窗口中线、且左右相接的屏幕拼在一起"""
+        cy = window.center().y()
+        band = sorted(
+            (r for r in self._screens if r.top() <= cy <= r.bottom()), key=lambda r: r.left()
+        )
+        if not band:
+            rect = self.available_at(window.center())
+            return rect.left(), rect.left() + rect.width()
+        spans: List[List[int]] = []
+        for r in band:
+            left, right = r.left(), r.left() + r.width()
+            if spans and left <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], right)
+            else:
+                spans.append([left, right])
+        cx = window.center().x()
+        for left, right in spans:
+            if left <= cx < right:
+                return left, right
+        nearest = min(spans, key=lambda s: min(abs(cx - s[0]), abs(cx - s[1])))
+        return nearest[0], nearest[1]
+
+
+class MotionIntegrator:
+    """
+    按真实经过的时间推进水平位置：x += v * dt，小数部分累积下来，
+    只有整数像素变了才需要真正移动窗口。时间源由调用方传入（调度器时钟，模拟时为虚拟时间）。
+    """
+
+    def __init__(self, speed_px_s: float = 60.0) -> None:
+        self.speed_px_s = speed_px_s
+        self._x: Optional[float] = None
+        self._last_ms: Optional[float] = None
+
+    def reset(self, x: int, now_ms: float) -> None:
+        self._x = float(x)
+        self._last_ms = now_ms
+
+    def step(self, now_ms: float, current_x: int, direction: int, lo: int, hi: int) -> Tuple[int, int]:
+        """推进到 now_ms，返回 (新的整数 x, 方向)；碰到 [lo, hi] 边界会掉头"""
+        if self._x is None or self._last_ms is None or math.floor(self._x) != current_x:
+            # 第一次 / 窗口被拖动或缩放过：从实际位置重新起步
+            self.reset(current_x, now_ms)
+            return current_x, direction
+        dt = min(max(0.0, now_ms - self._last_ms), MAX_STEP_MS)
+        self._last_ms = now_ms
+        x = self._x + direction * self.speed_px_s * dt / 1000.0
+        if x <= lo:
+            x, direction = float(lo), 1
+        elif x >= hi:
+            x, direction = float(hi), -1
+        self._x = x
+        return math.floor(x), direction
@@ -0,0 +1,60 @@
+# Core/pet_host.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from Core.frame_store import get_frame_store
+from Core.memory_report import rss_bytes
+from Core.scheduler import Scheduler
+
+
+class PetHost:
+    """
+    一个进程里养 N 只桌宠：
+    - 共用一个调度器，动画 tick 对齐到同一帧网格 -> N 只桌宠每帧仍只唤醒一次
+    - 共用资源索引（get_asset_index 本来就是进程单例）和帧仓库（解码帧 + 缩放结果）
+    第一只桌宠读写 config.json 并加载插件，后面派生的只用一份内存里的设置副本。
+    """
+
+    def __init__(self) -> None:
+        self.scheduler = Scheduler()
+        self.pets: List[Any] = []
+
+    def spawn(self, overrides: Optional[Dict[str, Any]] = None, load_plugins: Optional[bool] = None):
+        from desktop_pet import DesktopPet
+        from Settings.settings_model import AppSettings
+        from Settings.settings_store import load_settings
+
+        first = not self.pets
+        settings = None
+        if not first or overrides:
+            data = load_settings().to_dict()
+            data.update(overrides or {})
+            settings = AppSettings.from_dict(data)
+        pet = DesktopPet(
+            scheduler=self.scheduler,
+            settings=settings,
+            load_plugins=first if load_plugins is None else load_plugins,
+        )
+        if not first:
+            # 错开摆放，免得叠在一起
+            rect = pet.screen_geometry
+            step = max(1, pet.pet_width // 2)
+            span = max(1, rect.width() - pet.pet_width)
+            pet.move(rect.left() + (pet.x() - rect.left() + step * len(self.pets)) % span, pet.y())
+        self.pets.append(pet)
+        return pet
+
+    def close_all(self) -> None:
+        for pet in self.pets:
+            pet.close()
+        self.pets = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pets": len(self.pets),
+            "rss_bytes": rss_bytes(),
+            "scheduler": self.scheduler.stats(),
+            "frame_store": get_frame_store().stats(),
+            "frame_cache": get_frame_store().scaled.stats(),
+        }
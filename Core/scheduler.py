@@ -0,0 +1,275 @@
+# Core/scheduler.py
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QTimer
+
+from Core.tracing import tracer
+
+
+class _Signal:
+    """和 pyqtSignal 用法一致的最小信号（connect/disconnect/emit）"""
+
+    def __init__(self) -> None:
+        self._slots: List[Callable] = []
+
+    def connect(self, slot: Callable) -> None:
+        self._slots.append(slot)
+
+    def disconnect(self, slot: Optional[Callable] = None) -> None:
+        self._slots = [] if slot is None else [s for s in self._slots if s != slot]
+
+    def emit(self, *args: Any) -> None:
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class QtClock:
+    """真实时钟：整个调度器只用这一个 QTimer 作为唤醒源"""
+
+    def __init__(self, parent=None) -> None:
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._callback: Optional[Callable[[], None]] = None
+        self._timer.timeout.connect(self._fire)
+
+    def now(self) -> float:
+        return time.monotonic() * 1000.0
+
+    def arm(self, at_ms: float, callback: Callable[[], None]) -> None:
+        self._callback = callback
+        self._timer.start(max(0, math.ceil(at_ms - self.now())))
+
+    def disarm(self) -> None:
+        self._timer.stop()
+
+    def _fire(self) -> None:
+        if self._callback is not None:
+            self._callback()
+
+
+class ScheduledJob:
+    """
+    调度器上的一个任务，接口和 QTimer 对齐（start/stop/setInterval/isActive/timeout），
+    原来用 QTimer 的代码基本不用改。
+    tolerance_ms：允许晚到的毫秒数，调度器会把容差窗口重叠的任务合并成一次唤醒。
+    """
+
+    def __init__(
+        self,
+        scheduler: "Scheduler",
+        name: str,
+        interval_ms: int = 0,
+        single_shot: bool = False,
+        tolerance_ms: int = 0,
+    ) -> None:
+        self._scheduler = scheduler
+        self.name = name
+        self._interval = int(interval_ms)
+        self._single = bool(single_shot)
+        self.tolerance_ms = max(0, int(tolerance_ms))
+        self.align_ms = 0  # >0 时到期时间向上对齐到该网格：多个同频任务落在同一次唤醒上
+        self._active = False
+        self._generation = 0
+        self.due_ms = 0.0
+        self.fired = 0
+        self.busy_ms = 0.0
+        self.timeout = _Signal()
+
+    # ---------- QTimer 兼容接口 ----------
+
+    def setInterval(self, ms: int) -> None:
+        self._interval = int(ms)
+        if self._active:
+            self.start()  # 与 QTimer 一致：运行中改间隔会重新计时
+
+    def interval(self) -> int:
+        return self._interval
+
+    def setSingleShot(self, single: bool) -> None:
+        self._single = bool(single)
+
+    def isSingleShot(self) -> bool:
+        return self._single
+
+    def isActive(self) -> bool:
+        return self._active
+
+    def remainingTime(self) -> int:
+        if not self._active:
+            return -1
+        return max(0, int(self.due_ms - self._scheduler.now()))
+
+    def start(self, ms: Optional[int] = None) -> None:
+        if ms is not None:
+            self._interval = int(ms)
+        self._active = True
+        self._scheduler._schedule(self, self._scheduler.now() + max(0, self._interval))
+
+    def stop(self) -> None:
+        self._generation += 1
+        self._active = False
+        self._scheduler._rearm()
+
+
+class Scheduler:
+    """
+    统一的定时调度：所有任务共用一个唤醒源。
+    每次唤醒的时间点取 min(到期 + 容差)，并顺带执行这时已经到期的全部任务，
+    于是 8 秒一次的行为判定、防抖保存、气泡关闭等都会“搭”动画帧的那次唤醒，不再单独叫醒进程。
+    clock 默认是真实时钟；模拟/重放时换成虚拟时钟（见 set_clock）。
+    """
+
+    def __init__(self, parent=None, clock=None) -> None:
+        self._clock = clock if clock is not None else QtClock(parent)
+        self._heap: List[Tuple[float, int, ScheduledJob, int]] = []
+        self._seq = itertools.count()
+        self._jobs: "weakref.WeakSet[ScheduledJob]" = weakref.WeakSet()
+        self._armed_at: Optional[float] = None
+        self.wakeups = 0
+        self.fires = 0
+        self.coalesced = 0  # 搭别的任务顺风车、没有单独唤醒的次数
+
+    @property
+    def clock(self):
+        return self._clock
+
+    def now(self) -> float:
+        return self._clock.now()
+
+    # ---------- 创建任务 ----------
+
+    def job(
+        self,
+        name: str,
+        callback: Optional[Callable[[], None]] = None,
+        interval_ms: int = 0,
+        single_shot: bool = False,
+        tolerance_ms: int = 0,
+    ) -> ScheduledJob:
+        """创建（但不启动）一个任务；调用方持有返回值，丢弃后任务随之回收"""
+        job = ScheduledJob(self, name, interval_ms, single_shot, tolerance_ms)
+        if callback is not None:
+            job.timeout.connect(callback)
+        self._jobs.add(job)
+        return job
+
+    def call_later(
+        self, delay_ms: int, callback: Callable[[], None], tolerance_ms: int = 0, name: str = "call_later"
+    ) -> ScheduledJob:
+        """一次性任务，不需要持有返回值（到期前由调度器保活）"""
+        job = self.job(name, callback, delay_ms, single_shot=True, tolerance_ms=tolerance_ms)
+        job.start()
+        return job
+
+    # ---------- 调度 ----------
+
+    def _schedule(self, job: ScheduledJob, due_ms: float) -> None:
+        if job.align_ms > 0:
+            due_ms = math.ceil(due_ms / job.align_ms) * job.align_ms
+        job._generation += 1
+        job.due_ms = due_ms
+        heapq.heappush(self._heap, (due_ms, next(self._seq), job, job._generation))
+        self._rearm()
+
+    def _pending(self) -> List[ScheduledJob]:
+        return [job for _due, _seq, job, gen in self._heap if gen == job._generation and job._active]
+
+    def _rearm(self) -> None:
+        pending = self._pending()
+        if not pending:
+            self._heap = []
+            if self._armed_at is not None:
+                self._clock.disarm()
+                self._armed_at = None
+            return
+        wake = min(job.due_ms + job.tolerance_ms for job in pending)
+        if wake != self._armed_at:
+            self._armed_at = wake
+            self._clock.arm(wake, self._wake)
+
+    def _wake(self) -> None:
+        self._armed_at = None
+        now = self.now()
+        due: List[Tuple[ScheduledJob, int]] = []
+        while self._heap and self._heap[0][0] <= now:
+            _due, _seq, job, gen = heapq.heappop(self._heap)
+            if gen == job._generation and job._active:
+                due.append((job, gen))
+        if due:
+            self.wakeups += 1
+            self.coalesced += len(due) - 1
+        with tracer.span("sched.wake", cat="timer", jobs=len(due)):
+            for job, gen in due:
+                if gen != job._generation or not job._active:
+                    continue  # 被同一批里先执行的任务停掉/重启了
+                self._run(job, now)
+        self._rearm()
+
+    def _run(self, job: ScheduledJob, now: float) -> None:
+        if job._single:
+            job._active = False
+            job._generation += 1
+        else:
+            # 周期任务按原节拍排下一次；落后太多就从现在重新计
+            nxt = job.due_ms + max(1, job._interval)
+            self._schedule(job, nxt if nxt > now else now + max(1, job._interval))
+        started = time.perf_counter()
+        try:
+            job.timeout.emit()
+        finally:
+            job.fired += 1
+            job.busy_ms += (time.perf_counter() - started) * 1000.0
+            self.fires += 1
+
+    # ---------- 时钟切换 / 报告 ----------
+
+    def set_clock(self, clock) -> None:
+        """换时钟（真实 <-> 虚拟），运行中的任务按剩余时间平移到新时钟上"""
+        now_old = self.now()
+        pending = self._pending()
+        if self._armed_at is not None:
+            self._clock.disarm()
+            self._armed_at = None
+        self._clock = clock
+        self._heap = []
+        now_new = self.now()
+        for job in pending:
+            self._schedule(job, now_new + max(0.0, job.due_ms - now_old))
+        self._rearm()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self._jobs),
+            "active": len(self._pending()),
+            "wakeups": self.wakeups,
+            "fires": self.fires,
+            "coalesced": self.coalesced,
+        }
+
+    def report(self) -> List[Dict[str, Any]]:
+        """所有任务的当前状态，按下次到期时间排序（未启动的排最后）"""
+        now = self.now()
+        rows = []
+        for job in list(self._jobs):
+            rows.append(
+                {
+                    "name": job.name,
+                    "active": job._active,
+                    "single_shot": job._single,
+                    "interval_ms": job._interval,
+                    "tolerance_ms": job.tolerance_ms,
+                    "due_in_ms": round(job.due_ms - now, 1) if job._active else None,
+                    "fired": job.fired,
+                    "busy_ms": round(job.busy_ms, 3),
+                }
+            )
+        rows.sort(key=lambda r: (r["due_in_ms"] is None, r["due_in_ms"] or 0.0, r["name"]))
+        return rows
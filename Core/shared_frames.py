@@ -0,0 +1,209 @@
+# Core/shared_frames.py
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5 import sip
+from PyQt5.QtCore import QSharedMemory
+from PyQt5.QtGui import QImage
+
+from Core.timeline import FrameTimeline
+
+SEGMENT_PREFIX = "desktop-pet-frames-"
+SEGMENT_VERSION = 2
+IMAGE_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+# 段头：magic, 版本, 是否写完, 帧数
+_HEADER = struct.Struct("<4sHHI")
+_MAGIC = b"DPSF"
+# 每帧：宽, 高, 每行字节数, 停留 tick 数, 像素数据偏移
+_ENTRY = struct.Struct("<IIIIQ")
+_ALIGN = 64
+
+
+def segment_name(
+    character: str,
+    skin: str,
+    animation: str,
+    tolerance: int,
+    entries: Sequence[Tuple[str, int, int]],
+) -> str:
+    """段名由 (皮肤, 动画, 折叠阈值, 文件戳) 决定：和桌宠尺寸无关；美术重新导出后自然换一个新段"""
+    raw = json.dumps(
+        [SEGMENT_VERSION, character, skin, animation, tolerance, list(entries)],
+        ensure_ascii=False,
+    )
+    return SEGMENT_PREFIX + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass(eq=False)
+class SharedTimeline:
+    """挂在共享段上的时间线：frames 里是直接指向段内存的 QImage（只读，不拷贝）"""
+
+    name: str
+    segment: QSharedMemory
+    timeline: FrameTimeline
+    nbytes: int
+    published: bool  # True = 本进程创建并写入的
+
+
+class SharedFrameSegments:
+    """
+    跨进程共享的帧段（可选功能，设置里 shared_frames 打开）：
+    - 第一个加载某皮肤某动画的进程把解码好的源帧（未缩放）写进命名共享内存段
+    - 之后的进程只读挂载，直接在段内存上构造 QImage，不再解码；缩放仍在各进程里做，
+      结果进各自的 ScaledFrameCache（有预算），段大小只取决于源图，不随桌宠尺寸变大
+    引用计数交给系统：每个挂载的进程算一次，最后一个 detach（含进程退出）时段被回收。
+    """
+
+    def __init__(self) -> None:
+        self._attached: Dict[str, SharedTimeline] = {}
+        self._refs: Dict[str, int] = {}
+        self.published = 0
+        self.attached = 0
+        self.failures = 0
+
+    def acquire(
+        self, name: str, build: Callable[[], Tuple[List[QImage], List[int]]]
+    ) -> Optional[SharedTimeline]:
+        """
+        挂载 name；段不存在时调用 build() 取 (帧, 停留数) 发布出去。
+        返回 None 表示共享不可用（别的进程正在写、系统不支持等），调用方走进程内私有帧。
+        """
+        shared = self._attached.get(name)
+        if shared is not None:
+            self._refs[name] += 1
+            return shared
+
+        segment = QSharedMemory(name)
+        if segment.attach(QSharedMemory.ReadOnly):
+            shared = self._read(name, segment)
+            if shared is None:
+                segment.detach()
+                self.failures += 1
+                return None
+            self.attached += 1
+        else:
+            images, holds = build()
+            shared = self._publish(name, segment, images, holds)
+            if shared is None:
+                self.failures += 1
+                return None
+            self.published += 1
+        self._attached[name] = shared
+        self._refs[name] = 1
+        return shared
+
+    def release(self, shared: Optional[SharedTimeline]) -> None:
+        if shared is None or shared.name not in self._attached:
+            return
+        self._refs[shared.name] -= 1
+        if self._refs[shared.name] > 0:
+            return
+        del self._refs[shared.name]
+        del self._attached[shared.name]
+        # 先丢掉指向段内存的 QImage，再 detach
+        shared.timeline.frames.clear()
+        shared.segment.detach()
+
+    def release_all(self) -> None:
+        for shared in list(self._attached.values()):
+            self._refs[shared.name] = 1
+            self.release(shared)
+
+    def _publish(
+        self, name: str, segment: QSharedMemory, images: List[QImage], holds: List[int]
+    ) -> Optional[SharedTimeline]:
+        images = [img.convertToFormat(IMAGE_FORMAT) for img in images]
+        table_end = _HEADER.size + _ENTRY.size * len(images)
+        offsets, size = [], _align(table_end)
+        for img in images:
+            offsets.append(size)
+            size = _align(size + img.sizeInBytes())
+
+        if not segment.create(max(size, _HEADER.size)):
+            if segment.error() == QSharedMemory.AlreadyExists and segment.attach(QSharedMemory.ReadOnly):
+                # 和别的进程同时发布：用对方的
+                shared = self._read(name, segment)
+                if shared is None:
+                    segment.detach()
+                return shared
+            print(f"[shared_frames] 创建共享段失败：{segment.errorString()}")
+            return None
+
+        segment.lock()
+        try:
+            data = segment.data()
+            data.setsize(segment.size())
+            # 先写帧表和像素，最后写段头（ready=1），读者不会看到写了一半的段
+            data[0:_HEADER.size] = _HEADER.pack(_MAGIC, SEGMENT_VERSION, 0, len(images))
+            for i, (img, hold, offset) in enumerate(zip(images, holds, offsets)):
+                pos = _HEADER.size + _ENTRY.size * i
+                data[pos:pos + _ENTRY.size] = _ENTRY.pack(
+                    img.width(), img.height(), img.bytesPerLine(), int(hold), offset
+                )
+                bits = img.constBits()
+                bits.setsize(img.sizeInBytes())
+                data[offset:offset + img.sizeInBytes()] = bytes(bits)
+            data[0:_HEADER.size] = _HEADER.pack(_MAGIC, SEGMENT_VERSION, 1, len(images))
+        finally:
+            segment.unlock()
+        return self._views(name, segment, published=True)
+
+    def _read(self, name: str, segment: QSharedMemory) -> Optional[SharedTimeline]:
+        segment.lock()
+        try:
+            return self._views(name, segment, published=False)
+        finally:
+            segment.unlock()
+
+    def _views(self, name: str, segment: QSharedMemory, published: bool) -> Optional[SharedTimeline]:
+        """在段内存上构造 QImage（不拷贝像素）"""
+        base = segment.constData()
+        base.setsize(segment.size())
+        if segment.size() < _HEADER.size:
+            return None
+        magic, version, ready, count = _HEADER.unpack(base.asstring(_HEADER.size))
+        if magic != _MAGIC or version != SEGMENT_VERSION or not ready:
+            return None
+        table = base.asstring(_HEADER.size + _ENTRY.size * count)[_HEADER.size:]
+        address = int(base)
+        timeline, nbytes = FrameTimeline(), 0
+        for i in range(count):
+            width, height, bpl, hold, offset = _ENTRY.unpack_from(table, _ENTRY.size * i)
+            if offset + bpl * height > segment.size():
+                return None
+            timeline.frames.append(
+                QImage(sip.voidptr(address + offset), width, height, bpl, IMAGE_FORMAT)
+            )
+            timeline.holds.append(hold)
+            nbytes += bpl * height
+        return SharedTimeline(name, segment, timeline, nbytes, published)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self._attached),
+            "bytes": sum(s.nbytes for s in self._attached.values()),
+            "published": self.published,
+            "attached": self.attached,
+            "failures": self.failures,
+        }
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+_segments: Optional[SharedFrameSegments] = None
+
+
+def get_shared_segments() -> SharedFrameSegments:
+    """进程内单例：同进程的多只桌宠挂同一个段时只挂一次"""
+    global _segments
+    if _segments is None:
+        _segments = SharedFrameSegments()
+    return _segments
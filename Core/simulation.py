@@ -0,0 +1,250 @@
+# Core/simulation.py
+from __future__ import annotations
+
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class VirtualClock:
+    """
+    虚拟时钟：实现和 Core.scheduler.QtClock 相同的接口（now/arm/disarm），
+    时间只在 run_until 里向前跳，于是调度器上的所有任务都能被快进执行。
+    """
+
+    def __init__(self) -> None:
+        self.now_ms = 0.0
+        self._armed: Optional[Tuple[float, Callable[[], None]]] = None
+        self.on_advance: Optional[Callable[[float, float], None]] = None  # (旧时间, 新时间)
+
+    def now(self) -> float:
+        return self.now_ms
+
+    def arm(self, at_ms: float, callback: Callable[[], None]) -> None:
+        self._armed = (max(at_ms, self.now_ms), callback)
+
+    def disarm(self) -> None:
+        self._armed = None
+
+    def _advance(self, to_ms: float) -> None:
+        if to_ms > self.now_ms:
+            if self.on_advance is not None:
+                self.on_advance(self.now_ms, to_ms)
+            self.now_ms = to_ms
+
+    def run_until(self, end_ms: float) -> int:
+        """执行 end_ms 之前的所有唤醒，返回唤醒次数"""
+        fired = 0
+        while self._armed is not None and self._armed[0] <= end_ms:
+            at, callback = self._armed
+            self._armed = None
+            self._advance(at)
+            callback()
+            fired += 1
+        self._advance(end_ms)
+        return fired
+
+
+@dataclass
+class SimulationReport:
+    seed: int
+    virtual_s: float
+    wall_s: float
+    ticks: int = 0
+    residency_s: Dict[str, float] = field(default_factory=dict)
+    frames_shown: Dict[str, int] = field(default_factory=dict)
+    moves_started: int = 0
+    bounces: Dict[str, int] = field(default_factory=dict)
+    transitions: Dict[str, int] = field(default_factory=dict)
+    hovers: int = 0
+    frame_cache: Dict[str, Any] = field(default_factory=dict)
+    scheduler: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def speedup(self) -> float:
+        return self.virtual_s / self.wall_s if self.wall_s > 0 else float("inf")
+
+    def residency_ratio(self) -> Dict[str, float]:
+        total = sum(self.residency_s.values()) or 1.0
+        return {k: v / total for k, v in self.residency_s.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "virtual_s": self.virtual_s,
+            "wall_s": self.wall_s,
+            "speedup": self.speedup,
+            "ticks": self.ticks,
+            "residency_s": self.residency_s,
+            "residency_ratio": self.residency_ratio(),
+            "frames_shown": self.frames_shown,
+            "moves_started": self.moves_started,
+            "bounces": self.bounces,
+            "transitions": self.transitions,
+            "hovers": self.hovers,
+            "frame_cache": self.frame_cache,
+            "scheduler": self.scheduler,
+        }
+
+
+class PetSimulation:
+    """
+    快进模拟：把桌宠调度器的时钟换成虚拟时钟，随机源换成固定种子，
+    然后无界面地把几小时的行为在几秒内跑完，统计状态停留、撞边次数、显示帧数等。
+
+    render=False 时不做缩放和贴图（只推进帧下标），用于纯行为统计；
+    render=True 时走真实的渲染/缓存路径，用于给帧缓存做压力测试。
+    time_ticks=True 时记录每次动画 tick 的真实耗时（毫秒）到 tick_ms。
+    """
+
+    def __init__(
+        self,
+        pet,
+        seed: int = 0,
+        render: bool = False,
+        hover_per_min: float = 0.0,
+        hover_duration_ms: Tuple[int, int] = (1000, 5000),
+        time_ticks: bool = False,
+    ) -> None:
+        self.pet = pet
+        self.seed = seed
+        self.render = render
+        self.hover_per_min = hover_per_min
+        self.hover_duration_ms = hover_duration_ms
+        self.clock = VirtualClock()
+        self.clock.on_advance = self._account
+        self._events_rng = random.Random(seed ^ 0x5EED)
+        self._residency: Counter = Counter()
+        self._frames: Counter = Counter()
+        self._bounces: Counter = Counter()
+        self._transitions: Counter = Counter()
+        self._moves = 0
+        self._hovers = 0
+        self._ticks = 0
+        self.time_ticks = time_ticks
+        self.tick_ms: List[float] = []
+        self._install()
+
+    # ---------- 安装替身 ----------
+
+    def _install(self) -> None:
+        pet = self.pet
+        pet.rng = random.Random(self.seed)
+        pet.behavior.rng = pet.rng
+
+        orig_update = pet.updateAnimation
+        orig_render = pet._render_frame
+        orig_move = pet.move_horizontally
+
+        def update():
+            self._ticks += 1
+            if not self.time_ticks:
+                orig_update()
+                return
+            t0 = time.perf_counter()
+            orig_update()
+            self.tick_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        def render(state, timeline):
+            idx = pet.current_frame % len(timeline)
+            key = pet._frame_key(state, idx)
+            if key != pet._shown_key:
+                self._frames[state] += 1
+            if self.render:
+                orig_render(state, timeline)
+            else:
+                pet._shown_key = key
+
+        def move():
+            before = pet.direction
+            orig_move()
+            if pet.direction != before:
+                self._bounces["left" if before == -1 else "right"] += 1
+
+        def entered(old, new):
+            self._transitions[f"{old}->{new}"] += 1
+            states = pet.behavior.spec.states
+            was, now = states.get(old), states.get(new)
+            if now is not None and now.moving and not (was is not None and was.moving):
+                self._moves += 1
+
+        # 调度器换成虚拟时钟（运行中的任务按剩余时间平移），再把统计用的包装挂到帧时钟上
+        pet.scheduler.set_clock(self.clock)
+        pet.timer.timeout.disconnect()
+        pet.timer.timeout.connect(update)
+        pet.behavior.listeners.append(entered)
+        # 用固定种子重新进入当前状态，让第一段停留时长也可复现
+        pet._enter_state(pet.behavior.state)
+
+        pet._render_frame = render
+        pet.move_horizontally = move
+
+        if self.hover_per_min > 0:
+            self._hover_timer = pet.scheduler.job("sim.hover", self._toggle_hover, single_shot=True)
+            self._schedule_hover()
+
+    def _schedule_hover(self) -> None:
+        if self.pet.is_hovered:
+            lo, hi = self.hover_duration_ms
+            delay = self._events_rng.randint(lo, hi)
+        else:
+            delay = int(self._events_rng.expovariate(self.hover_per_min / 60000.0))
+        self._hover_timer.start(max(1, delay))
+
+    def _toggle_hover(self) -> None:
+        if self.pet.is_hovered:
+            self.pet.leaveEvent(None)
+        else:
+            self._hovers += 1
+            self.pet.enterEvent(None)
+        self._schedule_hover()
+
+    def _account(self, old_ms: float, new_ms: float) -> None:
+        self._residency[self.pet._current_state()] += (new_ms - old_ms) / 1000.0
+
+    # ---------- 运行 ----------
+
+    def run(self, seconds: float) -> SimulationReport:
+        wall0 = time.perf_counter()
+        self.clock.run_until(self.clock.now_ms + seconds * 1000.0)
+        wall = time.perf_counter() - wall0
+        return SimulationReport(
+            seed=self.seed,
+            virtual_s=self.clock.now_ms / 1000.0,
+            wall_s=wall,
+            ticks=self._ticks,
+            residency_s=dict(self._residency),
+            frames_shown=dict(self._frames),
+            moves_started=self._moves,
+            bounces=dict(self._bounces),
+            transitions=dict(self._transitions),
+            hovers=self._hovers,
+            frame_cache=self.pet.frame_cache.stats(),
+            scheduler=self.pet.scheduler.stats(),
+        )
+
+
+def run_simulation(
+    seconds: float,
+    seed: int = 0,
+    settings: Optional[Dict[str, Any]] = None,
+    render: bool = False,
+    hover_per_min: float = 0.0,
+    pet=None,
+) -> SimulationReport:
+    """
+    便捷入口（测试/CI 用）：需要已有 QApplication（offscreen 即可）。
+    settings 会覆盖 Settings/config.json 里的对应字段，但不会写回磁盘。
+    """
+    if pet is None:
+        from desktop_pet import DesktopPet
+
+        pet = DesktopPet()
+    if settings:
+        merged = pet.settings.to_dict()
+        merged.update(settings)
+        pet.apply_settings(merged)
+    sim = PetSimulation(pet, seed=seed, render=render, hover_per_min=hover_per_min)
+    return sim.run(seconds)
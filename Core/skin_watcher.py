@@ -0,0 +1,126 @@
+# Core/skin_watcher.py
+from __future__ import annotations
+
+import os
+from typing import Dict, Set, Tuple
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+
+Snapshot = Dict[str, Tuple[int, int]]  # 帧文件名 -> (size, mtime_ns)
+
+
+def _snapshot(directory: str) -> Snapshot:
+    try:
+        with os.scandir(directory) as it:
+            snap = {}
+            for e in it:
+                if e.name.endswith(".png") and not e.name.startswith("."):
+                    st = e.stat()
+                    snap[e.name] = (st.st_size, st.st_mtime_ns)
+            return snap
+    except OSError:
+        return {}
+
+
+class SkinWatcher(QObject):
+    """
+    监视当前皮肤的各状态目录，外加每个目录的第一帧：
+    - 目录变化：新增/删除/重命名帧
+    - 第一帧变化：整段原地覆盖写（ffmpeg -y 不会改目录，但总是从第一帧写起）
+    不逐个监视帧文件（一个皮肤上千帧，多只桌宠时成倍增长）。
+    ffmpeg 导出时会在短时间内连续写几百个文件，这里把一阵写入合并成一次 changed 信号：
+    触发时和各目录的 (size, mtime) 快照比对，有变化就再等一轮，快照稳定了才报告
+    （原地覆盖时后面的帧不会再有通知，只能靠比对确认写完）。
+    """
+
+    changed = pyqtSignal(list)  # 发生变化的状态名列表
+
+    def __init__(self, parent=None, debounce_ms: int = 400, scheduler=None) -> None:
+        super().__init__(parent)
+        self._dirs: Dict[str, str] = {}  # 目录 -> 状态名
+        self._snapshots: Dict[str, Snapshot] = {}  # 目录 -> 上次看到的帧
+        self._sentinels: Dict[str, str] = {}  # 第一帧路径 -> 目录
+        self._settling: Dict[str, Snapshot] = {}  # 目录 -> 上一轮比对时的快照（还在写）
+        self._pending: Set[str] = set()
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_path_changed)
+        self._fs.fileChanged.connect(self._on_path_changed)
+
+        if scheduler is not None:
+            self._debounce = scheduler.job(
+                "skin.watch", self._flush, interval_ms=debounce_ms, single_shot=True, tolerance_ms=100
+            )
+        else:
+            self._debounce = QTimer(self)
+            self._debounce.setSingleShot(True)
+            self._debounce.setInterval(debounce_ms)
+            self._debounce.timeout.connect(self._flush)
+
+    def watch(self, state_dirs: Dict[str, str]) -> None:
+        """替换监视目标：{状态名: 目录}；不存在的目录直接忽略"""
+        self.stop()
+        self._dirs = {
+            os.path.normpath(d): state for state, d in state_dirs.items() if os.path.isdir(d)
+        }
+        self._snapshots = {d: _snapshot(d) for d in self._dirs}
+        if self._dirs:
+            self._fs.addPaths(list(self._dirs))
+        self._rewatch_sentinels(self._dirs)
+
+    def stop(self) -> None:
+        paths = self._fs.directories() + self._fs.files()
+        if paths:
+            self._fs.removePaths(paths)
+        self._dirs = {}
+        self._snapshots = {}
+        self._sentinels = {}
+        self._settling = {}
+        self._pending.clear()
+        self._debounce.stop()
+
+    def _rewatch_sentinels(self, dirs) -> None:
+        # 第一帧被删除/原子替换后会从监视列表里掉出去，按目录最新内容补回
+        for d in dirs:
+            first = min(self._snapshots.get(d) or (), default=None)
+            path = os.path.join(d, first) if first else None
+            old = next((p for p, owner in self._sentinels.items() if owner == d), None)
+            if old is not None and old != path:
+                del self._sentinels[old]
+                if old in self._fs.files():
+                    self._fs.removePath(old)
+            if path is not None:
+                self._sentinels[path] = d
+                if path not in self._fs.files():
+                    self._fs.addPath(path)
+
+    def _on_path_changed(self, path: str) -> None:
+        path = os.path.normpath(path)
+        d = path if path in self._dirs else self._sentinels.get(path)
+        if d is None:
+            return
+        self._pending.add(d)
+        self._debounce.start()  # 每次写入都重新计时：整批写完才触发
+
+    def _flush(self) -> None:
+        dirs = [d for d in self._pending if d in self._dirs]
+        self._pending.clear()
+        changed = []
+        for d in dirs:
+            snap = _snapshot(d)
+            if snap == self._snapshots.get(d):
+                self._settling.pop(d, None)
+            elif snap == self._settling.get(d):
+                del self._settling[d]
+                self._snapshots[d] = snap
+                changed.append(d)
+                self._pending.add(d)  # 再确认一轮：导出中途停顿过的话，后半段还能接着报
+            else:
+                self._settling[d] = snap
+                self._pending.add(d)
+        self._rewatch_sentinels(dirs)
+        if self._pending:
+            self._debounce.start()
+        if changed:
+            self.changed.emit(sorted(self._dirs[d] for d in changed))
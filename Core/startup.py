@@ -0,0 +1,149 @@
+# Core/startup.py
+"""
+启动计时：按阶段记录耗时，窗口第一次画出桌宠时记下 time-to-first-frame（TTFF）。
+- 只用标准库 + 追踪器，main.py 最先导入，起点尽量靠近进程启动
+- 首帧之后的工作（其余动画帧、插件、配置监视……）由 DeferredSteps 在事件循环里逐步执行，
+  每步也记成一个阶段，全部做完时打印一行汇总
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from Core.tracing import tracer
+
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfile:
+    def __init__(self, origin: Optional[float] = None, verbose: bool = False) -> None:
+        self.origin = time.perf_counter() if origin is None else origin
+        self.verbose = verbose  # 完成时是否打印汇总
+        self.phases: List[Tuple[str, float, float]] = []  # (阶段, 开始 ms, 耗时 ms)，相对 origin
+        self.first_frame_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+
+    def _since_origin(self, t: float) -> float:
+        return (t - self.origin) * 1000.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个阶段；启动完成之后再调用只执行不记录（如运行中切换皮肤）"""
+        if self.ready_ms is not None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"startup.{name}", cat="startup"):
+                yield
+        finally:
+            self.phases.append((name, self._since_origin(started), (time.perf_counter() - started) * 1000.0))
+
+    def mark_first_frame(self) -> None:
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self._since_origin(time.perf_counter())
+            tracer.instant("startup.first_frame", cat="startup")
+
+    def finish(self) -> None:
+        """首帧后的工作全部完成"""
+        if self.ready_ms is not None:
+            return
+        self.ready_ms = self._since_origin(time.perf_counter())
+        if self.verbose:
+            print(self.format())
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "time_to_first_frame_ms": self.first_frame_ms,
+            "ready_ms": self.ready_ms,
+            "phases": [{"name": n, "start_ms": s, "ms": d} for n, s, d in self.phases],
+        }
+
+    def format(self) -> str:
+        def fmt(ms: Optional[float]) -> str:
+            return "-" if ms is None else f"{ms:.0f}ms"
+
+        first = self.first_frame_ms if self.first_frame_ms is not None else float("inf")
+        before = [f"{n} {d:.0f}ms" for n, s, d in self.phases if s < first]
+        after = [f"{n} {d:.0f}ms" for n, s, d in self.phases if s >= first]
+        text = f"[startup] 首帧 {fmt(self.first_frame_ms)}（{', '.join(before)}）"
+        if self.ready_ms is not None:
+            text += f"；全部就绪 {fmt(self.ready_ms)}（{', '.join(after)}）"
+        return text
+
+
+# 进程级计时（起点 = 本模块被导入）；第一只桌宠认领它，PetHost 之后派生的桌宠各自从构造时起算
+startup = StartupProfile(PROCESS_START, verbose=True)
+_claimed = False
+
+
+def claim_startup_profile() -> StartupProfile:
+    global _claimed
+    if _claimed:
+        return StartupProfile()
+    _claimed = True
+    return startup
+
+
+class DeferredSteps:
+    """
+    首帧之后按顺序执行的启动步骤：每次调度只跑一步，步与步之间回到事件循环，
+    帧时钟和输入照常处理；某一步出错只打印，不影响后面的步骤。
+    """
+
+    def __init__(self, scheduler, profile: StartupProfile, on_done: Optional[Callable[[], None]] = None) -> None:
+        self._profile = profile
+        self._on_done = on_done
+        self._steps: Deque[Tuple[str, Callable[[], None]]] = deque()
+        self._job = scheduler.job("startup.deferred", self._run_next, single_shot=True, tolerance_ms=20)
+        self.started = False
+
+    def add(self, name: str, fn: Callable[[], None]) -> None:
+        self._steps.append((name, fn))
+        if self.started and not self._job.isActive():
+            self._job.start(0)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self.started = True
+        self._job.start(0)
+
+    def stop(self) -> None:
+        self._job.stop()
+        self._steps.clear()
+
+    @property
+    def done(self) -> bool:
+        return self.started and not self._steps
+
+    def run_all(self) -> None:
+        """等不及逐步执行时（如马上要用插件）：把剩下的步骤立即做完"""
+        self.started = True
+        self._job.stop()
+        while self._steps:
+            self._run_one()
+        self._finish()
+
+    def _run_next(self) -> None:
+        self._run_one()
+        if self._steps:
+            self._job.start(0)
+        else:
+            self._finish()
+
+    def _run_one(self) -> None:
+        if not self._steps:
+            return
+        name, fn = self._steps.popleft()
+        with self._profile.phase(name):
+            try:
+                fn()
+            except Exception as e:
+                print(f"[startup] {name} 失败：", e)
+
+    def _finish(self) -> None:
+        if self._on_done is not None:
+            self._on_done()
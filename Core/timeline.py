@@ -0,0 +1,112 @@
+# Core/timeline.py
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+# 帧签名缩略图边长（只在 tolerance > 0 时计算）
+SIGNATURE_SIZE = 16
+
+# 默认只折叠逐像素完全相同的帧。
+# >0 时改为比较 16x16 缩略图：任一通道差值都不超过它就视为同一画面——会吞掉眨眼这类小动作，只在确实需要时打开
+DEFAULT_MERGE_TOLERANCE = 0
+
+_IMAGE_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+@dataclass
+class DecodedFrame:
+    """一张已解码的源帧（对应磁盘上的一个 PNG）"""
+
+    path: str
+    pixmap: QPixmap
+    signature: bytes  # 16x16 缩略图（tolerance > 0 时才有）
+    stamp: Tuple[int, int] = (0, 0)  # (文件大小, mtime_ns)，热重载时据此判断是否需要重新解码
+    checksum: int = 0  # 全分辨率像素的 crc32：不同就一定是不同画面
+
+
+@dataclass
+class FrameTimeline:
+    """
+    单个状态的帧时间线：
+    - frames[i]：第 i 个“真正不同”的画面
+    - holds[i]：该画面连续停留多少个 tick（导出时的重复帧被折叠进来）
+    """
+
+    frames: List[QPixmap] = field(default_factory=list)
+    holds: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def total_ticks(self) -> int:
+        return sum(self.holds)
+
+
+def frame_signature(img: QImage) -> bytes:
+    """把一帧缩成 16x16 的预乘 ARGB 字节串，用于比较两帧是否几乎相同（有损，见 DEFAULT_MERGE_TOLERANCE）"""
+    small = img.convertToFormat(_IMAGE_FORMAT).scaled(
+        SIGNATURE_SIZE, SIGNATURE_SIZE, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+    )
+    ptr = small.constBits()
+    ptr.setsize(small.sizeInBytes())
+    return bytes(ptr)
+
+
+def pixel_checksum(img: QImage) -> int:
+    """全分辨率像素（预乘 ARGB）的 crc32"""
+    ptr = img.constBits()
+    ptr.setsize(img.sizeInBytes())
+    return zlib.crc32(ptr) ^ (img.width() << 16 | img.height())
+
+
+def is_same_frame(a: DecodedFrame, b: DecodedFrame) -> bool:
+    """逐像素完全相同（crc32 先筛，相同时再整张比较，不会因为碰撞误合并）"""
+    return a.checksum == b.checksum and a.pixmap.toImage() == b.pixmap.toImage()
+
+
+def is_near_identical(a: bytes, b: bytes, tolerance: int) -> bool:
+    if tolerance <= 0 or not a or len(a) != len(b):
+        return False
+    if a == b:
+        return True
+    return max(abs(x - y) for x, y in zip(a, b)) <= tolerance
+
+
+def decode_frame(
+    path: str, stamp: Tuple[int, int] = (0, 0), tolerance: int = DEFAULT_MERGE_TOLERANCE
+) -> Optional[DecodedFrame]:
+    """解码单帧；文件损坏/不是有效 PNG（或还没写完）时返回 None"""
+    img = QImage(path)
+    if img.isNull():
+        return None
+    img = img.convertToFormat(_IMAGE_FORMAT)
+    signature = frame_signature(img) if tolerance > 0 else b""
+    return DecodedFrame(path, QPixmap.fromImage(img), signature, stamp, pixel_checksum(img))
+
+
+def build_timeline(
+    decoded: Sequence[DecodedFrame], tolerance: int = DEFAULT_MERGE_TOLERANCE
+) -> FrameTimeline:
+    """
+    把连续相同（tolerance > 0 时含几乎相同）的帧折叠成一个画面 + 停留 tick 数。
+    注意：和“上一个保留下来的画面”比较，而不是和前一帧比较，
+    否则缓慢渐变的动画会被一路折叠掉。
+    """
+    timeline = FrameTimeline()
+    last: Optional[DecodedFrame] = None
+    for d in decoded:
+        if last is not None and (
+            is_same_frame(d, last) or is_near_identical(d.signature, last.signature, tolerance)
+        ):
+            timeline.holds[-1] += 1
+            continue
+        timeline.frames.append(d.pixmap)
+        timeline.holds.append(1)
+        last = d
+    return timeline
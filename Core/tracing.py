@@ -0,0 +1,161 @@
+# Core/tracing.py
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional
+
+from Core.asset_index import CACHE_DIR
+
+TRACE_DIR = CACHE_DIR / "traces"
+# 环境变量：PET_TRACE=1 启动即开始记录；PET_TRACE_CAPACITY 控制环形缓冲大小
+TRACE_ENV = "PET_TRACE"
+TRACE_CAPACITY_ENV = "PET_TRACE_CAPACITY"
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+class _NullSpan:
+    """关闭追踪时 span() 返回的共享空对象：进出都不做任何事"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_cat", "_args", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+
+    def __enter__(self):
+        self._start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, *_exc) -> None:
+        args = self._args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        self._tracer.complete(self._name, self._start, _now_us() - self._start, self._cat, args)
+
+
+class Tracer:
+    """
+    轻量追踪器：span 写进内存环形缓冲，可导出为 Chrome trace-event JSON
+    （chrome://tracing 或 https://ui.perfetto.dev 打开）。
+    关闭时 span()/traced 只多一次属性判断。
+    """
+
+    def __init__(self, capacity: int = 50000) -> None:
+        self.enabled = False
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._threads: Dict[int, str] = {}
+        self._pid = os.getpid()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    # ---------- 记录 ----------
+
+    def span(self, name: str, cat: str = "pet", **args: Any):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args or None)
+
+    def complete(
+        self, name: str, start_us: float, dur_us: float, cat: str = "pet", args: Optional[Dict[str, Any]] = None
+    ) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        ev = {"name": name, "cat": cat, "ph": "X", "ts": start_us, "dur": dur_us, "pid": self._pid, "tid": tid}
+        if args:
+            ev["args"] = args
+        self._events.append(ev)  # deque.append 本身是线程安全的
+
+    def instant(self, name: str, cat: str = "pet", **args: Any) -> None:
+        if not self.enabled:
+            return
+        ev = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(), "pid": self._pid, "tid": threading.get_ident()}
+        if args:
+            ev["args"] = args
+        self._events.append(ev)
+
+    # ---------- 导出 ----------
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0, "args": {"name": "desktop-pet"}}
+        ]
+        meta += [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        return {"traceEvents": meta + list(self._events), "displayTimeUnit": "ms"}
+
+    def dump(self, path: Optional[Path] = None) -> Path:
+        """写出 JSON，返回文件路径（默认 .cache/traces/trace-时间.json）"""
+        if path is None:
+            path = TRACE_DIR / time.strftime("trace-%Y%m%d-%H%M%S.json")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+def _capacity_from_env() -> int:
+    try:
+        return max(1000, int(os.environ.get(TRACE_CAPACITY_ENV, "50000")))
+    except ValueError:
+        return 50000
+
+
+# 进程内共享的追踪器
+tracer = Tracer(_capacity_from_env())
+if os.environ.get(TRACE_ENV, "").strip() not in ("", "0", "false", "off"):
+    tracer.enable()
+
+
+def traced(name: Optional[str] = None, cat: str = "pet") -> Callable:
+    """函数/方法装饰器：开启追踪时记录一次 span，关闭时直接调用原函数"""
+
+    def deco(fn: Callable) -> Callable:
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not tracer.enabled:
+                return fn(*a, **kw)
+            with _Span(tracer, label, cat, None):
+                return fn(*a, **kw)
+
+        return wrapper
+
+    return deco
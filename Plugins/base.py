@@ -1,19 +1,74 @@
 # plugins/base.py
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from PyQt5.QtWidgets import QMenu
 from pathlib import Path
 import importlib
 
 
+class _LazyService:
+    __slots__ = ("factory",)
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self.factory = factory
+
+
+class ServiceRegistry(dict):
+    """
+    AppContext.services：普通字典 + 惰性工厂。
+    register_lazy(name, factory) 登记的服务第一次被 services[name] / services.get(name) 取用时
+    才调用 factory()，得到的对象替换掉工厂（factory 返回 None 表示提供不了，条目随之删除）。
+    插件清单里声明的服务就是这样登记的：第一次取用才导入并激活插件。
+    """
+
+    def register_lazy(self, name: str, factory: Callable[[], Any]) -> None:
+        super().__setitem__(name, _LazyService(factory))
+
+    def is_resolved(self, name: str) -> bool:
+        """已是真正的服务（不会触发加载）"""
+        return name in self and not isinstance(super().__getitem__(name), _LazyService)
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """取值但不触发工厂：还没加载时返回 default"""
+        value = super().get(name, default)
+        return default if isinstance(value, _LazyService) else value
+
+    def __getitem__(self, name: str) -> Any:
+        value = super().__getitem__(name)
+        if isinstance(value, _LazyService):
+            value = self._resolve(name, value)
+        return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def _resolve(self, name: str, lazy: _LazyService) -> Any:
+        value = lazy.factory()
+        if super().get(name) is lazy:  # 工厂期间没有别人登记过真正的服务
+            if value is None:
+                super().__delitem__(name)
+            else:
+                super().__setitem__(name, value)
+        else:
+            value = self.peek(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+
 @dataclass
 class AppContext:
     """给插件用的上下文：只暴露必要对象，避免耦合。"""
 
     pet: Any  # 你的 DesktopPet 实例（QMainWindow）
-    services: Dict[str, Any] = field(default_factory=dict)
+    services: ServiceRegistry = field(default_factory=ServiceRegistry)
     logger: Any = print  # 简单日志接口
+    scheduler: Any = None  # Core.scheduler.Scheduler：定时任务请用它，别自己建 QTimer
+    events: Any = None  # Core.event_bus.EventBus：桌宠事件请订阅它，别轮询 ctx.pet
 
 
 class PluginBase:
@@ -25,17 +80,36 @@ class PluginBase:
 
     def __init__(self) -> None:
         self.ctx: Optional[AppContext] = None
+        self._subscriptions: list = []
 
     def activate(self, ctx: AppContext) -> None:
         """加载插件时调用"""
         self.ctx = ctx
 
     def deactivate(self) -> None:
-        """卸载插件时调用"""
+        """卸载插件时调用（会取消 subscribe 的所有订阅）"""
+        for unsubscribe in getattr(self, "_subscriptions", []):
+            unsubscribe()
+        self._subscriptions = []
         self.ctx = None
 
+    def subscribe(self, event_type, callback: Callable) -> Callable[[], None]:
+        """
+        订阅桌宠事件（类型见 Core/event_bus.py，如 FrameTick、StateChanged、PetDragged）。
+        事件每 tick 批量送达；本插件每 tick 超出时间预算时会被推迟，帧 tick/移动类事件只留最新的。
+        """
+        unsubscribe = self.ctx.events.subscribe(event_type, callback, owner=self.id)
+        if not hasattr(self, "_subscriptions"):
+            self._subscriptions = []
+        self._subscriptions.append(unsubscribe)
+        return unsubscribe
+
     def extend_context_menu(self, menu: QMenu) -> None:
-        """桌宠右键菜单构建时调用，插件可往里加 action"""
+        """桌宠右键菜单构建时调用，插件可往里加 action（只对已加载的插件调用）"""
+        return
+
+    def on_menu_action(self, action_id: str) -> None:
+        """plugin.json 里声明的菜单项被点击时调用（插件此时才被加载）"""
         return
 
     def config_path(self) -> Path:
@@ -51,6 +125,10 @@ class PluginBase:
         """PluginManager 加载 json 后会调用，插件自行保存到 self.cfg"""
         self.cfg = cfg
 
+    def on_config_changed(self, changed: dict) -> None:
+        """config.json 被外部修改后调用（load_config 之后）；changed 只含改过的字段"""
+        return
+
     # --- 给 Settings “插件”页用 ---
     def create_settings_widget(self, parent=None):
         """返回一个 QWidget(通常是 QGroupBox)，用于塞进设置窗口的插件页"""
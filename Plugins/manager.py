@@ -2,51 +2,50 @@
 from __future__ import annotations
 
 import importlib
-import json
 import pkgutil
 import traceback
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from Plugins.base import AppContext, PluginBase
+from Plugins.manifest import PluginManifest, load_manifest
+from Plugins.process_host import PluginProcess
+from Core.config_store import get_config_store, plugin_namespace
+from Core.tracing import tracer
 
 
-def _save_json(path: Path, data: dict) -> None:
-    """原子写入 JSON，避免写一半导致文件损坏"""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    tmp.replace(path)
-
-
-def _load_json(path: Path, defaults: dict) -> dict:
-    """读取 JSON（不存在就创建，损坏就备份并重建），并用 defaults 补齐缺失字段"""
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    if not path.exists():
-        _save_json(path, defaults)
-        return dict(defaults)
-
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            raise ValueError("config json is not an object")
+def _load_config(plugin_id: str, path: Path, defaults: dict) -> dict:
+    """
+    插件配置存在配置库的 plugin.<id> 命名空间里；插件目录的 config.json 是导入面
+    （首次整份导入，之后只导入在文件里被外部改过的字段），并用 defaults 补齐缺失字段
+    """
+    with tracer.span("plugins.config.read", cat="io", path=str(path)):
+        store = get_config_store()
+        namespace = plugin_namespace(plugin_id)
+        store.sync_json(namespace, path)
         merged = dict(defaults)
-        merged.update(data)
+        merged.update(store.namespace(namespace))
+        store.update(namespace, merged)
         return merged
-    except Exception:
-        bad = path.with_suffix(".bad.json")
-        try:
-            path.replace(bad)
-        except Exception:
-            pass
-        _save_json(path, defaults)
-        return dict(defaults)
+
+
+def _save_config(plugin_id: str, path: Path, data: dict, export: bool = False) -> None:
+    """写入配置库（和同一时段的其它写入合并成一个事务）；export=True 时同时导出 config.json"""
+    with tracer.span("plugins.config.write", cat="io", path=str(path)):
+        store = get_config_store()
+        namespace = plugin_namespace(plugin_id)
+        store.replace(namespace, data)
+        if export:
+            store.export_json(namespace, path)
 
 
 class PluginManager:
     """
     扫描/加载 Plugins 目录下的所有插件包（每个插件是一个文件夹，且必须有 __init__.py）
+    - 有 plugin.json 清单的插件（见 Plugins/manifest.py）启动时只读清单：声明的服务登记成惰性工厂、
+      菜单项直接加进右键菜单，第一次取用服务或点菜单项时才导入并激活；没有清单的插件启动时照旧加载
+    - 清单里 "isolation": "process" 的插件不在主进程导入：逻辑跑在独立工作进程（Plugins/process_host.py），
+      服务换成异步代理，菜单项仍由主进程显示
     - 每个插件包必须提供 create_plugin() -> PluginBase
     - 每个插件可选提供：
         - config_path() -> Path
@@ -60,25 +59,116 @@ class PluginManager:
         self.ctx = ctx
         self.plugins_package = plugins_package
         self._plugins: Dict[str, PluginBase] = {}
+        self._config_paths: Dict[str, Path] = {}  # 插件 id -> config.json（导入/导出面）
+        self._manifests: Dict[str, PluginManifest] = {}  # 插件 id -> 清单
+        self._loading: set = set()  # 正在加载的插件 id（防止激活过程中取自己的服务又触发加载）
+        self._processes: Dict[str, PluginProcess] = {}  # 隔离插件 id -> 工作进程
 
     # ---------- discovery / load ----------
 
+    def _package_dir(self) -> Path:
+        pkg = importlib.import_module(self.plugins_package)
+        return Path(pkg.__file__).resolve().parent  # Plugins/
+
     def discover(self) -> List[str]:
         """扫描 Plugins 包目录下的子包（目录插件）"""
-        pkg = importlib.import_module(self.plugins_package)
-        pkg_path = Path(pkg.__file__).resolve().parent  # Plugins/
         names: List[str] = []
-        for m in pkgutil.iter_modules([str(pkg_path)]):
+        for m in pkgutil.iter_modules([str(self._package_dir())]):
             if m.ispkg:
                 names.append(m.name)
         return sorted(names)
 
-    def load_all(self) -> None:
+    def scan(self) -> List[str]:
+        """
+        只读各插件的 plugin.json，不导入插件代码：lazy 插件登记服务工厂（已停用的不登记）。
+        返回需要立即加载的包名（没有清单的插件、activation=startup 的插件）。
+        """
+        root = self._package_dir()
+        eager: List[str] = []
         for name in self.discover():
+            try:
+                manifest = load_manifest(root / name)
+            except ValueError as e:
+                self.ctx.logger(f"[plugins] 清单无效，按旧方式加载：{e}")
+                manifest = None
+            if manifest is None:
+                eager.append(name)
+                continue
+            self._manifests[manifest.id] = manifest
+            if not manifest.lazy and not manifest.isolated:
+                eager.append(name)
+                continue
+            cfg_path = root / name / manifest.config
+            self._config_paths[manifest.id] = cfg_path
+            with tracer.span("plugins.config.read", cat="io", path=str(cfg_path)):
+                store = get_config_store()
+                namespace = plugin_namespace(manifest.id)
+                store.sync_json(namespace, cfg_path)
+                enabled = bool(store.get(namespace, "enabled", True))
+            if enabled and not manifest.lazy:
+                eager.append(name)  # 隔离插件 activation=startup：启动时拉起工作进程
+            elif enabled:
+                self._register_services(manifest)
+                self.ctx.logger(f"[plugins] registered: {manifest.id} ({manifest.name}, 按需加载)")
+            else:
+                self.ctx.logger(f"[plugins] disabled: {manifest.id} ({manifest.name})")
+        return eager
+
+    def load_all(self) -> None:
+        for name in self.scan():
             self.load_one(name)
 
+    def ensure_loaded(self, plugin_id: str) -> Optional[PluginBase]:
+        """按清单加载插件（已加载则直接返回）；加载失败或没有这个插件时返回 None"""
+        p = self._plugins.get(plugin_id)
+        if p is not None:
+            return p
+        manifest = self._manifests.get(plugin_id)
+        if manifest is None or plugin_id in self._loading:
+            return None
+        self._loading.add(plugin_id)
+        try:
+            self.load_one(manifest.package)
+        finally:
+            self._loading.discard(plugin_id)
+        return self._plugins.get(plugin_id)
+
+    def _register_services(self, manifest: PluginManifest) -> None:
+        for service in manifest.services:
+            self.ctx.services.register_lazy(
+                service, lambda pid=manifest.id, service=service: self._resolve_service(pid, service)
+            )
+
+    def _drop_services(self, plugin_id: str) -> None:
+        manifest = self._manifests.get(plugin_id)
+        for service in manifest.services if manifest is not None else ():
+            self.ctx.services.pop(service, None)
+
+    def _resolve_service(self, plugin_id: str, service: str):
+        """惰性服务第一次被取用：加载并激活插件，返回它激活时登记的真正服务"""
+        manifest = self._manifests.get(plugin_id)
+        if manifest is not None and manifest.isolated:
+            proc = self._start_process(manifest)
+            return proc.proxy(service) if proc is not None else None
+        with tracer.span("plugins.lazy_load", cat="plugins", plugin=plugin_id, service=service):
+            p = self.ensure_loaded(plugin_id)
+        if p is None or not getattr(p, "_enabled", True):
+            return None
+        value = self.ctx.services.peek(service)
+        if value is None:
+            self.ctx.logger(f"[plugins] {plugin_id} 激活后没有提供清单里声明的服务 {service}")
+        return value
+
     def load_one(self, name: str) -> None:
         """加载单个插件：Plugins.<name>"""
+        with tracer.span("plugins.load_one", cat="plugins", plugin=name):
+            self._load_one(name)
+
+    def _load_one(self, name: str) -> None:
+        manifest = next((m for m in self._manifests.values() if m.package == name), None)
+        if manifest is not None and manifest.isolated:
+            self._start_process(manifest)
+            return
         full = f"{self.plugins_package}.{name}"
         try:
             mod = importlib.import_module(full)
@@ -87,7 +177,11 @@ class PluginManager:
                 self.ctx.logger(f"[plugins] skip {full}: no create_plugin()")
                 return
 
-            plugin: PluginBase = create()
+            with tracer.span(f"{name}.create_plugin", cat="plugin-hook"):
+                plugin: PluginBase = create()
+            declared = next((m.id for m in self._manifests.values() if m.package == name), plugin.id)
+            if declared != plugin.id:
+                self.ctx.logger(f"[plugins] {full}: id {plugin.id} 与清单里的 {declared} 不符")
 
             # ---- 读取插件配置（如果插件实现了相关方法）----
             cfg = None
@@ -104,10 +198,12 @@ class PluginManager:
                     # fallback：插件目录/config.json
                     cfg_path = Path(mod.__file__).resolve().parent / "config.json"
 
-                cfg = _load_json(cfg_path, default_cfg)
+                cfg = _load_config(plugin.id, cfg_path, default_cfg)
+                self._config_paths[plugin.id] = cfg_path
 
                 if hasattr(plugin, "load_config"):
-                    plugin.load_config(cfg)
+                    with tracer.span(f"{plugin.id}.load_config", cat="plugin-hook"):
+                        plugin.load_config(cfg)
                 else:
                     setattr(plugin, "cfg", cfg)
 
@@ -124,7 +220,8 @@ class PluginManager:
 
             # ---- 激活插件（enabled 才 activate；但无论是否 enabled 都登记，以便设置页显示）----
             if enabled:
-                plugin.activate(self.ctx)
+                with tracer.span(f"{plugin.id}.activate", cat="plugin-hook"):
+                    plugin.activate(self.ctx)
                 self.ctx.logger(f"[plugins] loaded: {plugin.id} ({plugin.name})")
             else:
                 self.ctx.logger(f"[plugins] disabled: {plugin.id} ({plugin.name})")
@@ -134,32 +231,107 @@ class PluginManager:
         except Exception:
             self.ctx.logger(f"[plugins] failed: {full}\n{traceback.format_exc()}")
 
+    def _start_process(self, manifest: PluginManifest) -> Optional[PluginProcess]:
+        """拉起隔离插件的工作进程（已在运行则直接返回），把清单里的服务换成代理"""
+        proc = self._processes.get(manifest.id)
+        if proc is not None and proc.running:
+            return proc
+        path = self._config_paths.get(manifest.id)
+        if path is None:
+            return None
+        try:
+            cfg = _load_config(manifest.id, path, {})
+            if not bool(cfg.get("enabled", True)):
+                return None
+            if proc is None:
+                proc = self._processes[manifest.id] = PluginProcess(manifest, self.ctx, cfg, parent=self.ctx.pet)
+            else:
+                proc.config = dict(cfg)
+            for service in manifest.services:
+                self.ctx.services[service] = proc.proxy(service)
+            with tracer.span(f"{manifest.id}.start_process", cat="plugins"):
+                proc.start()
+        except Exception:
+            self.ctx.logger(f"[plugins] failed: {manifest.id} 工作进程\n{traceback.format_exc()}")
+            return None
+        return proc
+
+    def _stop_process(self, plugin_id: str) -> None:
+        proc = self._processes.pop(plugin_id, None)
+        if proc is not None:
+            proc.dispose()
+
+    def process_stats(self) -> Dict[str, dict]:
+        """隔离插件工作进程的状态（给 metrics 仪表用）"""
+        return {pid: proc.stats() for pid, proc in self._processes.items()}
+
     def unload_all(self) -> None:
+        for pid in list(self._processes):
+            self._stop_process(pid)
         for p in list(self._plugins.values()):
             try:
                 # 只对已激活插件执行 deactivate（按约定 _enabled=True 才激活）
                 if getattr(p, "_enabled", True):
-                    p.deactivate()
+                    with tracer.span(f"{p.id}.deactivate", cat="plugin-hook"):
+                        p.deactivate()
             except Exception:
                 self.ctx.logger(
                     f"[plugins] deactivate failed: {p.id}\n{traceback.format_exc()}"
                 )
         self._plugins.clear()
+        for pid in list(self._manifests):
+            self._drop_services(pid)
+        self._manifests.clear()
 
     # ---------- hooks ----------
 
     def extend_context_menu(self, menu) -> None:
-        """桌宠构建右键菜单时调用，插件可扩展菜单项"""
+        """
+        桌宠构建右键菜单时调用：先加清单里声明的菜单项（插件不用先加载），
+        再让已加载的插件通过 extend_context_menu 扩展
+        """
+        for manifest in self._manifests.values():
+            if not manifest.menu or not self._is_enabled(manifest.id):
+                continue
+            for entry in manifest.menu:
+                act = menu.addAction(entry.text)
+                act.triggered.connect(
+                    lambda _checked=False, pid=manifest.id, aid=entry.id: self.run_menu_action(pid, aid)
+                )
         for p in self._plugins.values():
             if not getattr(p, "_enabled", True):
                 continue
             try:
-                p.extend_context_menu(menu)
+                with tracer.span(f"{p.id}.extend_context_menu", cat="plugin-hook"):
+                    p.extend_context_menu(menu)
             except Exception:
                 self.ctx.logger(
                     f"[plugins] menu hook failed: {p.id}\n{traceback.format_exc()}"
                 )
 
+    def _is_enabled(self, plugin_id: str) -> bool:
+        p = self._plugins.get(plugin_id)
+        if p is not None:
+            return bool(getattr(p, "_enabled", True))
+        return bool(get_config_store().get(plugin_namespace(plugin_id), "enabled", True))
+
+    def run_menu_action(self, plugin_id: str, action_id: str) -> None:
+        """清单菜单项被点击：需要时先加载插件，再交给 on_menu_action（隔离插件转给工作进程）"""
+        manifest = self._manifests.get(plugin_id)
+        if manifest is not None and manifest.isolated:
+            proc = self._start_process(manifest)
+            if proc is not None:
+                proc.menu(action_id)
+            return
+        p = self.ensure_loaded(plugin_id)
+        if p is None or not getattr(p, "_enabled", True):
+            return
+        try:
+            with tracer.span(f"{plugin_id}.on_menu_action", cat="plugin-hook", action=action_id):
+                p.on_menu_action(action_id)
+        except Exception:
+            self.ctx.logger(f"[plugins] menu action failed: {plugin_id}.{action_id}\n{traceback.format_exc()}")
+
     # ---------- settings UI integration ----------
 
     def build_settings_panels(self, parent=None) -> List[Tuple[str, object]]:
@@ -171,7 +343,8 @@ class PluginManager:
         for pid, p in self._plugins.items():
             try:
                 if hasattr(p, "create_settings_widget"):
-                    w = p.create_settings_widget(parent)
+                    with tracer.span(f"{pid}.create_settings_widget", cat="plugin-hook"):
+                        w = p.create_settings_widget(parent)
                     if w is not None:
                         panels.append((pid, w))
             except Exception:
@@ -180,18 +353,19 @@ class PluginManager:
                 )
         return panels
 
-    def save_all_plugin_configs(self) -> None:
+    def save_all_plugin_configs(self, export: bool = False) -> None:
         """
         点击“保存设置”时调用：
         - 从插件设置控件收集配置 dict
-        - 写回插件目录下的 config.json（或插件自定义 config_path）
+        - 写入配置库（所有插件合并成一个事务）；export=True 时同时导出到插件的 config.json
         - 更新插件内存中的 cfg
         注意：这里不会自动启用/停用插件（如需热启用可再扩展）。
         """
         for pid, p in self._plugins.items():
             try:
                 if hasattr(p, "collect_config_from_widget"):
-                    cfg = p.collect_config_from_widget()
+                    with tracer.span(f"{pid}.collect_config_from_widget", cat="plugin-hook"):
+                        cfg = p.collect_config_from_widget()
                 else:
                     cfg = getattr(p, "cfg", None)
 
@@ -206,11 +380,12 @@ class PluginManager:
                     mod = importlib.import_module(p.__class__.__module__)
                     cfg_path = Path(mod.__file__).resolve().parent / "config.json"
 
-                _save_json(cfg_path, cfg)
+                _save_config(pid, cfg_path, cfg, export=export)
 
                 # 更新内存
                 if hasattr(p, "load_config"):
-                    p.load_config(cfg)
+                    with tracer.span(f"{pid}.load_config", cat="plugin-hook"):
+                        p.load_config(cfg)
                 else:
                     setattr(p, "cfg", cfg)
 
@@ -219,6 +394,88 @@ class PluginManager:
                     f"[plugins] save config failed: {pid}\n{traceback.format_exc()}"
                 )
 
+    # ---------- config hot reload ----------
+
+    def config_files(self) -> Dict[str, Path]:
+        """{配置库命名空间: config.json}，给配置文件监视用"""
+        return {plugin_namespace(pid): path for pid, path in self._config_paths.items()}
+
+    def reload_config(self, namespace: str) -> dict:
+        """
+        插件的 config.json 被外部修改：只导入改过的字段（类型和默认配置不符的丢弃），
+        合并进插件配置后调用 load_config / on_config_changed；enabled 变化时启用/停用插件。
+        """
+        pid = namespace[len(plugin_namespace("")):]
+        p = self._plugins.get(pid)
+        path = self._config_paths.get(pid)
+        if path is None:
+            return {}
+        manifest = self._manifests.get(pid)
+        if manifest is not None and manifest.isolated:
+            return self._reload_process_config(manifest, namespace, path)
+        if p is None:
+            # 还没加载的清单插件：只同步配置，enabled 变化时登记/撤销它的惰性服务
+            changed = get_config_store().sync_json(namespace, path)
+            if manifest is not None and "enabled" in changed:
+                if changed["enabled"]:
+                    self._register_services(manifest)
+                else:
+                    self._drop_services(pid)
+                self.ctx.logger(f"[plugins] {'enabled' if changed['enabled'] else 'disabled'}: {pid}")
+            return changed
+        defaults = p.default_config() if hasattr(p, "default_config") else {}
+
+        def validate(edited: dict) -> dict:
+            clean = {}
+            for key, value in edited.items():
+                if key in defaults and type(value) is not type(defaults[key]):
+                    self.ctx.logger(f"[plugins] {pid} 配置 {key}={value!r} 类型不对，已忽略")
+                    continue
+                clean[key] = value
+            return clean
+
+        changed = get_config_store().sync_json(namespace, path, validate=validate)
+        if not changed:
+            return {}
+        cfg = dict(getattr(p, "cfg", None) or {})
+        cfg.update(changed)
+        try:
+            with tracer.span(f"{pid}.load_config", cat="plugin-hook"):
+                p.load_config(cfg)
+                p.on_config_changed(changed)
+            if "enabled" in changed and bool(changed["enabled"]) != getattr(p, "_enabled", True):
+                p._enabled = bool(changed["enabled"])
+                if p._enabled:
+                    p.activate(self.ctx)
+                else:
+                    p.deactivate()
+                    self._drop_services(pid)
+                self.ctx.logger(f"[plugins] {'enabled' if p._enabled else 'disabled'}: {pid}")
+        except Exception:
+            self.ctx.logger(f"[plugins] config reload failed: {pid}\n{traceback.format_exc()}")
+        return changed
+
+    def _reload_process_config(self, manifest: PluginManifest, namespace: str, path: Path) -> dict:
+        """隔离插件：改过的字段转给工作进程；enabled 变化时拉起/停掉工作进程"""
+        pid = manifest.id
+        changed = get_config_store().sync_json(namespace, path)
+        if not changed:
+            return {}
+        proc = self._processes.get(pid)
+        if "enabled" in changed and not changed["enabled"]:
+            self._stop_process(pid)
+            self._drop_services(pid)
+        elif "enabled" in changed and (proc is None or not proc.running):
+            if manifest.lazy:
+                self._register_services(manifest)
+            else:
+                self._start_process(manifest)
+        elif proc is not None and proc.running:
+            proc.config_changed(changed)
+        if "enabled" in changed:
+            self.ctx.logger(f"[plugins] {'enabled' if changed['enabled'] else 'disabled'}: {pid}")
+        return changed
+
     # ---------- misc ----------
 
     def get_plugin(self, plugin_id: str) -> Optional[PluginBase]:
@@ -226,3 +483,6 @@ class PluginManager:
 
     def all_plugins(self) -> List[PluginBase]:
         return list(self._plugins.values())
+
+    def manifests(self) -> List[PluginManifest]:
+        return list(self._manifests.values())
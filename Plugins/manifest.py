@@ -0,0 +1,90 @@
+# Plugins/manifest.py
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+MANIFEST_FILE = "plugin.json"
+
+# activation：lazy = 第一次用到它的服务/菜单项时才导入并激活；startup = 启动时就加载
+ACTIVATIONS = ("lazy", "startup")
+# isolation：inline = 在主进程 GUI 线程里运行；process = 逻辑跑在独立工作进程（见 Plugins/process_host.py）
+ISOLATIONS = ("inline", "process")
+
+
+@dataclass
+class MenuEntry:
+    id: str
+    text: str
+
+
+@dataclass
+class PluginManifest:
+    """
+    插件目录下的 plugin.json：启动时只读它，不导入插件代码。
+    {
+      "id": "speech_bubble", "name": "Speech Bubble", "version": "1.0.0",
+      "services": ["say", "speech_bubble.say"],
+      "menu": [{"id": "say_hello", "text": "说一句话"}],
+      "activation": "lazy"
+    }
+    隔离插件再加 "isolation": "process", "worker": "worker"（插件包里的模块，提供 create_worker()）；
+    菜单项仍由主进程显示，点击后转给工作进程。
+    """
+
+    id: str
+    package: str  # Plugins 下的包名（目录名）
+    name: str = ""
+    version: str = "0.0.0"
+    services: List[str] = field(default_factory=list)
+    menu: List[MenuEntry] = field(default_factory=list)
+    activation: str = "lazy"
+    config: str = "config.json"  # 相对插件目录
+    isolation: str = "inline"
+    worker: str = "worker"
+
+    @property
+    def lazy(self) -> bool:
+        return self.activation == "lazy"
+
+    @property
+    def isolated(self) -> bool:
+        return self.isolation == "process"
+
+
+def load_manifest(plugin_dir: Path) -> Optional[PluginManifest]:
+    """读插件目录下的 plugin.json；没有清单返回 None（按旧方式导入），清单写错时抛 ValueError"""
+    path = Path(plugin_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path}: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("id"), str) or not data["id"]:
+        raise ValueError(f"{path}: 缺少 id")
+    activation = data.get("activation", "lazy")
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"{path}: activation 只能是 {'/'.join(ACTIVATIONS)}")
+    isolation = data.get("isolation", "inline")
+    if isolation not in ISOLATIONS:
+        raise ValueError(f"{path}: isolation 只能是 {'/'.join(ISOLATIONS)}")
+    menu = [
+        MenuEntry(id=str(m["id"]), text=str(m.get("text", m["id"])))
+        for m in data.get("menu", [])
+        if isinstance(m, dict) and m.get("id")
+    ]
+    return PluginManifest(
+        id=data["id"],
+        package=Path(plugin_dir).name,
+        name=str(data.get("name", data["id"])),
+        version=str(data.get("version", "0.0.0")),
+        services=[str(s) for s in data.get("services", [])],
+        menu=menu,
+        activation=activation,
+        config=str(data.get("config", "config.json")),
+        isolation=isolation,
+        worker=str(data.get("worker", "worker")),
+    )
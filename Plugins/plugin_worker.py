@@ -0,0 +1,234 @@
+# Plugins/plugin_worker.py
+"""
+隔离插件的工作进程（plugin.json 里 "isolation": "process"）：
+- 主进程用 `python -m Plugins.plugin_worker <包名> <模块名>` 启动，只用标准库，不导入 PyQt
+- 和主进程之间是 stdin/stdout 上换行分隔的 JSON（一行一条消息，格式见 Plugins/process_host.py）
+- 插件代码里的 print 会被转到 stderr，不会混进消息通道
+
+插件写法（Plugins/<包名>/<模块名>.py）：
+    from Plugins.plugin_worker import WorkerPlugin
+
+    class MyWorker(WorkerPlugin):
+        def activate(self, ctx):
+            super().activate(ctx)
+            ctx.subscribe("StateChanged", self.on_state)   # 事件名 = Core/event_bus.py 里的类名
+            ctx.provide("my_plugin.compute", self.compute)  # 对主进程提供服务
+            ctx.services["speech_bubble.say"]("你好", 5)      # 调主进程的服务（阻塞到主进程回复）
+
+    def create_worker():
+        return MyWorker()
+"""
+from __future__ import annotations
+
+import importlib
+import itertools
+import json
+import queue
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+# 调主进程服务时最多等多久（主进程 GUI 线程在忙时会晚一点回复）
+CALL_TIMEOUT_S = 10.0
+
+
+class RemoteError(RuntimeError):
+    """主进程那边的服务调用失败"""
+
+
+class _Channel:
+    """
+    stdin 读线程 + 加锁写 stdout；回复按 id 交给等待中的调用，其余消息进 inbox。
+    coalesce 类事件（帧 tick、移动、拖拽）每种只有最新一条会被处理：插件慢的时候自动降采样，inbox 不会越积越多
+    """
+
+    def __init__(self, stdin, stdout) -> None:
+        self._in = stdin
+        self._out = stdout
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, Dict[str, Any]] = {}
+        self._seq = itertools.count(1)
+        self._latest: Dict[str, int] = {}  # coalesce 事件类型 -> 最新一条的序号
+        self.sampled = 0  # 被更新的同类事件替换掉的 coalesce 事件
+        self.inbox: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        threading.Thread(target=self._read, name="plugin-channel", daemon=True).start()
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        line = json.dumps(msg, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._out.write(line)
+            self._out.flush()
+
+    def request(self, msg: Dict[str, Any], timeout_s: float = CALL_TIMEOUT_S) -> Any:
+        call_id = next(self._ids)
+        slot: Dict[str, Any] = {"event": threading.Event()}
+        self._waiting[call_id] = slot
+        try:
+            self.send(dict(msg, id=call_id))
+            if not slot["event"].wait(timeout_s):
+                raise TimeoutError(f"{msg.get('service')} 在 {timeout_s:g}s 内没有回复")
+        finally:
+            self._waiting.pop(call_id, None)
+        reply = slot["reply"]
+        if reply["op"] == "error":
+            raise RemoteError(reply.get("error", ""))
+        return reply.get("value")
+
+    def superseded(self, msg: Dict[str, Any]) -> bool:
+        """coalesce 事件后面已经有同类的新事件在排队"""
+        if "seq" not in msg or self._latest.get(msg.get("type")) == msg["seq"]:
+            return False
+        self.sampled += 1
+        return True
+
+    def _read(self) -> None:
+        for line in self._in:
+            if not line.strip():
+                continue
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if msg.get("op") in ("result", "error") and msg.get("id") in self._waiting:
+                slot = self._waiting[msg["id"]]
+                slot["reply"] = msg
+                slot["event"].set()
+                continue
+            if msg.get("op") == "event" and msg.get("coalesce"):
+                msg["seq"] = self._latest[msg.get("type")] = next(self._seq)
+            self.inbox.put(msg)
+        self.inbox.put(None)  # 主进程关掉了管道（退出或崩溃）
+
+
+class _RemoteServices:
+    """主进程 AppContext.services 的代理：services["x"](*args) 变成一次请求/回复"""
+
+    def __init__(self, channel: _Channel) -> None:
+        self._channel = channel
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        def call(*args: Any) -> Any:
+            return self._channel.request({"op": "call", "service": name, "args": list(args)})
+
+        return call
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """和 dict.get 一样：主进程没有这个服务（或问不到）时返回 default"""
+        try:
+            present = self._channel.request({"op": "has", "service": name})
+        except (RemoteError, TimeoutError):
+            return default
+        return self[name] if present else default
+
+
+class WorkerContext:
+    """工作进程里的 AppContext：服务代理 + 事件订阅 + 对外提供服务"""
+
+    def __init__(self, channel: _Channel, plugin_id: str, config: Dict[str, Any]) -> None:
+        self._channel = channel
+        self.plugin_id = plugin_id
+        self.config = config
+        self.services = _RemoteServices(channel)
+        self.provided: Dict[str, Callable[..., Any]] = {}
+        self.handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+    def provide(self, name: str, fn: Callable[..., Any]) -> None:
+        self.provided[name] = fn
+
+    def subscribe(self, event_name: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """事件以 dict 送达（dataclass 的字段）"""
+        first = event_name not in self.handlers
+        self.handlers.setdefault(event_name, []).append(callback)
+        if first:
+            self._channel.send({"op": "subscribe", "events": [event_name]})
+
+    def log(self, text: str) -> None:
+        self._channel.send({"op": "log", "text": str(text)})
+
+
+class WorkerPlugin:
+    """隔离插件的逻辑部分（在工作进程里运行，不能导入 PyQt / 操作界面）"""
+
+    def __init__(self) -> None:
+        self.ctx: Optional[WorkerContext] = None
+        self.cfg: Dict[str, Any] = {}
+
+    def default_config(self) -> dict:
+        return {}
+
+    def activate(self, ctx: WorkerContext) -> None:
+        self.ctx = ctx
+        self.cfg = dict(self.default_config(), **ctx.config)
+
+    def deactivate(self) -> None:
+        self.ctx = None
+
+    def on_menu_action(self, action_id: str) -> None:
+        return
+
+    def on_config_changed(self, changed: dict) -> None:
+        """config.json 被外部修改（self.cfg 已更新）"""
+        return
+
+
+def _serve(channel: _Channel, plugin: WorkerPlugin, ctx: WorkerContext) -> None:
+    while True:
+        msg = channel.inbox.get()
+        if msg is None or msg.get("op") == "stop":
+            return
+        op = msg.get("op")
+        try:
+            if op == "event":
+                if channel.superseded(msg):
+                    continue
+                for callback in ctx.handlers.get(msg.get("type"), []):
+                    callback(msg.get("data") or {})
+            elif op == "call":
+                fn = ctx.provided.get(msg.get("service"))
+                if fn is None:
+                    raise KeyError(f"没有服务 {msg.get('service')}")
+                channel.send({"op": "result", "id": msg.get("id"), "value": fn(*msg.get("args", []))})
+            elif op == "menu":
+                plugin.on_menu_action(msg.get("action", ""))
+            elif op == "config":
+                changed = msg.get("changed") or {}
+                plugin.cfg.update(changed)
+                plugin.on_config_changed(changed)
+        except Exception as e:
+            if op == "call":
+                channel.send({"op": "error", "id": msg.get("id"), "error": f"{type(e).__name__}: {e}"})
+            else:
+                ctx.log(f"{op} 处理失败：\n{traceback.format_exc()}")
+
+
+def main(argv: List[str]) -> int:
+    package, module = argv[0], argv[1]
+    channel = _Channel(sys.stdin, sys.stdout)
+    sys.stdout = sys.stderr  # 插件的 print 不能混进消息通道
+
+    first = channel.inbox.get()  # {"op": "activate", "plugin": id, "config": {...}}
+    if first is None or first.get("op") != "activate":
+        return 1
+    ctx = WorkerContext(channel, first.get("plugin", package), first.get("config") or {})
+    try:
+        mod = importlib.import_module(f"Plugins.{package}.{module}")
+        plugin: WorkerPlugin = mod.create_worker()
+        plugin.activate(ctx)
+    except Exception:
+        channel.send({"op": "fatal", "error": traceback.format_exc()})
+        return 1
+    channel.send({"op": "ready", "services": sorted(ctx.provided), "events": sorted(ctx.handlers)})
+    try:
+        _serve(channel, plugin, ctx)
+    finally:
+        try:
+            plugin.deactivate()
+        except Exception:
+            traceback.print_exc()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,233 @@
+# Plugins/process_host.py
+"""
+隔离插件的主进程一侧：每个插件一个工作进程（QProcess），消息走 stdin/stdout 的换行分隔 JSON。
+主进程 -> 工作进程：
+  {"op": "activate", "plugin": id, "config": {...}}   启动后第一条
+  {"op": "event", "type": "StateChanged", "data": {...}, "coalesce": true?}
+  {"op": "call", "id": n, "service": name, "args": [...]}   调工作进程提供的服务
+  {"op": "menu", "action": id} / {"op": "config", "changed": {...}} / {"op": "stop"}
+工作进程 -> 主进程：
+  {"op": "ready", "services": [...]} / {"op": "subscribe", "events": [...]} / {"op": "log", "text": ...}
+  {"op": "call", "id": n, "service": name, "args": [...]}   调主进程的 AppContext.services
+  {"op": "has", "id": n, "service": name}                   主进程有没有这个服务（services.get 用）
+  {"op": "result" | "error", "id": n, ...}                   回复
+事件经 EventBus 按 tick 批量、按预算送达后只是写一行，插件再慢也只拖慢自己的进程。
+"""
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5.QtCore import QCoreApplication, QObject, QProcess, QTimer
+
+from Core import event_bus
+from Plugins.manifest import PluginManifest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 工作进程意外退出后最多自动重启几次
+MAX_RESTARTS = 3
+# stop 之后多久还没退出就 kill（不阻塞，期间事件循环照常）
+STOP_GRACE_MS = 1000
+# 应用退出时事件循环已经停了：只能同步等，最多等这么久
+QUIT_WAIT_MS = 200
+
+
+def _json_safe(value: Any) -> Any:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+class PluginProcess(QObject):
+    def __init__(self, manifest: PluginManifest, ctx, config: Dict[str, Any], parent=None) -> None:
+        super().__init__(parent)
+        self.manifest = manifest
+        self.ctx = ctx
+        self.config = dict(config)
+        self.ready = False
+        self.restarts = 0
+        self._stopping = False
+        self._buf = b""
+        self._ids = itertools.count(1)
+        self._callbacks: Dict[int, Optional[Callable[[Any], None]]] = {}
+        self._unsubscribe: Dict[str, Callable[[], None]] = {}
+        self.calls_in = 0  # 工作进程调主进程服务的次数
+        self.calls_out = 0  # 主进程调工作进程服务的次数
+
+        self._proc = QProcess(self)
+        self._proc.setWorkingDirectory(str(ROOT))
+        self._proc.setProcessChannelMode(QProcess.ForwardedErrorChannel)  # 插件的 print/报错直接进主进程 stderr
+        self._proc.readyReadStandardOutput.connect(self._on_ready_read)
+        self._proc.finished.connect(self._on_finished)
+        scheduler = getattr(ctx, "scheduler", None)
+        if scheduler is not None:
+            self._kill_job = scheduler.job(f"plugins.{manifest.id}.kill", self._proc.kill, single_shot=True)
+        else:
+            self._kill_job = QTimer(self)
+            self._kill_job.setSingleShot(True)
+            self._kill_job.timeout.connect(self._proc.kill)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._on_quit)
+
+    # ---------- 生命周期 ----------
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self.ready = False
+        self._buf = b""
+        self._proc.start(sys.executable, ["-m", "Plugins.plugin_worker", self.manifest.package, self.manifest.worker])
+        self._send({"op": "activate", "plugin": self.manifest.id, "config": self.config})
+
+    @property
+    def running(self) -> bool:
+        return self._proc.state() != QProcess.NotRunning
+
+    def stop(self) -> None:
+        """不阻塞 GUI：发 stop、关掉 stdin，工作进程自己退出；STOP_GRACE_MS 内没退出就 kill"""
+        self._stopping = True
+        self._drop_subscriptions()
+        if not self.running:
+            return
+        self._send({"op": "stop"})
+        self._proc.closeWriteChannel()
+        self._kill_job.start(STOP_GRACE_MS)
+
+    def dispose(self) -> None:
+        """停掉并在进程退出后释放自己（插件被停用时）"""
+        self.stop()
+        if self.running:
+            self._proc.finished.connect(self.deleteLater)
+        else:
+            self.deleteLater()
+
+    def _on_quit(self) -> None:
+        # 事件循环已经结束，finished 不会再来：短暂同步等一下，还不退就 kill
+        self.stop()
+        if self.running and not self._proc.waitForFinished(QUIT_WAIT_MS):
+            self._proc.kill()
+            self._proc.waitForFinished(QUIT_WAIT_MS)
+
+    def _on_finished(self, code: int, _status) -> None:
+        self._kill_job.stop()
+        self.ready = False
+        self._drop_subscriptions()
+        for callback in self._callbacks.values():
+            if callback is not None:
+                callback(None)
+        self._callbacks.clear()
+        if self._stopping:
+            return
+        self.ctx.logger(f"[plugins] {self.manifest.id} 工作进程退出（code={code}）")
+        if self.restarts < MAX_RESTARTS:
+            self.restarts += 1
+            self.start()
+
+    # ---------- 主进程 -> 工作进程 ----------
+
+    def _send(self, msg: Dict[str, Any]) -> None:
+        if self.running:
+            self._proc.write(json.dumps(msg, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+    def call(self, service: str, args, callback: Optional[Callable[[Any], None]] = None) -> None:
+        """异步调用工作进程提供的服务；结果（出错/进程退出时为 None）交给 callback，在 GUI 线程里调用"""
+        call_id = next(self._ids)
+        self._callbacks[call_id] = callback
+        self.calls_out += 1
+        self._send({"op": "call", "id": call_id, "service": service, "args": list(args)})
+
+    def proxy(self, service: str) -> Callable[..., None]:
+        """放进 AppContext.services 的代理：proxy(*args, callback=None)，不等结果、不阻塞 GUI"""
+
+        def call(*args: Any, callback: Optional[Callable[[Any], None]] = None) -> None:
+            self.call(service, args, callback)
+
+        return call
+
+    def menu(self, action_id: str) -> None:
+        self._send({"op": "menu", "action": action_id})
+
+    def config_changed(self, changed: Dict[str, Any]) -> None:
+        self.config.update(changed)
+        self._send({"op": "config", "changed": changed})
+
+    def _forward_event(self, event) -> None:
+        msg = {"op": "event", "type": type(event).__name__, "data": _json_safe(dataclasses.asdict(event))}
+        if event.coalesce:
+            msg["coalesce"] = True  # 工作进程里积压时只处理最新一条
+        self._send(msg)
+
+    def _drop_subscriptions(self) -> None:
+        for unsubscribe in self._unsubscribe.values():
+            unsubscribe()
+        self._unsubscribe = {}
+
+    # ---------- 工作进程 -> 主进程 ----------
+
+    def _on_ready_read(self) -> None:
+        self._buf += bytes(self._proc.readAllStandardOutput())
+        *lines, self._buf = self._buf.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                self.ctx.logger(f"[plugins] {self.manifest.id} 输出了无法解析的消息：{line[:200]!r}")
+                continue
+            self._handle(msg)
+
+    def _handle(self, msg: Dict[str, Any]) -> None:
+        op = msg.get("op")
+        if op == "ready":
+            self.ready = True
+            self.ctx.logger(f"[plugins] loaded: {self.manifest.id} ({self.manifest.name}, 独立进程)")
+        elif op == "subscribe":
+            for name in msg.get("events", []):
+                cls = getattr(event_bus, str(name), None)
+                if not (isinstance(cls, type) and issubclass(cls, event_bus.PetEvent)):
+                    self.ctx.logger(f"[plugins] {self.manifest.id} 订阅了未知事件 {name}")
+                    continue
+                if name not in self._unsubscribe and self.ctx.events is not None:
+                    self._unsubscribe[name] = self.ctx.events.subscribe(cls, self._forward_event, owner=self.manifest.id)
+        elif op == "call":
+            self.calls_in += 1
+            try:
+                fn = self.ctx.services[msg.get("service")]
+                value = fn(*msg.get("args", []))
+                self._send({"op": "result", "id": msg.get("id"), "value": _json_safe(value)})
+            except Exception as e:
+                self._send({"op": "error", "id": msg.get("id"), "error": f"{type(e).__name__}: {e}"})
+        elif op == "has":
+            present = callable(self.ctx.services.get(msg.get("service")))
+            self._send({"op": "result", "id": msg.get("id"), "value": present})
+        elif op in ("result", "error"):
+            callback = self._callbacks.pop(msg.get("id"), None)
+            if op == "error":
+                self.ctx.logger(f"[plugins] {self.manifest.id} 服务调用失败：{msg.get('error')}")
+            if callback is not None:
+                callback(msg.get("value") if op == "result" else None)
+        elif op == "log":
+            self.ctx.logger(f"[{self.manifest.id}] {msg.get('text', '')}")
+        elif op == "fatal":
+            self._stopping = True  # 激活就失败：重启也没用
+            self.ctx.logger(f"[plugins] {self.manifest.id} 工作进程启动失败：\n{msg.get('error', '')}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": int(self._proc.processId()) if self.running else None,
+            "ready": self.ready,
+            "restarts": self.restarts,
+            "calls_in": self.calls_in,
+            "calls_out": self.calls_out,
+            "events": sorted(self._unsubscribe),
+        }
@@ -0,0 +1,7 @@
+# Plugins/rest_reminder
+# 隔离插件示例（plugin.json 里 "isolation": "process"）：逻辑在 worker.py，跑在独立工作进程，
+# 主进程不导入它；定时通过 speech_bubble.say 提醒休息，拖动桌宠会重新计时。
+#
+# 其它插件/主程序可调用：
+#   snooze = ctx.services.get("rest_reminder.snooze")
+#   snooze(10)                                  # 推迟 10 分钟（不阻塞，结果可用 callback= 取）
@@ -0,0 +1,71 @@
+# Plugins/rest_reminder/worker.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from Plugins.plugin_worker import RemoteError, WorkerContext, WorkerPlugin
+
+
+class RestReminder(WorkerPlugin):
+    def __init__(self) -> None:
+        super().__init__()
+        self._due = 0.0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def default_config(self) -> dict:
+        return {"enabled": False, "interval_min": 45, "message": "坐了好久啦，起来活动一下吧~", "close_after": 8}
+
+    def activate(self, ctx: WorkerContext) -> None:
+        super().activate(ctx)
+        self._reset()
+        ctx.provide("rest_reminder.snooze", self.snooze)
+        ctx.subscribe("DragFinished", lambda _event: self._reset())  # 拖过桌宠 = 人在电脑前，重新计时
+        threading.Thread(target=self._run, name="rest-reminder", daemon=True).start()
+
+    def deactivate(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        super().deactivate()
+
+    def _reset(self, minutes: Optional[float] = None) -> None:
+        interval = float(self.cfg.get("interval_min", 45)) if minutes is None else float(minutes)
+        self._due = time.monotonic() + max(interval, 0.1) * 60.0
+        self._wake.set()
+
+    def snooze(self, minutes: float = 10) -> float:
+        """推迟提醒，返回距下次提醒的秒数"""
+        self._reset(minutes)
+        return self._due - time.monotonic()
+
+    def _run(self) -> None:
+        # 在工作进程自己的线程里等待和调用，阻塞多久都不影响桌宠
+        while not self._stopped.is_set():
+            self._wake.clear()
+            if not self._wake.wait(max(self._due - time.monotonic(), 0.0)) and not self._stopped.is_set():
+                self._remind()
+                self._reset()
+
+    def _remind(self) -> None:
+        ctx = self.ctx
+        if ctx is None:
+            return
+        try:
+            ctx.services["speech_bubble.say"](self.cfg.get("message", ""), int(self.cfg.get("close_after", 8)))
+        except (RemoteError, TimeoutError) as e:
+            ctx.log(f"提醒失败：{e}")
+
+    def on_menu_action(self, action_id: str) -> None:
+        if action_id == "remind_now":
+            self._remind()
+            self._reset()
+
+    def on_config_changed(self, changed: dict) -> None:
+        if "interval_min" in changed:
+            self._reset()
+
+
+def create_worker() -> RestReminder:
+    return RestReminder()
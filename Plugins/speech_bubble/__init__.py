@@ -6,15 +6,17 @@
 # # 或：say = ctx.services.get("say")          # 兼容别名
 # if callable(say):
 #     say("你好，我在说话~", 5)
+#
+# 服务和菜单项在 plugin.json 里声明：第一次取用 say / 点菜单项时才导入并激活本插件，
+# 气泡窗口则等第一次说话时才创建。
 
 
 # plugins/speech_bubble/__init__.py
 from __future__ import annotations
 from PyQt5.QtCore import QPoint, QRect
-from PyQt5.QtWidgets import QAction
 
+from Core.event_bus import PetDragged, PetMoved
 from Plugins.base import PluginBase, AppContext
-from .bubble import SpeechBubble
 
 
 class SpeechBubblePlugin(PluginBase):
@@ -24,7 +26,8 @@ class SpeechBubblePlugin(PluginBase):
 
     def __init__(self):
         super().__init__()
-        self._bubble = SpeechBubble()
+        self._bubble = None
+        self._anchor = None  # (说话时的锚点矩形, 当时桌宠的位置)
 
     def activate(self, ctx: AppContext) -> None:
         super().activate(ctx)
@@ -40,17 +43,40 @@ class SpeechBubblePlugin(PluginBase):
                 top_left = pet.mapToGlobal(QPoint(0, 0))
                 rect = QRect(top_left, pet.size())
 
-            self._bubble.show_text(text, rect, close_after=close_after)
+            self._anchor = (rect, pet.pos())
+            self._ensure_bubble().show_text(text, rect, close_after=close_after)
 
         # 你想怎么叫都行：这里给个通用名 + 一个带命名空间的别名
         ctx.services["say"] = say
         ctx.services["speech_bubble.say"] = say
+        # 桌宠走动/被拖动时气泡跟着走（按 tick 批量送达，慢的时候只处理最新位置）
+        self.subscribe(PetMoved, self._follow_pet)
+        self.subscribe(PetDragged, self._follow_pet)
+
+    def _follow_pet(self, _event) -> None:
+        if self._bubble is None or self._anchor is None or not self._bubble.isVisible():
+            return
+        rect, pos = self._anchor
+        self._bubble.follow(rect.translated(self.ctx.pet.pos() - pos))
+
+    def _ensure_bubble(self):
+        if self._bubble is None:
+            from .bubble import SpeechBubble
+
+            self._bubble = SpeechBubble(scheduler=self.ctx.scheduler)
+        return self._bubble
+
+    def deactivate(self) -> None:
+        if self._bubble is not None:
+            self._bubble.close()
+            self._bubble.deleteLater()
+            self._bubble = None
+        super().deactivate()
 
-    def extend_context_menu(self, menu):
-        # 右键菜单里加一个“说一句话”的示例
-        act = QAction("说一句话", menu)
-        act.triggered.connect(lambda: self.ctx.services["say"]("咕咕嘎嘎", 5))
-        menu.addAction(act)
+    def on_menu_action(self, action_id: str) -> None:
+        # 右键菜单里“说一句话”的示例（菜单项见 plugin.json）
+        if action_id == "say_hello":
+            self.ctx.services["say"]("咕咕嘎嘎", 5)
 
 
 def create_plugin():
@@ -26,6 +26,7 @@ class SpeechBubble(QWidget):
         timing: BubbleTiming = BubbleTiming(),
         gap_to_anchor: int = 0,  # ✅ 气泡尾巴尖尖距离桌宠的“竖直间隙”，越小越贴近
         corner_offset: int = 10,  # ✅ 尾巴距气泡左右边缘的偏移（越小越靠角落）
+        scheduler=None,  # ✅ 传入 AppContext.scheduler 时，自动关闭挂到统一调度器上
     ):
         super().__init__(None)
 
@@ -60,9 +61,13 @@ class SpeechBubble(QWidget):
         lay.setContentsMargins(padding, padding, padding, padding + tail)
         lay.addWidget(self.label)
 
-        self._timer = QTimer(self)
-        self._timer.setSingleShot(True)
-        self._timer.timeout.connect(self.close)
+        if scheduler is not None:
+            # 关闭时间晚 200ms 看不出来，正好和其它任务合并唤醒
+            self._timer = scheduler.job("speech_bubble.close", self.close, single_shot=True, tolerance_ms=200)
+        else:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.close)
 
     def show_text(
         self, text: str, anchor_rect_global: QRect, close_after: int = 5
@@ -80,6 +85,11 @@ class SpeechBubble(QWidget):
         self.show()
         self.raise_()
 
+    def follow(self, anchor_rect_global: QRect) -> None:
+        """桌宠移动后跟着挪（只在显示中时）"""
+        if self.isVisible():
+            self._place(anchor_rect_global)
+
     def _duration_ms(self, text: str) -> int:
         n = len(text.strip())
         ms = self._timing.base_ms + n * self._timing.per_char_ms
@@ -1,10 +1,13 @@
 # Settings/settings_dialog.py
-from PyQt5.QtWidgets import QDialog, QVBoxLayout
-from PyQt5.QtCore import QSignalBlocker, pyqtSignal
+from PyQt5.QtWidgets import QDialog, QListView, QListWidget, QListWidgetItem, QVBoxLayout
+from PyQt5.QtCore import QSignalBlocker, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
 from pathlib import Path
 from Settings.settings_window_ui import Ui_settings_window
 from Settings.settings_model import AppSettings
 from Settings.settings_store import load_settings, save_settings
+from Settings.skin_previews import SkinPreviewLoader, split_strip
+from Core.asset_index import get_asset_index
 
 
 class SettingsDialog(QDialog):
@@ -20,7 +23,9 @@ class SettingsDialog(QDialog):
             layout.setContentsMargins(10, 10, 10, 10)
             layout.setSpacing(10)
         self.setWindowTitle("设置")
+        self.setAttribute(Qt.WA_DeleteOnClose)  # 关掉就释放：旧窗口不会挂在桌宠下面继续占着预览任务
         current = load_settings().to_dict() if current is None else current
+        self._current = dict(current)  # 界面上没有的字段（如 shared_frames）保存时原样带回
         self.populate_characters()  # 获取角色选项
         self.ui.character_comboBox.currentTextChanged.connect(
             self.on_character_changed
@@ -30,6 +35,98 @@ class SettingsDialog(QDialog):
         self.ui.save_Button.clicked.connect(self.on_save_clicked)
         self.ui.restore_Button.clicked.connect(self.on_restore_clicked)
 
+        self._init_previews()
+
+    # ---------- 皮肤预览 ----------
+
+    def _init_previews(self) -> None:
+        """“皮肤预览”页：先放占位项，缩略图由后台线程逐个填进来"""
+        self._preview_frames: dict = {}  # (character, skin) -> [QPixmap, ...]
+        self._preview_items: dict = {}  # (character, skin) -> QListWidgetItem
+        self._preview_tick = 0
+        self._preview_cancelled = False  # 隐藏时丢掉了排队中的预览任务，再显示要补上
+
+        self.preview_list = QListWidget()
+        self.preview_list.setViewMode(QListView.IconMode)
+        self.preview_list.setIconSize(SkinPreviewLoader.icon_size())
+        self.preview_list.setResizeMode(QListView.Adjust)
+        self.preview_list.setMovement(QListView.Static)
+        self.preview_list.setUniformItemSizes(True)
+        self.preview_list.setSpacing(8)
+        self.preview_list.itemClicked.connect(self.on_preview_clicked)
+        self.ui.tabWidget.insertTab(1, self.preview_list, "皮肤预览")
+
+        self._preview_loader = SkinPreviewLoader(self)
+        self._preview_loader.ready.connect(self.on_preview_ready)
+
+        placeholder = QPixmap(SkinPreviewLoader.icon_size())
+        placeholder.fill(Qt.transparent)
+        index = get_asset_index()
+        for character in index.characters():
+            for skin in index.skins(character):
+                item = QListWidgetItem(QIcon(placeholder), f"{character}\n{skin}")
+                item.setData(Qt.UserRole, (character, skin))
+                self.preview_list.addItem(item)
+                self._preview_items[(character, skin)] = item
+                self._preview_loader.request(character, skin)
+
+        # 只让选中的那一项循环播放，开销可以忽略
+        scheduler = getattr(self.parent(), "scheduler", None)
+        if scheduler is not None:
+            self._preview_timer = scheduler.job(
+                "settings.preview", self._animate_preview, interval_ms=150, tolerance_ms=30
+            )
+        else:
+            self._preview_timer = QTimer(self)
+            self._preview_timer.setInterval(150)
+            self._preview_timer.timeout.connect(self._animate_preview)
+
+    def on_preview_ready(self, character: str, skin: str, strip: QImage) -> None:
+        frames = [QPixmap.fromImage(img) for img in split_strip(strip)]
+        self._preview_frames[(character, skin)] = frames
+        item = self._preview_items.get((character, skin))
+        if item is not None:
+            item.setIcon(QIcon(frames[0]))
+        if character == self.ui.character_comboBox.currentText():
+            idx = self.ui.skin_comboBox.findText(skin)
+            if idx >= 0:
+                self.ui.skin_comboBox.setItemIcon(idx, QIcon(frames[0]))
+        if self.isVisible() and not self._preview_timer.isActive():
+            self._preview_timer.start()
+
+    def on_preview_clicked(self, item: QListWidgetItem) -> None:
+        """点预览 = 在“设置”页选中对应角色和皮肤（仍需点保存才生效）"""
+        character, skin = item.data(Qt.UserRole)
+        self._set_combo_text(self.ui.character_comboBox, character)
+        self._set_combo_text(self.ui.skin_comboBox, skin)
+
+    def _animate_preview(self) -> None:
+        item = self.preview_list.currentItem()
+        if item is None:
+            return
+        frames = self._preview_frames.get(tuple(item.data(Qt.UserRole)))
+        if not frames:
+            return
+        self._preview_tick += 1
+        item.setIcon(QIcon(frames[self._preview_tick % len(frames)]))
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._preview_cancelled:
+            self._preview_cancelled = False
+            for key in self._preview_items:
+                if key not in self._preview_frames:
+                    self._preview_loader.request(*key)
+        if self._preview_frames and not self._preview_timer.isActive():
+            self._preview_timer.start()
+
+    def hideEvent(self, event) -> None:
+        # 隐藏后才完成的预览照样收下（再显示时能用），但不会再启动播放任务
+        self._preview_timer.stop()
+        self._preview_loader.cancel()
+        self._preview_cancelled = True
+        super().hideEvent(event)
+
     def _assets_dir(self) -> Path:
         # Settings/settings_dialog.py 的上一级是 Settings，再上一级是项目根目录
         return Path(__file__).resolve().parents[1] / "Assets"
@@ -44,11 +141,10 @@ class SettingsDialog(QDialog):
                 self.ui.character_comboBox.addItem("（未找到 Assets 文件夹）")
                 return
 
-            chars = sorted(
-                p.name
-                for p in assets.iterdir()
-                if p.is_dir() and not p.name.startswith(".")
-            )
+            # 角色/皮肤名单来自资源索引：只 stat 目录，不再每次 iterdir
+            index = get_asset_index()
+            index.refresh(deep=False)
+            chars = index.characters()
 
             if not chars:
                 self.ui.character_comboBox.addItem("（Assets 为空）")
@@ -57,17 +153,14 @@ class SettingsDialog(QDialog):
             self.ui.character_comboBox.addItems(chars)
 
     def populate_skins(self, character: str):
-        skins_dir = self._assets_dir() / character
         with QSignalBlocker(self.ui.skin_comboBox):  # type: ignore[arg-type]
             self.ui.skin_comboBox.clear()
-            if not skins_dir.exists():
-                return
-            skins = sorted(
-                p.name
-                for p in skins_dir.iterdir()
-                if p.is_dir() and not p.name.startswith(".")
-            )
-            self.ui.skin_comboBox.addItems(skins)
+            for skin in get_asset_index().skins(character):
+                frames = getattr(self, "_preview_frames", {}).get((character, skin))
+                if frames:
+                    self.ui.skin_comboBox.addItem(QIcon(frames[0]), skin)
+                else:
+                    self.ui.skin_comboBox.addItem(skin)
 
     def on_character_changed(self, character: str):
         self.populate_skins(character)
@@ -116,17 +209,18 @@ class SettingsDialog(QDialog):
         del blockers
 
     def read_from_ui(self) -> AppSettings:
-        return AppSettings(
-            character=self.ui.character_comboBox.currentText(),
-            skin=self.ui.skin_comboBox.currentText(),
-            enable_move=self.ui.ifmove_checkBox.isChecked(),
-            speed=self.ui.speed_Slider.value(),
-            move_probability=self.ui.speedprobably_Slider.value(),  # 0~100
-            move_duration_min=self.ui.minmovetime_spinBox.value(),
-            move_duration_max=self.ui.maxmovetime_spinBox.value(),
-            fps=self.ui.fps_spinBox.value(),
-            pet_size=self.ui.size_spinBox.value(),
-        )
+        # 从打开时的设置出发，只覆盖界面上有控件的字段（shared_frames 等保持原值）
+        s = AppSettings.from_dict(self._current)
+        s.character = self.ui.character_comboBox.currentText()
+        s.skin = self.ui.skin_comboBox.currentText()
+        s.enable_move = self.ui.ifmove_checkBox.isChecked()
+        s.speed = self.ui.speed_Slider.value()
+        s.move_probability = self.ui.speedprobably_Slider.value()  # 0~100
+        s.move_duration_min = self.ui.minmovetime_spinBox.value()
+        s.move_duration_max = self.ui.maxmovetime_spinBox.value()
+        s.fps = self.ui.fps_spinBox.value()
+        s.pet_size = self.ui.size_spinBox.value()
+        return s
 
     def on_save_clicked(self):
         s = self.read_from_ui()
@@ -135,7 +229,7 @@ class SettingsDialog(QDialog):
         if s.move_duration_min > s.move_duration_max:
             s.move_duration_max = s.move_duration_min
 
-        save_settings(s)  # 写入 Settings/config.json
+        save_settings(s, export=True)  # 写入配置库，并导出 Settings/config.json 给外部工具
         self.settings_saved.emit(s.to_dict())  # ✅ 只有这里才通知桌宠刷新
         self.accept()  # 关闭窗口（不想关就删掉）
 
@@ -1,5 +1,6 @@
 # settings_model.py
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, List, Tuple
 
 
 @dataclass
@@ -16,6 +17,8 @@ class AppSettings:
     fps: int = 30
     pet_size: int = 300
 
+    shared_frames: bool = False  # 多个桌宠进程共享解码好的源帧（共享内存段）
+
     def to_dict(self) -> dict:
         return asdict(self)
 
@@ -26,3 +29,49 @@ class AppSettings:
             if hasattr(s, k):
                 setattr(s, k, v)
         return s
+
+
+# 外部改配置文件时的取值范围（和设置页控件的范围一致）
+_LIMITS = {
+    "speed": (0, 50),
+    "move_probability": (0, 100),
+    "move_duration_min": (0, 600000),
+    "move_duration_max": (0, 600000),
+    "fps": (1, 240),
+    "pet_size": (100, 800),
+}
+
+
+def validate_settings(d: dict) -> Tuple[Dict[str, Any], List[str]]:
+    """校验外部写入的字段：类型要和默认值一致、数值在范围内；返回 (合法字段, 错误说明)"""
+    defaults = AppSettings().to_dict()
+    clean, errors = {}, []
+    for key, value in d.items():
+        if key not in defaults:
+            continue  # 未知字段忽略
+        expected = type(defaults[key])
+        if expected is int:
+            ok = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            ok = isinstance(value, expected)
+        if not ok:
+            errors.append(f"{key} 应为 {expected.__name__}，实际是 {value!r}")
+            continue
+        if key in _LIMITS and not _LIMITS[key][0] <= value <= _LIMITS[key][1]:
+            errors.append(f"{key}={value} 超出范围 {_LIMITS[key]}")
+            continue
+        if expected is str and not value.strip():
+            errors.append(f"{key} 不能为空")
+            continue
+        clean[key] = value
+    return clean, errors
+
+
+def diff_settings(old: AppSettings, new: AppSettings) -> Dict[str, Tuple[Any, Any]]:
+    """逐字段比较，返回 {字段: (旧值, 新值)}，只含真正变化的字段"""
+    out = {}
+    for f in fields(AppSettings):
+        a, b = getattr(old, f.name), getattr(new, f.name)
+        if a != b:
+            out[f.name] = (a, b)
+    return out
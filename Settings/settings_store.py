@@ -2,38 +2,48 @@
 import json
 from pathlib import Path
 from Settings.settings_model import AppSettings
+from Core.config_store import APP_NAMESPACE, get_config_store
+from Core.tracing import traced
 
 
 def get_config_path() -> Path:
     return Path(__file__).resolve().parent / "config.json"
 
 
+@traced("settings.load", cat="io")
 def load_settings() -> AppSettings:
+    """
+    设置存在配置库（Core/config_store.py）里；config.json 是导入/导出面：
+    首次启动整份导入，之后只导入在文件里被外部改过的字段
+    """
     path = get_config_path()
+    store = get_config_store()
+    if path.exists() and store.json_changed(APP_NAMESPACE, path) and not _is_json_object(path):
+        # 解析失败：备份坏文件，下面用库里的设置重新导出
+        try:
+            path.replace(path.with_suffix(".bad.json"))
+        except OSError:
+            pass
+    store.sync_json(APP_NAMESPACE, path)
+    s = AppSettings.from_dict(store.namespace(APP_NAMESPACE))
+    # 补齐新增字段的默认值（不产生写入，除非真的缺）
+    store.update(APP_NAMESPACE, s.to_dict())
     if not path.exists():
-        s = AppSettings()
-        save_settings(s)  # 关键：落盘创建 config.json
-        return s
+        store.export_json(APP_NAMESPACE, path)  # 关键：落盘创建 config.json
+    return s
+
 
+def _is_json_object(path: Path) -> bool:
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        return AppSettings.from_dict(data)
+        return isinstance(json.loads(path.read_text(encoding="utf-8")), dict)
     except Exception:
-        # ✅ 解析失败：备份坏文件并重建
-        bad = path.with_suffix(".bad.json")
-        try:
-            path.replace(bad)
-        except Exception:
-            pass
-        s = AppSettings()
-        save_settings(s)
-        return s
+        return False
 
 
-def save_settings(s: AppSettings) -> None:
-    path = get_config_path()
-    tmp = path.with_suffix(".tmp")
-    tmp.write_text(
-        json.dumps(s.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
-    )
-    tmp.replace(path)
+@traced("settings.save", cat="io")
+def save_settings(s: AppSettings, export: bool = False) -> None:
+    """写入配置库（延迟合并成一个事务）；export=True 时同时导出 config.json 给外部工具"""
+    store = get_config_store()
+    store.update(APP_NAMESPACE, s.to_dict())
+    if export:
+        store.export_json(APP_NAMESPACE, get_config_path())
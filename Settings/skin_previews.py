@@ -0,0 +1,157 @@
+# Settings/skin_previews.py
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPainter
+
+from Core.asset_index import CACHE_DIR, get_asset_index
+
+PREVIEW_SIZE = 96  # 预览边长（px）
+PREVIEW_FRAMES = 8  # 循环预览抽取的帧数
+PREVIEW_STATES = ("Relax", "Sit", "Move", "Interact")  # 优先用哪个状态做预览
+PREVIEW_CACHE_DIR = CACHE_DIR / "previews"
+
+
+def preview_cache_path(character: str, skin: str, state: str, mtime: int, count: int) -> Path:
+    """
+    缓存文件名按“皮肤 + 状态 + 资源 mtime + 帧数 + 预览参数”取哈希：资源一改就自然失效
+    （删帧不会让剩下帧的 mtime 变新，所以帧数也要算进去）
+    """
+    raw = f"{character}/{skin}/{state}/{mtime}/{count}/{PREVIEW_SIZE}/{PREVIEW_FRAMES}"
+    return PREVIEW_CACHE_DIR / (hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".png")
+
+
+def pick_frames(files: List[str], count: int = PREVIEW_FRAMES) -> List[str]:
+    """从整段动画里均匀抽 count 帧"""
+    if len(files) <= count:
+        return list(files)
+    step = len(files) / count
+    return [files[int(i * step)] for i in range(count)]
+
+
+def scan_source(skin_dir: Path) -> Optional[Tuple[str, List[str], int]]:
+    """
+    (状态, 帧路径, mtime_ns)；worker 线程里用，直接扫目录，不碰 GUI 线程共用的资源索引。
+    排序与 AssetIndex 一致；mtime 取各帧和状态目录本身的最大值（增删、改名帧都会更新目录 mtime）
+    """
+    for state in PREVIEW_STATES:
+        files: List[str] = []
+        try:
+            mtime = (skin_dir / state).stat().st_mtime_ns
+            with os.scandir(skin_dir / state) as it:
+                for e in sorted(it, key=lambda e: e.name):
+                    if e.name.endswith(".png") and not e.name.startswith(".") and e.is_file():
+                        files.append(e.path)
+                        mtime = max(mtime, e.stat().st_mtime_ns)
+        except OSError:
+            continue
+        if files:
+            return state, files, mtime
+    return None
+
+
+def _read_small(path: str) -> QImage:
+    reader = QImageReader(path)
+    src = reader.size()
+    if src.isValid():
+        reader.setScaledSize(src.scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio))
+    img = reader.read()
+    if img.isNull():
+        return img
+    if img.width() > PREVIEW_SIZE or img.height() > PREVIEW_SIZE:
+        # 有的格式不支持解码时缩放，这里兜底
+        img = img.scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return img
+
+
+def render_strip(files: List[str]) -> QImage:
+    """把若干帧按低分辨率横向拼成一条（第 0 格同时用作静态缩略图）"""
+    strip = QImage(PREVIEW_SIZE * max(1, len(files)), PREVIEW_SIZE, QImage.Format_ARGB32_Premultiplied)
+    strip.fill(Qt.transparent)
+    p = QPainter(strip)
+    for i, path in enumerate(files):
+        img = _read_small(path)
+        if img.isNull():
+            continue
+        x = i * PREVIEW_SIZE + (PREVIEW_SIZE - img.width()) // 2
+        y = PREVIEW_SIZE - img.height()  # 底部对齐，和桌宠“贴地”一致
+        p.drawImage(x, y, img)
+    p.end()
+    return strip
+
+
+def split_strip(strip: QImage) -> List[QImage]:
+    n = max(1, strip.width() // PREVIEW_SIZE)
+    return [strip.copy(i * PREVIEW_SIZE, 0, PREVIEW_SIZE, PREVIEW_SIZE) for i in range(n)]
+
+
+class _PreviewSignals(QObject):
+    # 不挂 parent：worker 线程结束前对象必须一直活着
+    done = pyqtSignal(str, str, QImage)
+
+
+class _PreviewTask(QRunnable):
+    """worker 线程里扫目录、只碰 QImage（QPixmap 只能在 GUI 线程用）"""
+
+    def __init__(self, signals: _PreviewSignals, character: str, skin: str, skin_dir: Path):
+        super().__init__()
+        self.signals = signals
+        self.character = character
+        self.skin = skin
+        self.skin_dir = skin_dir
+
+    def run(self) -> None:
+        src = scan_source(self.skin_dir)
+        if src is None:
+            return  # 皮肤下没有任何帧：保持占位图
+        state, files, mtime = src
+        cache = preview_cache_path(self.character, self.skin, state, mtime, len(files))
+        strip = QImage(str(cache)) if cache.exists() else QImage()
+        if strip.isNull():
+            strip = render_strip(pick_frames(files))
+            try:
+                cache.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache.with_suffix(".tmp.png")
+                if strip.save(str(tmp), "PNG"):
+                    tmp.replace(cache)
+            except OSError:
+                pass  # 缓存写不进去就只用内存里的结果
+        try:
+            self.signals.done.emit(self.character, self.skin, strip)
+        except RuntimeError:
+            pass  # 设置窗口已经关掉
+
+
+class SkinPreviewLoader(QObject):
+    """
+    后台生成皮肤预览：
+    - 线程池里扫帧目录、低分辨率解码 + 拼帧，结果按资源 mtime 缓存到 .cache/previews
+    - 每完成一个就发一次 ready，界面逐个填充，不阻塞打开
+    """
+
+    ready = pyqtSignal(str, str, QImage)  # character, skin, strip
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+        self._signals = _PreviewSignals()
+        self._signals.done.connect(self.ready)
+
+    def request(self, character: str, skin: str) -> None:
+        """排队生成一个预览（GUI 线程上不做任何文件操作）；皮肤下没有帧时不会发 ready"""
+        skin_dir = get_asset_index().assets_dir / character / skin
+        self._pool.start(_PreviewTask(self._signals, character, skin, skin_dir))
+
+    def cancel(self) -> None:
+        """丢掉还没开始的任务（正在跑的会自然结束）"""
+        self._pool.clear()
+
+    @staticmethod
+    def icon_size() -> QSize:
+        return QSize(PREVIEW_SIZE, PREVIEW_SIZE)
@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+bench_assets.py
+- 把一个皮肤目录转换成多种帧存储格式，逐一测量：
+  磁盘占用 / 冷启动与热启动加载耗时 / 常驻与峰值内存 / 按需取单帧的延迟
+- 每次加载都在独立子进程里跑，互不污染；冷启动前会尽量把文件踢出页缓存（Linux）
+- 支持一次跑完所有内置皮肤，最后打印对比表
+
+格式：
+  png        现在的 PNG 序列（原样）
+  png-max    重新以最高压缩等级保存的 PNG 序列
+  webp       无损 WebP 序列（Qt 自带 webp 插件）
+  webp-anim  每个状态一个无损动画 WebP（需要 Pillow，没有就跳过）
+  pack-png   每个状态一个文件：索引表 + 原 PNG 数据拼接（减少文件数/打开次数）
+  raw        每个状态一个文件：预乘 ARGB32 原始像素，mmap 后零解码
+
+注意：桌宠的 loadAnimations 目前只读 PNG 序列，其余格式用于评估是否值得迁移。
+
+用法：
+  python Tools/bench_assets.py Assets/阿米娅/默认
+  python Tools/bench_assets.py --all --json result.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_runtime import rss_bytes  # noqa: E402
+
+FORMATS = ("png", "png-max", "webp", "webp-anim", "pack-png", "raw")
+PACK_MAGIC = b"PETPACK1"
+RAW_MAGIC = b"PETRAW01"
+
+
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
+
+
+def state_dirs(skin_dir: Path) -> dict:
+    """{状态名: [帧路径...]}，只收有 PNG 的子目录"""
+    out = {}
+    for d in sorted(p for p in skin_dir.iterdir() if p.is_dir()):
+        files = sorted(str(f) for f in d.glob("*.png"))
+        if files:
+            out[d.name] = files
+    return out
+
+
+def disk_bytes(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def evict_page_cache(path: Path) -> bool:
+    """尽量把文件从页缓存里踢出去，模拟冷启动；做不到返回 False"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    files = [path] if path.is_file() else [f for f in path.rglob("*") if f.is_file()]
+    for f in files:
+        try:
+            fd = os.open(f, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            return False
+    return True
+
+
+# ---------- 转换 ----------
+
+
+def _save_seq(states: dict, out: Path, fmt: str, ext: str, quality: int) -> None:
+    from PyQt5.QtGui import QImage, QImageWriter
+
+    for state, files in states.items():
+        (out / state).mkdir(parents=True, exist_ok=True)
+        for f in files:
+            writer = QImageWriter(str(out / state / (Path(f).stem + ext)), fmt.encode())
+            writer.setQuality(quality)
+            if not writer.write(QImage(f)):
+                raise RuntimeError(writer.errorString())
+
+
+def _save_webp_anim(states: dict, out: Path) -> None:
+    from PIL import Image  # 可选依赖
+
+    out.mkdir(parents=True, exist_ok=True)
+    for state, files in states.items():
+        frames = [Image.open(f).convert("RGBA") for f in files]
+        frames[0].save(
+            out / f"{state}.webp", save_all=True, append_images=frames[1:], lossless=True, duration=33
+        )
+
+
+def _save_pack(states: dict, out: Path) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    for state, files in states.items():
+        blobs = [Path(f).read_bytes() for f in files]
+        header = len(PACK_MAGIC) + 4 + len(blobs) * 12
+        with open(out / f"{state}.pack", "wb") as fp:
+            fp.write(PACK_MAGIC + struct.pack("<I", len(blobs)))
+            offset = header
+            for b in blobs:
+                fp.write(struct.pack("<QI", offset, len(b)))
+                offset += len(b)
+            for b in blobs:
+                fp.write(b)
+
+
+def _save_raw(states: dict, out: Path) -> None:
+    from PyQt5.QtGui import QImage
+
+    out.mkdir(parents=True, exist_ok=True)
+    for state, files in states.items():
+        imgs = [QImage(f).convertToFormat(QImage.Format_ARGB32_Premultiplied) for f in files]
+        w, h = imgs[0].width(), imgs[0].height()
+        with open(out / f"{state}.raw", "wb") as fp:
+            fp.write(RAW_MAGIC + struct.pack("<III", len(imgs), w, h))
+            for img in imgs:
+                if img.width() != w or img.height() != h:
+                    img = img.scaled(w, h)
+                ptr = img.constBits()
+                ptr.setsize(img.sizeInBytes())
+                fp.write(bytes(ptr))
+
+
+def convert(fmt: str, skin_dir: Path, out: Path):
+    """返回转换后的路径；当前环境不支持该格式时返回 None"""
+    states = state_dirs(skin_dir)
+    if fmt == "png":
+        return skin_dir
+    if fmt == "png-max":
+        _save_seq(states, out, "png", ".png", 0)  # Qt：quality 越低压缩等级越高
+    elif fmt == "webp":
+        from PyQt5.QtGui import QImageWriter
+
+        if b"webp" not in [bytes(f) for f in QImageWriter.supportedImageFormats()]:
+            return None
+        _save_seq(states, out, "webp", ".webp", 100)  # quality=100 -> 无损
+    elif fmt == "webp-anim":
+        try:
+            _save_webp_anim(states, out)
+        except ImportError:
+            return None
+    elif fmt == "pack-png":
+        _save_pack(states, out)
+    elif fmt == "raw":
+        _save_raw(states, out)
+    else:
+        raise ValueError(f"未知格式：{fmt}")
+    return out
+
+
+# ---------- 加载（在子进程里执行） ----------
+
+
+class RawStore:
+    """mmap 整个 .raw 文件，QImage 直接指向映射内存，不解码也不拷贝"""
+
+    def __init__(self, path: Path):
+        self._fp = open(path, "rb")
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = self._mm[: len(RAW_MAGIC)]
+        if magic != RAW_MAGIC:
+            raise ValueError(f"不是 raw 帧文件：{path}")
+        self.count, self.w, self.h = struct.unpack_from("<III", self._mm, len(RAW_MAGIC))
+        self._base = len(RAW_MAGIC) + 12
+        self._view = memoryview(self._mm)
+
+    def __len__(self):
+        return self.count
+
+    def fetch(self, i: int):
+        from PyQt5.QtGui import QImage
+
+        size = self.w * self.h * 4
+        start = self._base + i * size
+        buf = self._view[start : start + size]
+        return QImage(buf, self.w, self.h, self.w * 4, QImage.Format_ARGB32_Premultiplied)
+
+
+class PackStore:
+    def __init__(self, path: Path):
+        self._data = path.read_bytes()
+        (count,) = struct.unpack_from("<I", self._data, len(PACK_MAGIC))
+        base = len(PACK_MAGIC) + 4
+        self._entries = [struct.unpack_from("<QI", self._data, base + i * 12) for i in range(count)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fetch(self, i: int):
+        from PyQt5.QtGui import QImage
+
+        off, n = self._entries[i]
+        return QImage.fromData(self._data[off : off + n], "PNG")
+
+
+class SeqStore:
+    def __init__(self, files):
+        self._files = files
+
+    def __len__(self):
+        return len(self._files)
+
+    def fetch(self, i: int):
+        from PyQt5.QtGui import QImage
+
+        return QImage(self._files[i])
+
+
+class AnimStore:
+    """动画 WebP：Qt 读取器只能顺序解码，跳帧要从头读"""
+
+    def __init__(self, path: Path):
+        from PyQt5.QtGui import QImageReader
+
+        self._path = str(path)
+        self._count = max(1, QImageReader(self._path).imageCount())
+
+    def __len__(self):
+        return self._count
+
+    def fetch(self, i: int):
+        from PyQt5.QtGui import QImageReader
+
+        reader = QImageReader(self._path)
+        if not reader.jumpToImage(i):
+            for _ in range(i):
+                reader.read()
+        return reader.read()
+
+
+def open_stores(fmt: str, path: Path) -> dict:
+    if fmt in ("png", "png-max", "webp"):
+        ext = ".webp" if fmt == "webp" else ".png"
+        return {
+            d.name: SeqStore(sorted(str(f) for f in d.glob("*" + ext)))
+            for d in sorted(p for p in path.iterdir() if p.is_dir())
+        }
+    suffix = {"webp-anim": ".webp", "pack-png": ".pack", "raw": ".raw"}[fmt]
+    cls = {"webp-anim": AnimStore, "pack-png": PackStore, "raw": RawStore}[fmt]
+    return {f.stem: cls(f) for f in sorted(path.glob("*" + suffix))}
+
+
+def worker(fmt: str, path: Path) -> dict:
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+    rss0 = rss_bytes()
+
+    # 1) 整个皮肤全部解码进内存（等价于现在的 loadAnimations）
+    t0 = time.perf_counter()
+    stores = open_stores(fmt, path)
+    frames = {}
+    if fmt == "webp-anim":
+        from PyQt5.QtGui import QImageReader
+
+        for state, store in stores.items():
+            reader = QImageReader(store._path)
+            frames[state] = []
+            while True:
+                img = reader.read()
+                if img.isNull():
+                    break
+                frames[state].append(img)
+    else:
+        for state, store in stores.items():
+            frames[state] = [store.fetch(i) for i in range(len(store))]
+            if fmt == "raw":
+                # 触碰一下像素，让 mmap 页真正载入（否则只是“假装”加载完）
+                for img in frames[state]:
+                    img.pixel(img.width() // 2, img.height() // 2)
+    load_ms = (time.perf_counter() - t0) * 1000.0
+    count = sum(len(v) for v in frames.values())
+    resident = max(0, rss_bytes() - rss0)
+    peak = max(0, peak_rss_bytes() - rss0)
+    decoded = sum(img.sizeInBytes() for v in frames.values() for img in v if isinstance(img, QImage))
+    frames.clear()
+
+    # 2) 按需取单帧的延迟（每次都从存储里重新拿，不走内存缓存）
+    samples = []
+    for store in stores.values():
+        n = len(store)
+        for i in range(0, n, max(1, n // 20)):
+            t = time.perf_counter()
+            img = store.fetch(i)
+            img.pixel(0, 0)
+            samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    return {
+        "frames": count,
+        "load_ms": load_ms,
+        "resident_bytes": resident,
+        "peak_bytes": peak,
+        "decoded_bytes": decoded,
+        "fetch_p50_us": statistics.median(samples) if samples else 0.0,
+        "fetch_p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+    }
+
+
+def run_worker(fmt: str, path: Path) -> dict:
+    p = subprocess.run(
+        [sys.executable, __file__, "--worker", fmt, str(path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    lines = p.stdout.decode("utf-8", errors="replace").strip().splitlines()
+    if p.returncode != 0 or not lines:
+        raise RuntimeError(f"{fmt} 子进程失败（exit code={p.returncode}）")
+    return json.loads(lines[-1])
+
+
+# ---------- 主流程 ----------
+
+
+def bench_skin(skin_dir: Path, formats) -> dict:
+    results = {}
+    tmp_root = Path(tempfile.mkdtemp(prefix="pet_bench_"))
+    try:
+        for fmt in formats:
+            try:
+                path = convert(fmt, skin_dir, tmp_root / fmt)
+            except Exception as e:
+                results[fmt] = {"error": f"转换失败：{e}"}
+                continue
+            if path is None:
+                results[fmt] = {"error": "当前环境不支持"}
+                continue
+            try:
+                evicted = evict_page_cache(path)
+                cold = run_worker(fmt, path)
+                warm = run_worker(fmt, path)
+            except Exception as e:
+                results[fmt] = {"error": str(e)}
+                continue
+            results[fmt] = {
+                "disk_bytes": disk_bytes(path),
+                "cold_load_ms": cold["load_ms"],
+                "cold_evicted": evicted,
+                "warm_load_ms": warm["load_ms"],
+                "resident_bytes": warm["resident_bytes"],
+                "peak_bytes": max(cold["peak_bytes"], warm["peak_bytes"]),
+                "decoded_bytes": warm["decoded_bytes"],
+                "frames": warm["frames"],
+                "fetch_p50_us": warm["fetch_p50_us"],
+                "fetch_p95_us": warm["fetch_p95_us"],
+            }
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+    return results
+
+
+def print_table(name: str, results: dict) -> None:
+    mb = 1024 * 1024
+    print(f"\n== {name} ==")
+    head = f"{'format':<10} {'disk MB':>8} {'cold ms':>9} {'warm ms':>9} {'res MB':>8} {'peak MB':>8} {'p50 us':>9} {'p95 us':>9}"
+    print(head)
+    print("-" * len(head))
+    for fmt, r in results.items():
+        if "error" in r:
+            print(f"{fmt:<10} {r['error']}")
+            continue
+        print(
+            f"{fmt:<10} {r['disk_bytes'] / mb:>8.2f} {r['cold_load_ms']:>9.1f} {r['warm_load_ms']:>9.1f} "
+            f"{r['resident_bytes'] / mb:>8.1f} {r['peak_bytes'] / mb:>8.1f} "
+            f"{r['fetch_p50_us']:>9.1f} {r['fetch_p95_us']:>9.1f}"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="比较不同帧存储格式的体积、加载耗时和内存")
+    ap.add_argument("skin_dir", nargs="?", help="皮肤目录，如 Assets/阿米娅/默认")
+    ap.add_argument("--all", action="store_true", help="跑所有内置皮肤")
+    ap.add_argument("--formats", default=",".join(FORMATS), help="逗号分隔的格式列表")
+    ap.add_argument("--json", help="同时把结果写成 JSON")
+    ap.add_argument("--worker", nargs=2, metavar=("FORMAT", "PATH"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        fmt, path = args.worker
+        print(json.dumps(worker(fmt, Path(path))))
+        return
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    if args.all:
+        from Core.asset_index import ASSETS_DIR, get_asset_index
+
+        index = get_asset_index()
+        index.refresh(deep=False)
+        skins = [ASSETS_DIR / c / s for c in index.characters() for s in index.skins(c)]
+    elif args.skin_dir:
+        skins = [Path(args.skin_dir)]
+    else:
+        ap.error("需要指定皮肤目录，或使用 --all")
+
+    report = {}
+    for skin_dir in skins:
+        name = f"{skin_dir.parent.name}/{skin_dir.name}"
+        report[name] = bench_skin(skin_dir, formats)
+        print_table(name, report[name])
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
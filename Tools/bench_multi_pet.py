@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+bench_multi_pet.py
+- 在 Qt offscreen 平台下测“同一进程养 N 只同皮肤桌宠”的内存与唤醒次数
+- 每个 N 单独起一个子进程（互不污染），跑几秒真实时钟后 gc + malloc_trim 再取 RSS
+- 对比“N 个进程各跑一只”的估算：N × (单只 RSS)
+- --processes K：真的起 K 个进程各养一只，同时存活时汇总 PSS；加 --shared-frames 走跨进程共享帧段
+
+用法：
+  python Tools/bench_multi_pet.py                   # 默认 N = 1 5 20
+  python Tools/bench_multi_pet.py --pets 1 10 50 --seconds 5 -o multi.json
+  python Tools/bench_multi_pet.py --processes 4 [--shared-frames] [--size 300]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+MB = 1024 * 1024
+
+
+def worker(
+    count: int, seconds: float, shared_frames: bool = False, hold: bool = False, size: int = 0
+) -> dict:
+    """
+    子进程：N=0 时只建 QApplication 并导入模块，作为进程底噪。
+    hold=True 时先打印一行 ready，等父进程从 stdin 发信号（所有进程都就绪）后再采样。
+    """
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    from Core.memory_report import pss_bytes, release_free_heap, rss_bytes
+
+    app = QApplication(sys.argv[:1])
+    from Core.pet_host import PetHost
+
+    host = PetHost()
+    overrides = {}
+    if shared_frames:
+        overrides["shared_frames"] = True
+    if size:
+        overrides["pet_size"] = size
+    for _ in range(count):
+        host.spawn(overrides or None, load_plugins=False).show()
+    # 让每只桌宠都进一遍悬停/走动，常用状态的帧和缩放结果都常驻
+    for pet in host.pets:
+        pet._enter_state("Interact")
+        pet.updateAnimation()
+        pet._enter_state(pet.behavior.spec.initial)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+
+    # 这里不停定时器：只测常驻内存，采样期间多跑几帧无所谓
+    gc.collect()
+    release_free_heap()
+    if hold:
+        print("ready", flush=True)
+        sys.stdin.readline()
+    stats = host.stats()
+    elapsed = max(seconds, 1e-6)
+    sched = stats["scheduler"]
+    return {
+        "pets": count,
+        "rss_bytes": rss_bytes(),
+        "pss_bytes": pss_bytes(),
+        "decoded_bytes": stats["frame_store"]["decoded_bytes"],
+        "scaled_bytes": stats["frame_cache"]["bytes"],
+        "wakeups_per_s": sched["wakeups"] / elapsed,
+        "fires_per_s": sched["fires"] / elapsed,
+    }
+
+
+def run_worker(count: int, seconds: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", str(count), "--seconds", str(seconds)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_processes(count: int, seconds: float, shared_frames: bool, size: int = 0) -> dict:
+    """K 个进程各养一只（逐个启动，后来者可挂载先来者发布的共享段），全部就绪后同时采样"""
+    cmd = [sys.executable, __file__, "--worker", "1", "--seconds", str(seconds), "--hold"]
+    if shared_frames:
+        cmd.append("--shared-frames")
+    if size:
+        cmd += ["--size", str(size)]
+    procs = []
+    try:
+        for _ in range(count):
+            p = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            while p.stdout.readline().strip() != "ready":
+                if p.poll() is not None:
+                    raise RuntimeError("子进程提前退出")
+            procs.append(p)
+        rows = []
+        for p in procs:
+            p.stdin.write("go\n")
+            p.stdin.flush()
+            rows.append(json.loads(p.stdout.readline()))
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return {
+        "processes": count,
+        "shared_frames": shared_frames,
+        "size": size,
+        "rss_bytes": sum(r["rss_bytes"] for r in rows),
+        "pss_bytes": sum(r["pss_bytes"] for r in rows),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="多桌宠同进程的内存/唤醒基准")
+    ap.add_argument("--pets", type=int, nargs="+", default=[1, 5, 20])
+    ap.add_argument("--seconds", type=float, default=3.0, help="每个 N 跑多久真实时钟")
+    ap.add_argument("-o", "--output", help="结果写成 JSON 文件")
+    ap.add_argument("--processes", type=int, help="改测 K 个独立进程各养一只")
+    ap.add_argument("--shared-frames", action="store_true", help="打开跨进程共享帧段")
+    ap.add_argument("--size", type=int, default=0, help="覆盖桌宠尺寸（默认用 config.json）")
+    ap.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--hold", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(worker(args.worker, args.seconds, args.shared_frames, args.hold, args.size)))
+        return 0
+
+    if args.processes:
+        r = run_processes(args.processes, args.seconds, args.shared_frames, args.size)
+        print(
+            f"{r['processes']} 个进程（共享帧段 {'开' if r['shared_frames'] else '关'}）："
+            f"PSS 合计 {r['pss_bytes'] / MB:.1f} MB，RSS 合计 {r['rss_bytes'] / MB:.1f} MB"
+        )
+        if args.output:
+            Path(args.output).write_text(json.dumps(r, indent=2), encoding="utf-8")
+        return 0
+
+    base = run_worker(0, 0.2)
+    rows = [run_worker(n, args.seconds) for n in sorted(set(args.pets))]
+    one = next((r for r in rows if r["pets"] == 1), None) or run_worker(1, args.seconds)
+    single_cost = one["rss_bytes"] - base["rss_bytes"]
+
+    print(f"进程底噪（无桌宠）：{base['rss_bytes'] / MB:.1f} MB；单只桌宠增量：{single_cost / MB:.1f} MB")
+    print(f"{'N':>4} {'RSS':>9} {'每只增量':>9} {'N进程估算':>10} {'解码帧':>8} {'缩放缓存':>8} {'唤醒/s':>7} {'触发/s':>7}")
+    for r in rows:
+        n = r["pets"]
+        extra = (r["rss_bytes"] - one["rss_bytes"]) / max(1, n - 1) if n > 1 else single_cost
+        separate = n * one["rss_bytes"]
+        print(
+            f"{n:>4} {r['rss_bytes'] / MB:>7.1f}MB {extra / MB:>7.2f}MB {separate / MB:>8.1f}MB"
+            f" {r['decoded_bytes'] / MB:>6.1f}MB {r['scaled_bytes'] / MB:>6.1f}MB"
+            f" {r['wakeups_per_s']:>7.1f} {r['fires_per_s']:>7.1f}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({"baseline": base, "runs": rows}, indent=2), encoding="utf-8"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+bench_runtime.py
+- 在 Qt offscreen 平台下无界面地跑 DesktopPet，测热点路径
+- 结果输出为 JSON；基线存在时附上与基线的对比，--compare 时超出阈值即视为回归（退出码 1）
+
+用法：
+  python Tools/bench_runtime.py                          # 打印 JSON
+  python Tools/bench_runtime.py -o bench.json            # 写文件
+  python Tools/bench_runtime.py --save-baseline          # 更新基线（Tools/bench_baseline.json）
+  python Tools/bench_runtime.py --compare --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Core.startup import startup  # noqa: E402  首帧计时从这里起算
+from Core.memory_report import rss_bytes  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "bench_baseline.json"
+PET_SIZES = (150, 300, 500, 700)
+
+
+def timed(fn, repeat: int) -> dict:
+    """跑 repeat 次，返回毫秒级统计"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
+
+
+def frame_bytes(pet) -> int:
+    from Core.frame_cache import pixmap_bytes
+
+    return sum(pixmap_bytes(d.pixmap) for frames in pet._decoded.values() for d in frames)
+
+
+def load_skin(pet, character: str, skin: str) -> None:
+    """
+    换皮肤并解码全部可达动画：loadAnimations 只解码当前状态，
+    其余的平时由 pet.preload 在事件循环里补齐，这里同步做完，计时才覆盖整个皮肤
+    """
+    pet.loadAnimations(character, skin)
+    finish_preload(pet)
+
+
+def finish_preload(pet) -> None:
+    while pet._preload:
+        pet._ensure_frames(pet._preload.pop(0))
+    pet._preload_job.stop()
+
+
+def bench_load(pet, index, repeat: int) -> dict:
+    out = {}
+    for character in index.characters():
+        for skin in index.skins(character):
+            rss0 = rss_bytes()
+            stats = timed(lambda: load_skin(pet, character, skin), repeat)
+            stats["frame_bytes"] = frame_bytes(pet)
+            stats["rss_delta_bytes"] = max(0, rss_bytes() - rss0)
+            out[f"{character}/{skin}"] = stats
+    return out
+
+
+def bench_ticks(pet, ticks: int) -> dict:
+    out = {}
+    for state, moving in (("Relax", False), ("Move", True)):
+        for size in PET_SIZES:
+            for direction in (1, -1):
+                pet.set_pet_size(size)
+                pet.frame_cache.clear()  # 含第一轮缩放未命中，更接近真实播放
+                pet.is_moving = moving
+                pet.direction = direction
+                pet.current_frame = 0
+                pet._hold_left = 0
+
+                def tick():
+                    pet.direction = direction  # 撞边会掉头，这里固定方向
+                    pet.updateAnimation()
+
+                out[f"{state}/{size}px/{'right' if direction == 1 else 'left'}"] = timed(tick, ticks)
+    pet.is_moving = False
+    return out
+
+
+def bench_resize(pet, repeat: int) -> dict:
+    sizes = iter(list(PET_SIZES) * (repeat // len(PET_SIZES) + 1))
+    return timed(lambda: pet.set_pet_size(next(sizes)), repeat)
+
+
+def purge_plugin_modules(manager) -> None:
+    """从 sys.modules 去掉各插件包，下次加载重新导入（冷加载）"""
+    for name in manager.discover():
+        full = f"{manager.plugins_package}.{name}"
+        for mod in [m for m in sys.modules if m == full or m.startswith(full + ".")]:
+            del sys.modules[mod]
+
+
+def bench_plugins(pet, repeat: int) -> dict:
+    from Plugins.base import AppContext
+    from Plugins.manager import PluginManager
+
+    def load():
+        ctx = AppContext(pet=pet, logger=lambda *_: None, scheduler=pet.scheduler, events=pet.events)
+        manager = PluginManager(ctx, plugins_package="Plugins")
+        manager.load_all()
+        # 按需加载的插件 load_all 只登记了服务：这里强制导入并激活（隔离插件起进程，不计入）
+        for manifest in manager.manifests():
+            if not manifest.isolated:
+                manager.ensure_loaded(manifest.id)
+        manager.unload_all()
+        purge_plugin_modules(manager)
+
+    # 启动时插件已导入过：先清掉，每一轮都量首次导入 + 激活
+    purge_plugin_modules(pet.plugin_manager)
+
+    return timed(load, repeat)
+
+
+def run(args) -> dict:
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    t0 = time.perf_counter()
+    from desktop_pet import DesktopPet
+    from Core.asset_index import get_asset_index
+
+    pet = DesktopPet()
+    startup_ms = (time.perf_counter() - t0) * 1000.0
+    # 基准测试里手动驱动，停掉所有自带的定时器
+    pet.timer.stop()
+    pet.behavior_timer.stop()
+    pet.show()
+    app.processEvents()
+    pet.complete_startup()  # 插件等首帧之后的工作立即做完，后面各项不受影响
+    app.processEvents()
+
+    results = {
+        "startup": {"mean_ms": startup_ms, "time_to_first_frame_ms": startup.first_frame_ms or 0.0},
+        "loadAnimations": bench_load(pet, get_asset_index(), args.repeat),
+    }
+    pet.apply_settings(pet.settings.to_dict(), force=True)  # 切回配置里的皮肤
+    finish_preload(pet)  # tick 基准不含首次进入状态时的解码
+    results["updateAnimation"] = bench_ticks(pet, args.ticks)
+    results["set_pet_size"] = bench_resize(pet, args.repeat * 4)
+    pet.set_pet_size(300)
+    pet.updateAnimation()
+    results["get_visible_rect_global"] = timed(pet.get_visible_rect_global, args.repeat)
+    results["plugins.load_all"] = bench_plugins(pet, args.repeat)
+
+    pet.close()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "repeat": args.repeat,
+            "ticks": args.ticks,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """{"a": {"b": {"mean_ms": 1}}} -> {"a/b/mean_ms": 1}"""
+    flat = {}
+    for k, v in results.items():
+        key = f"{prefix}/{k}" if prefix else k
+        if isinstance(v, dict):
+            flat.update(flatten(v, key))
+        else:
+            flat[key] = v
+    return flat
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """只比较“越小越好”的指标（耗时/内存），返回回归列表"""
+    cur = flatten(current["results"])
+    base = flatten(baseline.get("results", {}))
+    regressions = []
+    for key, old in base.items():
+        new = cur.get(key)
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+            continue
+        if key.endswith("min_ms"):
+            continue  # 最小值抖动太大，不参与判定
+        ratio = new / old
+        if ratio > 1.0 + threshold:
+            regressions.append({"metric": key, "baseline": old, "current": new, "ratio": ratio})
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="DesktopPet 运行时基准测试（offscreen）")
+    ap.add_argument("-o", "--output", help="结果 JSON 输出路径（默认打印到 stdout）")
+    ap.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线 JSON 路径")
+    ap.add_argument("--save-baseline", action="store_true", help="把本次结果写成基线")
+    ap.add_argument("--compare", action="store_true", help="和基线对比，有指标超出阈值时退出码为 1")
+    ap.add_argument("--threshold", type=float, default=0.2, help="允许的退化比例（默认 0.2 = 20%%）")
+    ap.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    ap.add_argument("--ticks", type=int, default=200, help="updateAnimation 每组 tick 数")
+    args = ap.parse_args()
+
+    baseline_path = Path(args.baseline)
+    if args.compare and not baseline_path.exists():
+        print(f"[bench] 找不到基线：{baseline_path}（先用 --save-baseline 生成）", file=sys.stderr)
+        sys.exit(2)
+
+    report = run(args)
+
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        report["regressions"] = compare(report, baseline, args.threshold)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+    if args.save_baseline:
+        baseline_path.write_text(text, encoding="utf-8")
+        print(f"[bench] 基线已保存：{baseline_path}", file=sys.stderr)
+
+    regressions = report.get("regressions") or []
+    for r in regressions:
+        print(
+            f"[bench] 回归：{r['metric']} {r['baseline']:.3f} -> {r['current']:.3f} (x{r['ratio']:.2f})",
+            file=sys.stderr,
+        )
+    sys.exit(1 if args.compare and regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
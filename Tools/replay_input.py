@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+replay_input.py
+- 重放右键菜单“录制输入”保存的文件：虚拟时钟 + 固定种子，offscreen 无界面
+- 统计每个输入处理函数和动画 tick 的耗时（JSON），用来给“某尺寸下缩放卡顿”之类的问题做前后对比
+
+用法：
+  python Tools/replay_input.py .cache/recordings/input-20260101-120000.json
+  python Tools/replay_input.py rec.json --size 700 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="桌宠输入重放")
+    ap.add_argument("recording", help="录制文件路径")
+    ap.add_argument("--seed", type=int, default=0, help="行为随机种子")
+    ap.add_argument("--size", type=int, help="覆盖起始桌宠尺寸（px）")
+    ap.add_argument("--repeat", type=int, default=1, help="重放次数（每次新建桌宠，取各次结果）")
+    ap.add_argument("-o", "--output", help="结果 JSON 输出路径")
+    args = ap.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+    from Core.input_replay import load_recording, replay
+    from desktop_pet import DesktopPet
+
+    recording = load_recording(args.recording)
+    overrides = {"pet_size": args.size} if args.size else None
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        pet = DesktopPet()
+        pet.show()
+        runs.append(replay(pet, recording, seed=args.seed, overrides=overrides))
+        pet.close()
+
+    text = json.dumps(runs[0] if len(runs) == 1 else runs, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+simulate.py
+- 虚拟时钟 + 固定随机种子，无界面快进运行桌宠的行为与动画逻辑
+- 输出状态停留时间、撞边次数、显示帧数、缓存命中等统计（JSON）
+
+用法：
+  python Tools/simulate.py --hours 1 --seed 42
+  python Tools/simulate.py --hours 8 --render --hover-per-min 0.5 --set pet_size=500
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def parse_overrides(items) -> dict:
+    out = {}
+    for item in items or []:
+        key, _, raw = item.partition("=")
+        try:
+            out[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key] = raw
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="桌宠行为快进模拟")
+    ap.add_argument("--hours", type=float, default=1.0, help="模拟的虚拟时长（小时）")
+    ap.add_argument("--seed", type=int, default=0, help="随机种子")
+    ap.add_argument("--render", action="store_true", help="走真实渲染/缓存路径（更慢）")
+    ap.add_argument("--hover-per-min", type=float, default=0.0, help="平均每分钟模拟几次鼠标悬停")
+    ap.add_argument("--set", action="append", metavar="KEY=VALUE", help="临时覆盖设置项，如 fps=60")
+    ap.add_argument("-o", "--output", help="结果 JSON 输出路径")
+    args = ap.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+    from Core.simulation import run_simulation
+
+    report = run_simulation(
+        args.hours * 3600.0,
+        seed=args.seed,
+        settings=parse_overrides(args.set),
+        render=args.render,
+        hover_per_min=args.hover_per_min,
+    )
+    text = json.dumps(report.to_dict(), ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
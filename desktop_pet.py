@@ -1,4 +1,4 @@
-import glob, os, random
+import os, random, time
 from PyQt5.QtWidgets import (
     QMainWindow,
     QLabel,
@@ -10,18 +10,67 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QHBoxLayout,
     QMenu,
+    QMessageBox,
 )
-from PyQt5.QtCore import Qt, QTimer, QPoint, QRect
+from PyQt5.QtCore import Qt, QEvent, QPoint, QRect, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap, QFont, QTransform, QImage
-from Settings.settings_dialog import SettingsDialog
-from Settings.settings_store import load_settings, save_settings
+from Settings.settings_store import get_config_path, load_settings, save_settings
 from Plugins.base import AppContext
 from Plugins.manager import PluginManager
+from Core.asset_index import get_asset_index
+from Core.config_store import APP_NAMESPACE, get_config_store
+from Core.config_watcher import ConfigWatcher
+from Core.event_bus import (
+    DragFinished,
+    EventBus,
+    FrameTick,
+    PetDragged,
+    PetMoved,
+    PetResized,
+    SettingsChanged,
+    StateChanged,
+)
+from Core.behavior import (
+    TRIGGER_HOVER,
+    TRIGGER_UNHOVER,
+    BehaviorEngine,
+    BehaviorSpec,
+    default_behavior,
+    load_skin_behavior,
+    merge_behavior,
+)
+from Core.frame_cache import pixmap_bytes
+from Core.frame_store import get_frame_store, scaled_key
+from Core.shared_frames import get_shared_segments, segment_name
+from Core.metrics import PetMetrics
+from Core.motion import MotionIntegrator, ScreenTopology, speed_to_px_per_s
+from Core.metrics_hud import MetricsHud
+from Core.input_replay import InputRecorder
+from Core.memory_report import format_report, memory_report, release_free_heap
+from Core.scheduler import Scheduler
+from Core.skin_watcher import SkinWatcher
+from Core.startup import DeferredSteps, claim_startup_profile
+from Core.tracing import traced, tracer
+from Core.timeline import DEFAULT_MERGE_TOLERANCE
+
+# 每个皮肤目录下的动画状态子目录
+ANIMATION_STATES = ("Relax", "Move", "Interact", "Sit")
+
+# 这些设置会填进行为表，变化后需要重建行为
+BEHAVIOR_SETTINGS = ("enable_move", "move_probability", "move_duration_min", "move_duration_max")
 
 
 class DesktopPet(QMainWindow):
-    def __init__(self):
+    # 首帧之后的启动工作（其余动画帧、插件、配置监视）全部完成
+    ready = pyqtSignal()
+
+    def __init__(self, scheduler=None, settings=None, load_plugins=True):
+        """
+        scheduler：多只桌宠同进程时传入共用的调度器（同一帧时钟），默认自己建一个
+        settings：传入时使用这份设置且不回写 config.json（由 PetHost 派生的桌宠）
+        """
         super().__init__()
+        self.startup = claim_startup_profile()  # 启动各阶段耗时 + 首帧时间（见 Core/startup.py）
 
         # 初始化变量
         self.input_dialog = None
@@ -33,48 +82,122 @@ class DesktopPet(QMainWindow):
         self.is_dragging = False  # 标记是否正在拖动
         self.input_hovered = False  # 标记输入框是否被鼠标悬停
         self._settings_dialog = None
-        self.settings = load_settings()
+        self._owns_config = settings is None  # 只有读 config.json 的桌宠才把滚轮缩放写回去
+        self.settings = settings if settings is not None else load_settings()
 
         # 移动与位置相关参数
-        self.speed = 2  # 移动速度（像素/帧）
+        self.speed = 2  # 移动速度（设置项，按 30fps 计的每帧像素；实际按 px/s 积分）
         self.direction = 1  # 1:向右，-1:向左
-        self.screen_geometry = QApplication.desktop().availableGeometry()
-        self.screen_width = self.screen_geometry.width()
-        self.screen_mid = self.screen_width // 2  # 屏幕中线（左右分界）
-        self.is_moving = False  # 移动状态标记
-        # ---------- 行为参数（可按体感调）----------
-        self.relax_check_ms = 8000  # Relax 状态下：每 8 秒触发一次概率判定
+        self.topology = ScreenTopology()  # 屏幕布局缓存：屏幕增删/变化时自动刷新
+        self.motion = MotionIntegrator(speed_to_px_per_s(self.speed))
+        self.topology.listeners.append(self._on_screens_changed)
+        # ---------- 行为参数（可按体感调，会填进默认行为表）----------
+        self.enable_move = True
+        self.relax_check_ms = 8000  # Relax 状态下：每 8 秒一次概率判定（直接按概率算出停留时长）
         self.move_probability = 0.35  # 判定为 True 的概率（35%）
         self.move_duration_ms_min = 3000  # Move 最短持续 3 秒
         self.move_duration_ms_max = 8000  # Move 最长持续 8 秒
+        self.rng = random.Random()  # 行为随机源（模拟模式下会换成固定种子的实例）
+        # 行为状态机：Relax/Move/Sit/Interact 及转移由行为表决定（皮肤可用 behavior.json 覆盖）
+        self.behavior = BehaviorEngine(BehaviorSpec.from_dict(default_behavior()), self.rng)
+
+        # ---------- 统一调度器 ----------
+        # 所有定时任务共用一个唤醒源；tolerance_ms 越大越容易和动画帧合并成一次唤醒
+        self._shared_clock = scheduler is not None
+        self.scheduler = scheduler if scheduler is not None else Scheduler(self)
+        if self._owns_config:
+            # 配置库的写入从此延迟合并，搭帧时钟的唤醒一起落盘；退出时趁调度器还在先落盘
+            get_config_store().bind_scheduler(self.scheduler)
+            app = QApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(get_config_store().shutdown)
 
         # ---------- 行为定时器 ----------
-        # 1) Relax 判定计时器：周期性触发“是否开始 Move”
-        self.relax_timer = QTimer(self)
-        self.relax_timer.setInterval(self.relax_check_ms)  # 设定计时时间
-        self.relax_timer.timeout.connect(self.try_start_move)  # 绑定回调函数
-        self.relax_timer.start()  # 开启定时器
-
-        # 2) Move 持续计时器：到点结束 Move 并回 Relax
-        self.move_timer = QTimer(self)
-        self.move_timer.setSingleShot(True)  # 是否单次触发
-        self.move_timer.timeout.connect(self.stop_move)
-
-        # ---------- 滚动保存定时器 ----------
-        self._save_settings_timer = QTimer(self)
-        self._save_settings_timer.setSingleShot(True)
-        self._save_settings_timer.timeout.connect(self._flush_settings_to_disk)
-
-        # 初始化 UI 和动画
-        self.initUI()
-        self.loadAnimations()
-        self.setupAnimation()
+        # 进入状态时就算好停留时长，到点只触发一次转移（晚 250ms 无所谓）
+        self.behavior_timer = self.scheduler.job(
+            "pet.behavior", self._on_behavior_timeout, single_shot=True, tolerance_ms=250
+        )
+
+        # ---------- 输入合并 ----------
+        # 拖拽只记最新位置、滚轮只累计净增量，每帧最多落地一次（和帧时钟同一节拍）
+        self._pending_drag_pos = None
+        self._pending_zoom = 0  # 累计的 angleDelta（120 = 一格）
+        self._last_input_flush_ms = 0.0
+        self._input_job = self.scheduler.job("pet.input", self._flush_input, single_shot=True)
+
+        # ---------- 性能计数 ----------
+        self.metrics = PetMetrics()
+
+        # ---------- 事件总线 ----------
+        # 插件订阅帧 tick/状态/拖拽/缩放/设置变化；事件在 tick 末尾批量送达，每个插件有时间预算
+        self.events = EventBus(self.scheduler)
+
+        # ---------- 帧资源 ----------
+        self.frame_merge_tolerance = DEFAULT_MERGE_TOLERANCE  # 导入时折叠重复帧；0 = 只折叠完全相同的帧
+        self._frame_store = get_frame_store()  # 进程内共享：同皮肤的桌宠共用解码帧和缩放结果
+        self.frame_cache = self._frame_store.scaled  # 缩放/翻转后的帧缓存
+        self._anims = {}  # 动画 -> SharedAnimation（持有它才能让共享帧常驻）
+        self._scaled_usage = None  # 在帧仓库登记的 (角色, 皮肤, 宽, 高)
+        # 打开后源帧来自跨进程共享段（见 Core/shared_frames.py）；加载皮肤前就定下来，免得先私有解码一遍再换
+        self.shared_frames = bool(getattr(self.settings, "shared_frames", False))
+        self._shared = {}  # 动画 -> SharedTimeline
+        self._shown_key = None  # 当前 label 上显示的是哪一帧（用于跳过重复重绘）
+        # 只先解码当前状态的动画，其余可达动画在首帧之后（之后换皮肤时立即）空闲时逐个补齐
+        self._preload = []
+        self._first_frame_shown = False
+        self._preload_job = self.scheduler.job("pet.preload", self._preload_next, single_shot=True, tolerance_ms=20)
+        self.skin_watcher = SkinWatcher(self, scheduler=self.scheduler)  # 皮肤目录热重载
+        self.skin_watcher.changed.connect(self._on_skin_files_changed)
+        self.metrics.gauges["frame_cache"] = self.frame_cache.stats
+        self.metrics.gauges["resident_frame_bytes"] = self._resident_frame_bytes
+        self.metrics.gauges["scheduler"] = self.scheduler.stats
+        self.metrics.gauges["config_store"] = get_config_store().stats
+        self.metrics.gauges["startup"] = self.startup.report
+        self.metrics.gauges["event_bus"] = self.events.stats
+        self.input_recorder = InputRecorder(self)  # 输入录制（用于重放复现卡顿）
+
+        # ---------- 设置：按字段分发 ----------
+        # apply_settings 只把变化的字段交给对应的处理函数，按表的顺序执行
+        # （皮肤在尺寸之前：同时改两项时只按新尺寸渲染新皮肤，不白缩放一遍旧皮肤）
+        self._settings_handlers = [
+            (("speed",), self._apply_speed),
+            (BEHAVIOR_SETTINGS, self._apply_behavior_settings),
+            (("shared_frames",), self._apply_shared_frames),
+            (("fps",), self._apply_fps),
+            (("character", "skin"), self._apply_skin),
+            (("pet_size",), self._apply_pet_size),
+        ]
+        self._settings_subscribers = []  # [(字段集合, callback(changed))]
+        self._behavior_dirty = False
+
+        # 初始化 UI 和动画：直接加载配置里的皮肤（不先解码默认皮肤再切换）
+        with self.startup.phase("pet.ui"):
+            self.initUI()
+        with self.startup.phase("pet.frames"):
+            self.loadAnimations(self.settings.character or "阿米娅", self.settings.skin or "默认")
+            self.setupAnimation()
         # 初始化设置
-        self.apply_settings(self.settings.to_dict())
-        # 加载插件
-        self.app_ctx = AppContext(pet=self, logger=print)
-        self.plugin_manager = PluginManager(self.app_ctx, plugins_package="Plugins")
-        self.plugin_manager.load_all()
+        with self.startup.phase("pet.settings"):
+            self.apply_settings(self.settings.to_dict(), force=True)
+
+        # ---------- 首帧之后再做的事 ----------
+        # 窗口第一次画出桌宠后，在事件循环里逐步执行（见 _on_first_frame）
+        self.config_watcher = None
+        self.is_ready = False
+        self._deferred = DeferredSteps(self.scheduler, self.startup, on_done=self._finish_startup)
+        if self._owns_config:
+            self._deferred.add("config.watch", self._start_config_watcher)
+        if load_plugins:
+            self.app_ctx = AppContext(pet=self, logger=print, scheduler=self.scheduler, events=self.events)
+            self.app_ctx.services["metrics"] = self.metrics
+            self.app_ctx.services["metrics.snapshot"] = self.metrics.snapshot
+            self.app_ctx.services["scheduler.report"] = self.scheduler.report
+            self.app_ctx.services["settings.subscribe"] = self.subscribe_settings
+            self.app_ctx.services["startup.report"] = self.startup.report
+            self.plugin_manager = PluginManager(self.app_ctx, plugins_package="Plugins")
+            self.metrics.gauges["plugin_processes"] = self.plugin_manager.process_stats
+            self._deferred.add("plugins", self._queue_plugins)
+        self.label.installEventFilter(self)
 
     def initUI(self):
         # 窗口属性
@@ -85,10 +208,10 @@ class DesktopPet(QMainWindow):
         self.pet_width = 300
         self.pet_height = 300
 
-        # 初始位置：左下角（留出 20px 边距）
-        screen_height = self.screen_geometry.height()
-        self.start_x = 20  # 左边距
-        self.start_y = screen_height - self.pet_height - 20  # 底边距
+        # 初始位置：主屏左下角（留出 20px 边距）
+        primary = self.topology.primary
+        self.start_x = primary.left() + 20  # 左边距
+        self.start_y = primary.top() + primary.height() - self.pet_height - 20  # 底边距
         self.setGeometry(self.start_x, self.start_y, self.pet_width, self.pet_height)
 
         # 宠物显示标签
@@ -104,144 +227,539 @@ class DesktopPet(QMainWindow):
         self.is_hovered = False
         self.setMouseTracking(True)
 
+        # 性能面板（右键菜单开关，默认隐藏）
+        self.metrics_hud = MetricsHud(self.metrics, self, scheduler=self.scheduler)
+
+    @traced("pet.loadAnimations")
     def loadAnimations(self, character_name="阿米娅", skin_name="默认"):
         base = os.path.dirname(os.path.abspath(__file__))
         assets_base = os.path.join(base, "Assets")
-        relax_pattern = os.path.join(
-            assets_base, character_name, skin_name, "Relax", "*.png"
-        )
-        move_pattern = os.path.join(
-            assets_base, character_name, skin_name, "Move", "*.png"
-        )
-        interact_pattern = os.path.join(
-            assets_base, character_name, skin_name, "Interact", "*.png"
+        # 帧列表走资源索引：目录没变就不用再 glob 扫描
+        index = get_asset_index()
+        index.refresh(character_name, skin_name)
+        files = {
+            state: index.frame_entries(character_name, skin_name, state)
+            for state in ANIMATION_STATES
+        }
+        self._frame_entries = files
+
+        load_started = time.perf_counter()
+        self._release_shared()
+        self.timelines = {}
+        self._decoded = {}  # 动画 -> 源帧列表（热重载时按文件复用）
+        self._anims = {}
+        self.character_name = character_name
+        self.skin_name = skin_name
+        skin_dir = os.path.join(assets_base, character_name, skin_name)
+
+        # 行为表：默认表 + 设置参数 + 皮肤覆盖；只解码当前状态能到达的动画
+        self._skin_behavior = load_skin_behavior(skin_dir)
+        self._rebuild_behavior()
+
+        # 旧皮肤的缩放结果：没有别的桌宠在用就清掉
+        self._update_scaled_usage()
+        self._shown_key = None
+
+        # 监视当前皮肤目录：美术重新导出后热重载
+        self.skin_watcher.watch(
+            {state: os.path.join(skin_dir, state) for state in ANIMATION_STATES}
         )
-        sit_pattern = os.path.join(
-            assets_base, character_name, skin_name, "Sit", "*.png"
-        )
-
-        relax_files = sorted(glob.glob(relax_pattern))
-        move_files = sorted(glob.glob(move_pattern))
-        interact_files = sorted(glob.glob(interact_pattern))
-        sit_files = sorted(glob.glob(sit_pattern))
-
-        self.relax_frames = [QPixmap(p) for p in relax_files]
-        self.move_frames = [QPixmap(p) for p in move_files]
-        self.interact_frames = [QPixmap(p) for p in interact_files]
-        self.sit_frames = [QPixmap(p) for p in sit_files]
-
-        # 过滤掉加载失败的帧（文件损坏/不是有效PNG时 QPixmap 会 isNull）
-        self.relax_frames = [px for px in self.relax_frames if not px.isNull()]
-        self.move_frames = [px for px in self.move_frames if not px.isNull()]
-        self.interact_frames = [px for px in self.interact_frames if not px.isNull()]
-        self.sit_frames = [px for px in self.sit_frames if not px.isNull()]
+        self.metrics.record_load((time.perf_counter() - load_started) * 1000.0)
 
         # 确保关键动画帧存在
-        if not self.move_frames or not self.interact_frames:
+        if not files["Move"] or not files["Interact"]:
             raise FileNotFoundError(
                 "请确保'Assets'文件夹中包含 PNG 图片\n"
                 f"cwd={os.getcwd()}\n"
                 f"base={base}\n"
-                f"Move匹配={move_pattern}, 文件数={len(move_files)}\n"
-                f"Interact匹配={interact_pattern}, 文件数={len(interact_files)}"
+                f"Move目录={os.path.join(assets_base, character_name, skin_name, 'Move')}, "
+                f"文件数={len(files['Move'])}\n"
+                f"Interact目录={os.path.join(assets_base, character_name, skin_name, 'Interact')}, "
+                f"文件数={len(files['Interact'])}"
             )
 
-    def setupAnimation(self):
-        # 动画和移动定时器（每 20ms 更新一次）
-        self.current_frame = 0
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateAnimation)
-        self.timer.start(20)
+    def _bind_frame_lists(self):
+        empty = []
+        self.relax_frames = self.timelines["Relax"].frames if "Relax" in self.timelines else empty
+        self.move_frames = self.timelines["Move"].frames if "Move" in self.timelines else empty
+        self.interact_frames = self.timelines["Interact"].frames if "Interact" in self.timelines else empty
+        self.sit_frames = self.timelines["Sit"].frames if "Sit" in self.timelines else empty
 
-    def updateAnimation(self):
-        # 1. 处理水平移动（仅当移动状态为 True 且不在拖动时）
-        if self.is_moving and not self.is_dragging and not self.is_hovered:
-            self.move_horizontally()
+    def _animation_key(self, animation: str):
+        return (self.character_name, self.skin_name, animation, self.frame_merge_tolerance)
 
-        # 2. 处理动画帧（根据方向翻转贴图）
-        if self.is_hovered:
-            frames = self.interact_frames
-        else:
-            if self.is_moving:
-                frames = self.move_frames
-            else:
-                frames = self.relax_frames
+    def _adopt_animation(self, animation: str, anim) -> None:
+        self._anims[animation] = anim
+        self._decoded[animation] = anim.decoded
+        self.timelines[animation] = anim.timeline
 
-        if frames:
-            self.current_frame = (self.current_frame + 1) % len(frames)
-            current_pixmap = frames[self.current_frame]
+    def _ensure_frames(self, animation: str) -> None:
+        """
+        按需取一个动画：同进程已有桌宠加载过就直接共用，否则解码
+        （文件损坏/不是有效PNG时 decode_frame 返回 None，直接过滤；连续重复帧会被折叠）
+        """
+        if animation in self._decoded:
+            return
+        entries = self._frame_entries.get(animation)
+        if entries is None:
+            entries = get_asset_index().frame_entries(self.character_name, self.skin_name, animation)
+        if self.shared_frames and self._attach_shared(animation, entries):
+            self._bind_frame_lists()
+            return
+        started = time.perf_counter()
+        anim, decoded_count = self._frame_store.load(self._animation_key(animation), entries)
+        self._adopt_animation(animation, anim)
+        if decoded_count:
+            self.metrics.record_decode(decoded_count, (time.perf_counter() - started) * 1000.0)
+        self._bind_frame_lists()
+
+    def _attach_shared(self, animation: str, entries) -> bool:
+        """挂载（或首个发布）源帧的共享段；源帧不在本进程常驻，缩放结果照常进缩放缓存"""
+        name = segment_name(
+            self.character_name, self.skin_name, animation, self.frame_merge_tolerance, entries
+        )
 
-            # 根据移动方向翻转贴图
-            if self.direction == -1:
-                transform = QTransform()
-                transform.scale(-1, 1)  # 水平翻转
-                current_pixmap = current_pixmap.transformed(
-                    transform, Qt.SmoothTransformation
+        def build():
+            started = time.perf_counter()
+            anim, decoded_count = self._frame_store.load(self._animation_key(animation), entries)
+            if decoded_count:
+                self.metrics.record_decode(decoded_count, (time.perf_counter() - started) * 1000.0)
+            return [pm.toImage() for pm in anim.timeline.frames], list(anim.timeline.holds)
+
+        shared = get_shared_segments().acquire(name, build)
+        if shared is None:
+            return False
+        self._shared[animation] = shared
+        self._decoded[animation] = []
+        self.timelines[animation] = shared.timeline
+        return True
+
+    def _release_shared(self, animations=None) -> None:
+        segments = get_shared_segments()
+        for animation in list(self._shared if animations is None else animations):
+            shared = self._shared.pop(animation, None)
+            if shared is None:
+                continue
+            self._decoded.pop(animation, None)
+            self.timelines.pop(animation, None)
+            segments.release(shared)
+
+    def _drop_resident_frames(self) -> None:
+        """共享开关切换：常驻帧全部放掉，随后由 loadAnimations/_rebuild_behavior 按新方式补齐"""
+        self._release_shared()
+        self._decoded = {}
+        self.timelines = {}
+        self._anims = {}
+
+    def _update_scaled_usage(self) -> None:
+        """在帧仓库登记当前 (皮肤, 尺寸)；旧组合没人用了就释放它的缩放结果"""
+        usage = (self.character_name, self.skin_name, self.pet_width, self.pet_height)
+        self._frame_store.use_scaled(self._scaled_usage, usage)
+        self._scaled_usage = usage
+
+    def _rebuild_behavior(self) -> None:
+        """按当前设置 + 皮肤覆盖重建行为表，回到初始状态；只保留可达状态的帧"""
+        self._behavior_dirty = False
+        table = default_behavior(
+            move_probability=self.move_probability,
+            move_duration_ms=(self.move_duration_ms_min, self.move_duration_ms_max),
+            relax_check_ms=self.relax_check_ms,
+        )
+        spec = BehaviorSpec.from_dict(merge_behavior(table, self._skin_behavior))
+        disabled = {
+            name
+            for name, state in spec.states.items()
+            if (state.moving and not self.enable_move) or not self._has_frames(state.animation)
+        }
+        self.behavior.set_spec(spec, disabled)
+        self.behavior.state = spec.initial
+        self._sync_resident_frames()
+        self._enter_state(spec.initial)
+
+    def _has_frames(self, animation: str) -> bool:
+        entries = self._frame_entries.get(animation)
+        if entries is None:
+            entries = get_asset_index().frame_entries(self.character_name, self.skin_name, animation)
+            self._frame_entries[animation] = entries
+        return bool(entries)
+
+    def _sync_resident_frames(self) -> None:
+        """可达集合之外的动画释放掉，之内的补齐解码"""
+        spec = self.behavior.spec
+        needed = {
+            spec.states[name].animation if name in spec.states else name
+            for name in self.behavior.reachable()
+        }
+        for animation in list(self._decoded):
+            if animation not in needed:
+                self._release_shared([animation])
+                self._decoded.pop(animation, None)
+                self.timelines.pop(animation, None)
+                self._anims.pop(animation, None)
+        # 当前动画马上要画，立即解码；其余的交给 pet.preload 逐个补齐（进入状态时也会按需解码）
+        current = self._current_state()
+        if current in needed:
+            self._ensure_frames(current)
+        self._preload = [a for a in sorted(needed) if a not in self._decoded]
+        self._schedule_preload()
+        self._bind_frame_lists()
+
+    def _schedule_preload(self) -> None:
+        # 首帧之前不补：启动时先让窗口画出来
+        if self._preload and self._first_frame_shown and not self._preload_job.isActive():
+            self._preload_job.start(0)
+
+    def _preload_next(self) -> None:
+        """补齐一个动画的帧；一次只解码一个，中间回到事件循环（帧时钟、输入照常处理）"""
+        while self._preload:
+            animation = self._preload.pop(0)
+            if animation in self._decoded:
+                continue
+            with self.startup.phase(f"frames.{animation}"):
+                self._ensure_frames(animation)
+            break
+        if self._preload:
+            self._preload_job.start(0)
+        else:
+            self._deferred.start()  # 启动时：帧补齐之后才轮到配置监视和插件
+
+    @traced("pet.hot_reload", cat="io")
+    def _on_skin_files_changed(self, states):
+        """热重载：只重新解码新增/改动的帧，其余帧原样复用，再重建时间线"""
+        index = get_asset_index()
+        for state in states:
+            try:
+                index.rescan_state(self.character_name, self.skin_name, state)
+                entries = index.frame_entries(self.character_name, self.skin_name, state)
+                self._frame_entries[state] = entries
+                if state not in self._decoded:
+                    continue  # 当前不可达的动画没有常驻帧，进入时再解码
+                if state in self._shared:
+                    # 文件戳变了就是另一个段名：换挂新段（首个进程负责发布）
+                    self._release_shared([state])
+                    self._ensure_frames(state)
+                    # 旧段的缩放结果不能再用（下标对应的画面变了）
+                    key = (self.character_name, self.skin_name, state)
+                    self.frame_cache.invalidate(lambda k, c=key: k[:3] == c)
+                    print(f"[assets] 热重载 {state}: 已切换到新的共享帧段")
+                    continue
+
+                # 导出过程中目录可能暂时被清空：关键动画不能没有帧，先保留旧的
+                if not entries and state in ("Move", "Interact"):
+                    print(f"[assets] {state} 暂无可用帧，保留旧动画")
+                    continue
+
+                old = self._decoded.get(state, [])
+                decode_started = time.perf_counter()
+                # 同皮肤的其它桌宠可能已经重载过：帧仓库会直接给出新版本
+                anim, decoded_count = self._frame_store.load(
+                    self._animation_key(state), entries, reuse=old
                 )
-
-            self.label.setPixmap(
-                current_pixmap.scaled(
-                    self.pet_width,
-                    self.pet_height,
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation,
+                if anim is self._anims.get(state):
+                    continue
+                removed = len({d.path for d in old} - {p for p, _size, _mtime in entries})
+                self.metrics.record_decode(
+                    decoded_count, (time.perf_counter() - decode_started) * 1000.0
                 )
-            )
+                self._adopt_animation(state, anim)
+                decoded = anim.decoded
+                print(
+                    f"[assets] 热重载 {state}: 重新解码 {decoded_count} 帧，"
+                    f"删除 {removed} 帧，共 {len(decoded)} 帧"
+                )
+            except Exception as e:
+                print("热重载资源失败：", e)
+
+        self._bind_frame_lists()
+        # 正在显示的动画可能被替换：下标夹回范围内，强制重绘并唤醒帧时钟
+        timeline = self.timelines.get(self._current_state())
+        self.current_frame %= max(1, len(timeline) if timeline else 1)
+        self._hold_left = 0
+        self._shown_key = None
+        self.timer.start(self.frame_interval_ms)
+
+    def _resident_frame_bytes(self) -> int:
+        """已解码源帧 + 缩放缓存占用的像素内存"""
+        decoded = sum(
+            pixmap_bytes(d.pixmap) for frames in self._decoded.values() for d in frames
+        )
+        return decoded + self.frame_cache.bytes_used
+
+    # ---------- 启动：首帧之后的工作 ----------
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._shown_key is None:
+            # 不等第一个 tick：窗口第一次绘制时就带着当前帧
+            state = self._current_state()
+            timeline = self.timelines.get(state)
+            if timeline:
+                self._render_frame(state, timeline)
+
+    def eventFilter(self, obj, event):
+        if obj is self.label and event.type() == QEvent.Paint and self._shown_key is not None:
+            # label 第一次带着桌宠画面重绘：记首帧；等这次绘制完成后再开始后续加载
+            self.label.removeEventFilter(self)
+            self.startup.mark_first_frame()
+            QTimer.singleShot(0, self._on_first_frame)
+        return super().eventFilter(obj, event)
+
+    def _on_first_frame(self) -> None:
+        self._first_frame_shown = True
+        if self._preload:
+            self._schedule_preload()  # 补齐之后再启动 _deferred
+        else:
+            self._deferred.start()
+
+    def _start_config_watcher(self) -> None:
+        # 外部工具改 config.json 后热更新（只有读写 config.json 的桌宠监视）
+        if not self._owns_config:
+            return
+        self.config_watcher = ConfigWatcher(get_config_store(), self.scheduler, parent=self)
+        self.config_watcher.changed.connect(self._on_config_files_changed)
+        self.config_watcher.watch({APP_NAMESPACE: get_config_path()})
 
-    def try_start_move(self):
+    def _queue_plugins(self) -> None:
         """
-        Relax 判定计时器回调：
-        到点 -> 做一次概率判定 -> 命中则进入 Move，并启动 Move 持续计时器
+        读插件清单（按需加载的插件此时只登记服务和菜单项）；需要立即加载的插件每个单独一步，
+        全部处理完再监视它们的 config.json
         """
-        # 已经在 Move 就不判定
-        if self.is_moving:
+        for name in self.plugin_manager.scan():
+            self._deferred.add(f"plugin.{name}", lambda name=name: self.plugin_manager.load_one(name))
+        self._deferred.add("plugins.watch", self._watch_plugin_configs)
+
+    def _watch_plugin_configs(self) -> None:
+        if self.config_watcher is not None:
+            self.config_watcher.watch(self.plugin_manager.config_files())
+
+    def _finish_startup(self) -> None:
+        if self.is_ready:
+            return
+        self.is_ready = True
+        self.startup.finish()
+        self.ready.emit()
+
+    def complete_startup(self) -> None:
+        """马上要用插件（收到 say 命令、打开右键菜单）时：剩下的启动步骤立即做完"""
+        if not self._deferred.done:
+            self._deferred.run_all()
+
+    def setupAnimation(self):
+        # 动画和移动定时器（默认每 20ms 一个 tick，apply_settings 会按 fps 改写）
+        self.current_frame = 0
+        self._hold_left = 0  # 当前画面还要停留的 tick 数
+        self.frame_interval_ms = 20
+        self.timer = self.scheduler.job("pet.animation", self.updateAnimation)  # 帧时钟要准，不给容差
+        self.timer.align_ms = self.frame_interval_ms if self._shared_clock else 0
+        self.timer.start(self.frame_interval_ms)
+
+    @property
+    def screen_geometry(self) -> QRect:
+        """桌宠当前所在屏幕的可用区域"""
+        return self.topology.available_at(self.geometry().center())
+
+    @property
+    def screen_width(self) -> int:
+        return self.screen_geometry.width()
+
+    @property
+    def screen_mid(self) -> int:
+        """当前屏幕中线（左右分界）"""
+        geo = self.screen_geometry
+        return geo.left() + geo.width() // 2
+
+    def _on_screens_changed(self):
+        """拔掉显示器/改分辨率后，桌宠若不在任何屏幕上就拉回最近的屏幕"""
+        geo = self.screen_geometry
+        if geo.intersects(self.geometry()):
+            return
+        x = max(geo.left(), min(self.x(), geo.left() + geo.width() - self.pet_width))
+        y = max(geo.top(), min(self.y(), geo.top() + geo.height() - self.pet_height))
+        self.move(x, y)
+
+    def _current_state(self) -> str:
+        """当前要播放的动画目录"""
+        return self.behavior.current.animation
+
+    @property
+    def is_moving(self) -> bool:
+        return self.behavior.current.moving
+
+    @is_moving.setter
+    def is_moving(self, moving: bool) -> None:
+        # 兼容旧用法：直接切到第一个走动状态 / 初始状态
+        if moving == self.is_moving:
             return
+        spec = self.behavior.spec
+        target = next((n for n, s in spec.states.items() if s.moving), None) if moving else spec.initial
+        if target is not None:
+            self._enter_state(target)
+
+    def _needs_every_tick(self) -> bool:
+        """正在走动时每个 tick 都要推进位置，不能跳过"""
+        return self.is_moving and not self.is_dragging and not self.is_hovered
+
+    @traced("pet.updateAnimation", cat="timer")
+    def updateAnimation(self):
+        started = time.perf_counter()
+        events = self.events
+        # 本 tick 里发布的事件在末尾一起送达；缩放会嵌套调用本函数，只有最外层负责送达
+        outer = not events.batching
+        events.batching = True
+        try:
+            # 0. 本帧之前攒下的拖拽/缩放输入，和这一帧一起落地
+            if self._input_job.isActive() and self._flush_input_now():
+                return  # 缩放时 set_pet_size 已经把这一帧画好了
+
+            # 1. 处理水平移动（仅当移动状态为 True 且不在拖动时）
+            if self._needs_every_tick():
+                self.move_horizontally()
+
+            # 2. 处理动画帧（按时间线推进：重复帧只计时，不重绘）
+            state = self._current_state()
+            timeline = self.timelines.get(state)
+            if not timeline:
+                return
 
-        # 正在交互/拖拽时，不进入 Move（避免体验突兀）
-        if self.is_hovered or self.is_dragging:
+            if self._hold_left > 1:
+                self._hold_left -= 1
+            else:
+                self.current_frame = (self.current_frame + 1) % len(timeline)
+                self._hold_left = timeline.holds[self.current_frame]
+            self._render_frame(state, timeline)
+            if events.wants(FrameTick):
+                events.publish(FrameTick(self.scheduler.now(), state, self.current_frame))
+
+            # 3. 帧时钟：静止时直接睡到画面下一次真正变化
+            if self._needs_every_tick():
+                ticks = 1
+            else:
+                ticks = self._hold_left
+                self._hold_left = 1
+            interval = max(1, self.frame_interval_ms * ticks)
+            if self.timer.interval() != interval:
+                self.timer.setInterval(interval)
+        finally:
+            self.metrics.record_tick(started, self.frame_interval_ms)
+            self.metrics.expect_tick(self.timer.interval())
+            # 4. 插件事件：按各插件的时间预算送达，超支的推迟到后面的 tick
+            if outer:
+                events.batching = False
+                if events.pending:
+                    events.dispatch()
+
+    def _frame_key(self, state: str, idx: int):
+        return scaled_key(
+            self.character_name, self.skin_name, state, idx, self.pet_width, self.pet_height, self.direction
+        )
+
+    def _render_frame(self, state: str, timeline):
+        """把当前帧（缩放 + 按方向翻转）贴到 label；和上次画面完全相同时跳过"""
+        idx = self.current_frame % len(timeline)
+        key = self._frame_key(state, idx)
+        if key == self._shown_key:
             return
 
-        if random.random() < self.move_probability:
-            self.is_moving = True
-            self.current_frame = 0
+        def make():
+            pixmap = timeline.frames[idx]
+            if isinstance(pixmap, QImage):
+                # 共享段里的源帧（只读 QImage）：翻转/缩放出新图再转 pixmap
+                image = pixmap.mirrored(True, False) if self.direction == -1 else pixmap
+                return QPixmap.fromImage(
+                    image.scaled(self.pet_width, self.pet_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                )
+            # 根据移动方向翻转贴图
+            if self.direction == -1:
+                transform = QTransform()
+                transform.scale(-1, 1)  # 水平翻转
+                pixmap = pixmap.transformed(transform, Qt.SmoothTransformation)
+            return pixmap.scaled(
+                self.pet_width,
+                self.pet_height,
+                Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
+            )
 
-            # Move 持续时间可以随机，显得更自然
-            dur = random.randint(self.move_duration_ms_min, self.move_duration_ms_max)
-            self.direction = random.choice([-1, 1])  # 随机选择移动方向
-            self.move_timer.start(dur)
+        self.label.setPixmap(self.frame_cache.get(key, make))
+        self._shown_key = key
 
-    def stop_move(self):
-        """Move 持续到点：回到 Relax"""
-        self.is_moving = False
+    def _restart_animation(self):
+        """状态切换：从头播放，并立刻唤醒帧时钟（它可能正处于一段很长的 hold 睡眠里）"""
         self.current_frame = 0
+        self._hold_left = 0
+        self.timer.start(self.frame_interval_ms)
+        self.metrics.expect_tick(self.frame_interval_ms)
+
+    @traced("pet.enter_state", cat="timer")
+    def _enter_state(self, name: str) -> None:
+        """切换行为状态：算好下一次转移时间，补齐帧，从头播放"""
+        old = self.behavior.state
+        delay = self.behavior.enter(name)
+        if self.behavior.current.moving:
+            self.direction = self.rng.choice([-1, 1])  # 随机选择移动方向
+            self.motion.reset(self.x(), self.scheduler.now())
+        if delay is None:
+            self.behavior_timer.stop()
+        else:
+            self.behavior_timer.start(delay)
+        self._ensure_frames(self.behavior.current.animation)
+        if hasattr(self, "timer"):
+            self._restart_animation()
+        self.events.publish(StateChanged(old, name, self.behavior.current.animation))
+
+    def _on_behavior_timeout(self):
+        """停留时间到：按行为表的权重挑下一个状态"""
+        target = self.behavior.next_state()
+        if target is not None:
+            self._enter_state(target)
+
+    def _behavior_trigger(self, trigger: str) -> None:
+        target = self.behavior.on_trigger(trigger)
+        if target is not None:
+            self._enter_state(target)
 
     def move_horizontally(self):
-        # 计算新位置
+        started = time.perf_counter()
+        # 按经过的时间积分位置（px/s），可走范围是当前水平带上拼起来的所有屏幕
+        left, right = self.topology.walk_bounds(self.geometry())
         current_x = self.x()
-        new_x = current_x + self.speed * self.direction
-
-        # 边界检测（左右边缘）
-        if new_x <= 0:  # 左边缘
-            new_x = 0
-            self.direction = 1  # 转向右
-        elif new_x + self.pet_width >= self.screen_width:  # 右边缘
-            new_x = self.screen_width - self.pet_width
-            self.direction = -1  # 转向左
+        new_x, self.direction = self.motion.step(
+            self.scheduler.now(), current_x, self.direction, left, right - self.pet_width
+        )
 
-        # 更新窗口位置
-        self.move(new_x, self.y())
+        # 只有整数像素变化时才真正移动窗口
+        if new_x != current_x:
+            self.move(new_x, self.y())
+            if self.events.wants(PetMoved):
+                self.events.publish(PetMoved(new_x, self.y(), self.direction))
+        self.metrics.record_move(started)
+
+    def closeEvent(self, event):
+        if self._owns_config:
+            get_config_store().shutdown()  # 合并窗口里还没写的改动（刚滚轮缩放、插件刚保存）
+        # 共用调度器/帧仓库时：停掉自己的任务，释放缩放结果的使用登记
+        self.timer.stop()
+        self.behavior_timer.stop()
+        self._input_job.stop()
+        self._preload_job.stop()
+        self._deferred.stop()
+        self.skin_watcher.stop()
+        self.metrics_hud.set_enabled(False)
+        self._frame_store.use_scaled(self._scaled_usage, None)
+        self._scaled_usage = None
+        self._anims = {}
+        self._release_shared()
+        super().closeEvent(event)
 
     def enterEvent(self, event):
-        # 鼠标悬停桌宠：停止移动，切换动画
+        # 鼠标悬停桌宠：由行为表决定切到哪个状态（默认 Interact）
         self.is_hovered = True
-        # self.is_moving = False
-        self.current_frame = 0
+        self._behavior_trigger(TRIGGER_HOVER)
 
     def leaveEvent(self, event):
-        """离开桌宠悬停：恢复移动（移除自动关闭对话框的逻辑）"""
+        """离开桌宠悬停：由行为表决定回到哪个状态（默认 Relax）"""
         self.is_hovered = False
-        # self.is_moving = True
-        self.current_frame = 0
+        self._behavior_trigger(TRIGGER_UNHOVER)
 
     def wheelEvent(self, event):
         # 只在鼠标悬停桌宠上时允许滚轮缩放
@@ -253,48 +771,92 @@ class DesktopPet(QMainWindow):
         if delta == 0:
             return
 
-        step_px = 20  # 每一格滚轮调整多少像素（你可改 10/30）
-        new_size = self.pet_width + (step_px if delta > 0 else -step_px)
-
-        self.set_pet_size(new_size, persist=True)
+        # 只累计，下一帧统一缩放一次（触控板一秒能发上百个事件）
+        self._pending_zoom += delta
+        self._queue_input()
         event.accept()
 
-    def set_pet_size(self, new_size: int, persist: bool = False):
+    def _queue_input(self):
+        """有输入待处理：距上次落地不足一帧就等到下一帧，否则尽快处理"""
+        if self._input_job.isActive():
+            return
+        since = self.scheduler.now() - self._last_input_flush_ms
+        self._input_job.start(max(0, int(self.frame_interval_ms - since)))
+
+    def _flush_input_now(self) -> bool:
+        """tick / 松手时顺带落地：撤掉排队的落地任务，同样走 _flush_input（时间戳和计数都在那里记）"""
+        self._input_job.stop()
+        return self._flush_input()
+
+    @traced("pet.flush_input")
+    def _flush_input(self) -> bool:
+        """把攒下的输入一次性应用：拖到最新位置、按净滚动量缩放；尺寸真的变了才返回 True"""
+        started = time.perf_counter()
+        self._last_input_flush_ms = self.scheduler.now()
+        try:
+            return self._apply_pending_input()
+        finally:
+            self.metrics.record_input_flush(started)
+
+    def _apply_pending_input(self) -> bool:
+        if self._pending_drag_pos is not None:
+            pos, self._pending_drag_pos = self._pending_drag_pos, None
+            self.move(self.pos() + pos - self.dragPos)
+            self.dragPos = pos
+            self.events.publish(PetDragged(self.x(), self.y()))
+
+        if self._pending_zoom:
+            step_px = 20  # 每一格滚轮（120）调整多少像素（你可改 10/30）
+            px = int(self._pending_zoom * step_px / 120)  # 向 0 取整，不足 1px 的留到下次
+            if px:
+                self._pending_zoom -= px * 120 // step_px
+                # 到了上下限时尺寸不变：返回 False，这一帧照常推进
+                return self.set_pet_size(self.pet_width + px, persist=True)
+        return False
+
+    @traced("pet.set_pet_size")
+    def set_pet_size(self, new_size: int, persist: bool = False) -> bool:
+        """缩放桌宠（夹在 100~800 之间）；尺寸真的变了返回 True"""
         # 你 UI 里 size_spinBox 一般也会有范围，建议统一
         MIN_SIZE, MAX_SIZE = 100, 800
         new_size = max(MIN_SIZE, min(MAX_SIZE, int(new_size)))
 
         old_size = self.pet_width
         if new_size == old_size:
-            return
+            return False
 
         # 保持“底部贴地”的感觉：底边不动，只调整 y
         bottom = self.y() + old_size
         new_x = self.x()
         new_y = bottom - new_size
 
-        # 防止越界
-        new_x = max(0, min(new_x, self.screen_width - new_size))
-        new_y = max(0, min(new_y, self.screen_geometry.height() - new_size))
+        # 防止越界（按当前所在屏幕）
+        geo = self.screen_geometry
+        new_x = max(geo.left(), min(new_x, geo.left() + geo.width() - new_size))
+        new_y = max(geo.top(), min(new_y, geo.top() + geo.height() - new_size))
 
         self.pet_width = self.pet_height = new_size
         self.setGeometry(new_x, new_y, new_size, new_size)
         self.label.setGeometry(0, 0, new_size, new_size)
 
+        self.events.publish(PetResized(old_size, new_size))
+
+        # 旧尺寸的缩放结果：没有别的桌宠在用就清掉
+        self._update_scaled_usage()
+
         # 立即刷新一帧（不等下一次 timer tick）
         self.current_frame = 0
+        self._hold_left = 0
         self.updateAnimation()
 
-        # 可选：把滚轮缩放写回配置文件（做个 300ms 防抖）
-        if persist and hasattr(self, "settings") and self.settings is not None:
+        # 可选：把滚轮缩放写回配置库（配置库自己做防抖，连续缩放只落一个事务）
+        if persist and self._owns_config and self.settings is not None:
             self.settings.pet_size = new_size
-            self._save_settings_timer.start(300)
-
-    def _flush_settings_to_disk(self):
-        try:
-            save_settings(self.settings)
-        except Exception as e:
-            print("保存设置失败：", e)
+            try:
+                save_settings(self.settings)
+            except Exception as e:
+                print("保存设置失败：", e)
+        return True
 
     def mousePressEvent(self, event):
         if event.button() == Qt.RightButton:
@@ -309,24 +871,77 @@ class DesktopPet(QMainWindow):
 
     def show_context_menu(self, global_pos):
         menu = QMenu(self)
+        self.complete_startup()  # 插件还没加载完时先加载完，菜单里才有插件项
         if hasattr(self, "plugin_manager"):
             self.plugin_manager.extend_context_menu(menu)
+        act_hud = menu.addAction("性能面板")
+        act_hud.setCheckable(True)
+        act_hud.setChecked(self.metrics_hud.isVisible())
+        act_trace = menu.addAction("性能追踪")
+        act_trace.setCheckable(True)
+        act_trace.setChecked(tracer.enabled)
+        act_dump = menu.addAction("导出追踪")
+        act_dump.setEnabled(len(tracer) > 0)
+        act_memory = menu.addAction("内存报告")
+        act_record = menu.addAction("录制输入")
+        act_record.setCheckable(True)
+        act_record.setChecked(self.input_recorder.recording)
         act_settings = menu.addAction("设置")
         act_exit = menu.addAction("退出")
 
         chosen = menu.exec_(global_pos)
-        if chosen == act_settings:
+        if chosen == act_hud:
+            self.metrics_hud.set_enabled(act_hud.isChecked())
+        elif chosen == act_trace:
+            if act_trace.isChecked():
+                tracer.enable()
+            else:
+                tracer.disable()
+        elif chosen == act_dump:
+            self.dump_trace()
+        elif chosen == act_memory:
+            QMessageBox.information(self, "内存报告", format_report(memory_report(self)))
+        elif chosen == act_record:
+            if act_record.isChecked():
+                self.input_recorder.start()
+            else:
+                self.save_input_recording()
+        elif chosen == act_settings:
             self.open_settings()
         elif chosen == act_exit:
             QApplication.quit()
 
+    def dump_trace(self):
+        """把追踪缓冲写成 Chrome trace JSON（chrome://tracing / Perfetto 可打开）"""
+        try:
+            path = tracer.dump()
+        except Exception as e:
+            QMessageBox.warning(self, "导出失败", f"写入追踪文件失败：\n{e}")
+            return
+        QMessageBox.information(self, "追踪已导出", f"已写入：\n{path}")
+
+    def save_input_recording(self):
+        """停止录制并写出录制文件（Tools/replay_input.py 可重放）"""
+        self.input_recorder.stop()
+        try:
+            path = self.input_recorder.save()
+        except Exception as e:
+            QMessageBox.warning(self, "保存失败", f"写入录制文件失败：\n{e}")
+            return
+        QMessageBox.information(self, "录制已保存", f"共 {len(self.input_recorder)} 个事件，已写入：\n{path}")
+
     def open_settings(self):
         if self._settings_dialog and self._settings_dialog.isVisible():  # 避免多开
             self._settings_dialog.raise_()
             self._settings_dialog.activateWindow()
             return
-        settings_dict = load_settings().to_dict()
+        from Settings.settings_dialog import SettingsDialog  # 设置界面第一次打开时才导入
+
+        # 外部修改已由 config_watcher 同步进来，直接用内存里的设置
+        settings_dict = self.settings.to_dict()
         self._settings_dialog = SettingsDialog(current=settings_dict, parent=self)
+        # 窗口关闭即销毁（WA_DeleteOnClose），别再拿着已删除的对象
+        self._settings_dialog.destroyed.connect(self._on_settings_destroyed)
 
         self._settings_dialog.settings_saved.connect(self.apply_settings)
 
@@ -334,63 +949,143 @@ class DesktopPet(QMainWindow):
         self._settings_dialog.raise_()
         self._settings_dialog.activateWindow()
 
-    def apply_settings(self, s: dict):
-        # 行为参数
-        enable_move = bool(s.get("enable_move", True))
-        if not enable_move:
-            self.is_moving = False
-            self.relax_timer.stop()
-            self.move_timer.stop()
-        else:
-            if not self.relax_timer.isActive():
-                self.relax_timer.start()
+    def _on_settings_destroyed(self, _obj=None) -> None:
+        self._settings_dialog = None
 
-        self.speed = int(s.get("speed", self.speed))
-        self.move_probability = (
-            int(s.get("move_probability", int(self.move_probability * 100))) / 100.0
-        )
-        self.move_duration_ms_min = int(
-            s.get("move_duration_min", self.move_duration_ms_min)
-        )
-        self.move_duration_ms_max = int(
-            s.get("move_duration_max", self.move_duration_ms_max)
-        )
+    @traced("pet.apply_settings")
+    def apply_settings(self, s: dict, force: bool = False):
+        """
+        和当前设置逐字段比较，只执行变化字段的处理函数（只改 speed 不会碰资源和窗口尺寸）。
+        s 可以只含部分字段；force=True 时视为全部字段都变了（启动时用）。
+        """
+        from Settings.settings_model import AppSettings, diff_settings
 
+        old = self.settings
+        new = AppSettings.from_dict(dict(old.to_dict(), **s))
+        if force:
+            changed = {k: (None, v) for k, v in new.to_dict().items()}
+        else:
+            changed = diff_settings(old, new)
+        if not changed:
+            return {}
+        self.settings = new
+
+        with tracer.span("pet.apply_settings.diff", fields=",".join(changed)):
+            for keys, handler in self._settings_handlers:
+                if any(k in changed for k in keys):
+                    handler(new)
+            if self._behavior_dirty:
+                self._rebuild_behavior()
+        self._notify_settings(changed)
+        return changed
+
+    @traced("pet.config_reload", cat="io")
+    def _on_config_files_changed(self, namespaces):
+        """外部改了 config.json：校验后只把改过的字段应用到桌宠/插件"""
+        from Settings.settings_model import validate_settings
+
+        def validate(edited):
+            clean, errors = validate_settings(edited)
+            for error in errors:
+                print(f"[config] 忽略 config.json 中的非法值：{error}")
+            return clean
+
+        for namespace in namespaces:
+            if namespace == APP_NAMESPACE:
+                changed = get_config_store().sync_json(namespace, get_config_path(), validate=validate)
+                if changed:
+                    print(f"[config] config.json 已更新：{', '.join(changed)}")
+                    self.apply_settings(changed)
+            elif getattr(self, "plugin_manager", None) is not None:
+                self.plugin_manager.reload_config(namespace)
+
+    def subscribe_settings(self, fields, callback):
+        """
+        插件订阅设置变化：只在 fields 里的字段变了时调用 callback({字段: (旧值, 新值)})。
+        返回取消订阅的函数。
+        """
+        entry = (frozenset(fields), callback)
+        self._settings_subscribers.append(entry)
+
+        def unsubscribe():
+            if entry in self._settings_subscribers:
+                self._settings_subscribers.remove(entry)
+
+        return unsubscribe
+
+    def _notify_settings(self, changed):
+        self.events.publish(SettingsChanged(changed))
+        for fields, callback in list(self._settings_subscribers):
+            mine = {k: v for k, v in changed.items() if k in fields}
+            if not mine:
+                continue
+            try:
+                callback(mine)
+            except Exception as e:
+                print("设置订阅回调失败：", e)
+
+    def _apply_speed(self, s):
+        self.speed = int(s.speed)
+        self.motion.speed_px_s = speed_to_px_per_s(self.speed)
+
+    def _apply_behavior_settings(self, s):
+        # 行为参数（填进行为表，随后重建）
+        self.enable_move = bool(s.enable_move)
+        self.move_probability = int(s.move_probability) / 100.0
+        self.move_duration_ms_min = int(s.move_duration_min)
+        self.move_duration_ms_max = int(s.move_duration_max)
+        self._behavior_dirty = True
+
+    def _apply_shared_frames(self, s):
+        shared_frames = bool(s.shared_frames)
+        if shared_frames != self.shared_frames:
+            self.shared_frames = shared_frames
+            self._drop_resident_frames()
+            self._behavior_dirty = True  # 重建时按新方式补齐常驻帧
+
+    def _apply_fps(self, s):
         # FPS -> 动画定时器间隔
-        fps = int(s.get("fps", 30))
-        self.timer.setInterval(max(1, int(1000 / fps)))
+        self.frame_interval_ms = max(1, int(1000 / int(s.fps)))
+        if self._shared_clock:
+            # 共用帧时钟：各桌宠的动画 tick 对齐到同一网格，N 只桌宠仍是一次唤醒
+            self.timer.align_ms = self.frame_interval_ms
+        self.timer.setInterval(self.frame_interval_ms)
 
-        # 尺寸
-        new_size = int(s.get("pet_size", self.pet_width))
-        self.set_pet_size(new_size, persist=False)
+    def _apply_pet_size(self, s):
+        self.set_pet_size(int(s.pet_size), persist=False)
 
+    def _apply_skin(self, s):
         # ✅ 只有这里刷新皮肤/角色资源
-        new_character = s.get("character", None)
-        new_skin = s.get("skin", None)
-        if new_character and new_skin:
-            self.loadAnimations(character_name=new_character, skin_name=new_skin)
-            self.current_frame = 0
-        from Settings.settings_model import AppSettings
-
-        self.settings = AppSettings.from_dict(s)
+        if not (s.character and s.skin):
+            return
+        if (s.character, s.skin) == (self.character_name, self.skin_name):
+            return  # 已经是这个皮肤（如启动时），行为参数变化由 _behavior_dirty 负责
+        self.loadAnimations(character_name=s.character, skin_name=s.skin)  # 会顺带重建行为
+        # 旧皮肤的帧已经释放，把空出来的堆内存还给系统
+        release_free_heap()
 
     def mouseMoveEvent(self, event):
         if event.buttons() == Qt.LeftButton:
             # 标记为正在拖动
             self.is_dragging = True
-            # 拖动桌宠
-            self.move(self.pos() + event.globalPos() - self.dragPos)
-            self.dragPos = event.globalPos()
+            # 拖动桌宠：只记最新位置，下一帧再移动窗口
+            self._pending_drag_pos = event.globalPos()
+            self._queue_input()
 
             event.accept()
 
     def mouseReleaseEvent(self, event):
         # 鼠标释放时检查是否是点击（非拖动）
         if event.button() == Qt.LeftButton:
+            # 松手前把最后一段拖动落地
+            if self._pending_drag_pos is not None:
+                self._flush_input_now()
             # 如果不是拖动状态且处于悬停状态，才显示自定义交互界面
             if not self.is_dragging and self.is_hovered:
                 return
             # 重置拖动状态
+            if self.is_dragging:
+                self.events.publish(DragFinished(self.x(), self.y()))
             self.is_dragging = False
             event.accept()
 
@@ -1,16 +1,97 @@
+from Core.startup import startup  # 最先导入：启动计时从这里起算
+
+import argparse
+import json
 import sys
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from desktop_pet import DesktopPet
+
+from Core.control import send_commands
+
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="桌宠")
+    ap.add_argument("--pets", type=int, default=1, help="同一进程里养 N 只桌宠（共用帧时钟和帧缓存）")
+    ap.add_argument("--say", metavar="TEXT", help="让桌宠说一句话")
+    ap.add_argument("--skin", metavar="角色/皮肤", help="切换皮肤，如 阿米娅/默认")
+    ap.add_argument("--reload-settings", action="store_true", help="重新读取 config.json")
+    ap.add_argument("--quit", action="store_true", help="让正在运行的桌宠退出")
+    ap.add_argument("--new-instance", action="store_true", help="不转发给正在运行的桌宠，另开一个进程")
+    # PyQt 自己的参数（如 -platform）原样留给 QApplication
+    args, _qt_args = ap.parse_known_args(argv)
+    args.pets = max(1, args.pets)
+    return args
+
+
+def commands_from_args(args):
+    """命令行请求 -> 控制命令（格式见 Core/control.py）；什么都没带就是“把桌宠叫出来”"""
+    commands = []
+    if args.skin:
+        character, _, skin = args.skin.partition("/")
+        commands.append({"cmd": "skin", "character": character, "skin": skin or "默认"})
+    if args.reload_settings:
+        commands.append({"cmd": "reload"})
+    if args.say:
+        commands.append({"cmd": "say", "text": args.say})
+    if args.quit:
+        commands.append({"cmd": "quit"})
+    return commands or [{"cmd": "show"}]
+
+
+def forward(commands):
+    """转发给正在运行的桌宠；转发成功就带着结果退出，没有运行中的实例时返回"""
+    with startup.phase("control.forward"):
+        replies = send_commands(commands)
+    if replies is not None:
+        for reply in replies:
+            if not reply.get("ok"):
+                print(json.dumps(reply, ensure_ascii=False), file=sys.stderr)
+        sys.exit(0 if all(r.get("ok") for r in replies) else 1)
+
 
 def main():
-    # 确保应用程序单实例运行
-    app = QApplication(sys.argv)
-    
+    args = parse_args(sys.argv[1:])
+    commands = commands_from_args(args)
+
+    # 确保应用程序单实例运行：已有桌宠在跑就把请求转发过去，不再导入 PyQt / 解码资源
+    if not args.new_instance:
+        forward(commands)
+    if args.quit:
+        return  # 没有在运行的桌宠
+
+    with startup.phase("qt.app"):
+        from PyQt5.QtWidgets import QApplication, QMessageBox
+
+        app = QApplication(sys.argv)
+
     # 检查必要的资源文件
     try:
         # 尝试导入并初始化桌宠
-        pet = DesktopPet()
-        pet.show()
+        with startup.phase("import"):
+            from Core.control_server import LISTEN_RUNNING, ControlServer, pet_handlers
+            from desktop_pet import DesktopPet
+
+        # 先占住控制地址再建桌宠：和同时启动的另一个实例撞车时，转发过去就走
+        control = ControlServer(parent=app)
+        if not args.new_instance and control.listen() == LISTEN_RUNNING:
+            forward(commands)
+            sys.exit(1)
+
+        if args.pets == 1:
+            pets = [DesktopPet()]
+        else:
+            from Core.pet_host import PetHost
+
+            host = PetHost()
+            pets = [host.spawn() for _ in range(args.pets)]
+        for pet in pets:
+            pet.show()
+
+        control.handlers.update(pet_handlers(lambda: pets))
+        if hasattr(pets[0], "app_ctx"):
+            pets[0].app_ctx.services["control.register"] = control.register
+        # 首次启动时命令行带的请求（如 --say）等插件加载完再执行
+        local = [c for c in commands if c["cmd"] != "show"]
+        if local:
+            pets[0].ready.connect(lambda: control.dispatch(local))
         sys.exit(app.exec_())
     except FileNotFoundError as e:
         QMessageBox.critical(None, "资源缺失", f"启动失败：缺少必要的动画资源\n{str(e)}")